@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Adaptive Pose Complexity - Load-driven MediaPipe model_complexity selection
+Steps pose model complexity down when the inference queue backs up or pose
+latency climbs, and back up once load clears, never below a sport's floor
+"""
+
+import os
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Any, Callable, Optional
+
+from inference_executor import inference_executor
+from sport_pack_system import sport_pack_loader
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class AdaptiveComplexityConfig:
+    """Pressure thresholds and pacing of complexity changes"""
+    enabled: bool = True
+    max_complexity: int = 2
+    min_complexity: int = 0
+    high_queue_depth: int = 0           # 0: one queued request per inference worker
+    high_latency_ms: float = 250.0
+    low_latency_ms: float = 120.0
+    step_down_interval_seconds: float = 2.0
+    recovery_seconds: float = 10.0
+    slow_level_recovery_factor: float = 6.0
+    latency_smoothing: float = 0.2
+
+    @classmethod
+    def from_env(cls) -> 'AdaptiveComplexityConfig':
+        """Build config from EKKALAVYA_POSE_ADAPTIVE_* variables"""
+        return cls(
+            enabled=os.getenv('EKKALAVYA_POSE_ADAPTIVE', 'true').lower() not in ('0', 'false', 'no'),
+            high_queue_depth=int(os.getenv('EKKALAVYA_POSE_ADAPTIVE_HIGH_QUEUE', 0)),
+            high_latency_ms=float(os.getenv('EKKALAVYA_POSE_ADAPTIVE_HIGH_LATENCY_MS', 250.0)),
+            low_latency_ms=float(os.getenv('EKKALAVYA_POSE_ADAPTIVE_LOW_LATENCY_MS', 120.0)),
+            recovery_seconds=float(os.getenv('EKKALAVYA_POSE_ADAPTIVE_RECOVERY_SECONDS', 10.0))
+        )
+
+class AdaptiveComplexityController:
+    """
+    Shared pose complexity level for all pose inference.
+    Under pressure (queued inference requests, or smoothed pose latency at
+    the current level above high_latency_ms) the level drops one step at a
+    time, at most every step_down_interval_seconds. It rises one step only
+    after recovery_seconds without pressure, or several times that when the
+    higher level was itself too slow the last time it ran.
+    """
+
+    def __init__(self,
+                 config: Optional[AdaptiveComplexityConfig] = None,
+                 queue_depth: Optional[Callable[[], int]] = None):
+        self.config = config or AdaptiveComplexityConfig.from_env()
+        self._queue_depth = queue_depth or (lambda: inference_executor.get_stats()['queued'])
+        self._high_queue_depth = self.config.high_queue_depth or inference_executor.config.max_workers
+        self._lock = threading.Lock()
+        self._level = self.config.max_complexity
+        self._latency_ms: Dict[int, float] = {}
+        self._last_change = 0.0
+        self._calm_since: Optional[float] = None
+        self.stats = {
+            'step_downs': 0,
+            'step_ups': 0,
+            'selections': {level: 0 for level in range(self.config.min_complexity, self.config.max_complexity + 1)}
+        }
+
+    @property
+    def current_complexity(self) -> int:
+        return self._level
+
+    def observe(self, complexity: int, latency_ms: float):
+        """Record the latency of one pose inference run at the given complexity"""
+        with self._lock:
+            previous = self._latency_ms.get(complexity)
+            alpha = self.config.latency_smoothing
+            self._latency_ms[complexity] = latency_ms if previous is None else previous + alpha * (latency_ms - previous)
+
+    def select(self, floor: int = 0, ceiling: Optional[int] = None) -> int:
+        """
+        Complexity to run now: the adaptive level, clamped to [floor, ceiling].
+        The sport's floor wins over a lower ceiling (e.g. one picked by a latency budget).
+        """
+        ceiling = self.config.max_complexity if ceiling is None else ceiling
+        ceiling = max(ceiling, floor)
+        if not self.config.enabled:
+            complexity = ceiling
+        else:
+            self._evaluate()
+            complexity = max(floor, min(self._level, ceiling))
+        with self._lock:
+            self.stats['selections'][complexity] = self.stats['selections'].get(complexity, 0) + 1
+        return complexity
+
+    def select_for_sport(self, sport: Optional[str], ceiling: Optional[int] = None) -> int:
+        return self.select(sport_complexity_floor(sport), ceiling)
+
+    def _evaluate(self):
+        now = time.time()
+        queued = self._queue_depth()
+
+        with self._lock:
+            level = self._level
+            latency = self._latency_ms.get(level)
+            pressured = queued >= self._high_queue_depth or (latency is not None and latency > self.config.high_latency_ms)
+
+            if pressured:
+                self._calm_since = None
+                if level > self.config.min_complexity and now - self._last_change >= self.config.step_down_interval_seconds:
+                    self._change_level(level - 1, now, f"queue depth {queued}, latency {latency or 0:.0f} ms")
+                return
+
+            calm = queued == 0 and (latency is None or latency < self.config.low_latency_ms)
+            if not calm:
+                self._calm_since = None
+                return
+            if self._calm_since is None:
+                self._calm_since = now
+                return
+
+            # A level that was too slow last time is probed again only after a longer calm period
+            higher_latency = self._latency_ms.get(level + 1)
+            recovery = self.config.recovery_seconds
+            if higher_latency is not None and higher_latency > self.config.high_latency_ms:
+                recovery *= self.config.slow_level_recovery_factor
+            if level < self.config.max_complexity and now - self._calm_since >= recovery:
+                self._change_level(level + 1, now, "load cleared")
+
+    def _change_level(self, level: int, now: float, reason: str):
+        direction = 'step_downs' if level < self._level else 'step_ups'
+        self.stats[direction] += 1
+        logger.info(f"Pose model complexity {self._level} -> {level} ({reason})")
+        self._level = level
+        self._last_change = now
+        self._calm_since = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'enabled': self.config.enabled,
+                'current_complexity': self._level,
+                'smoothed_latency_ms': dict(self._latency_ms),
+                'queue_depth': self._queue_depth(),
+                'high_queue_depth': self._high_queue_depth,
+                'step_downs': self.stats['step_downs'],
+                'step_ups': self.stats['step_ups'],
+                'selections': dict(self.stats['selections'])
+            }
+
+def sport_complexity_floor(sport: Optional[str]) -> int:
+    """Minimum pose complexity from the sport's cached performance settings (defaults for unknown sports)"""
+    if not sport:
+        return 0
+    return sport_pack_loader.get_performance_config(sport).min_pose_complexity
+
+# Global controller instance
+pose_complexity_controller = AdaptiveComplexityController()
+
+__all__ = [
+    'AdaptiveComplexityConfig', 'AdaptiveComplexityController', 'sport_complexity_floor',
+    'pose_complexity_controller'
+]
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Appearance Embedding - Cheap colour descriptors for track re-identification
+Describes each box by a normalized hue/saturation histogram of its inner region,
+taken from the frame's shared HSV conversion when one exists, so lost tracks can be matched
+back to detections by how they look as well as where they are expected
+"""
+
+import logging
+from typing import Union
+
+import cv2
+import numpy as np
+
+from frame_features import FrameFeatures
+
+logger = logging.getLogger(__name__)
+
+HUE_BINS = 16
+SATURATION_BINS = 4
+EMBEDDING_SIZE = HUE_BINS * SATURATION_BINS
+
+# Fraction of the box trimmed from each side before the histogram, so the
+# background around a player contributes as little as possible
+BOX_MARGIN = (0.2, 0.1)
+
+def box_histograms(frame: Union[np.ndarray, FrameFeatures], boxes: np.ndarray) -> np.ndarray:
+    """
+    Unit-length hue/saturation histograms (N, EMBEDDING_SIZE) of boxes (N, 4)
+    as x1, y1, x2, y2; boxes with no pixels inside the frame get zero rows
+    """
+    features = FrameFeatures.of(frame)
+    boxes = np.asarray(boxes, dtype=np.float64).reshape(-1, 4)
+    embeddings = np.zeros((len(boxes), EMBEDDING_SIZE), dtype=np.float32)
+    # Reuse the frame's HSV conversion if a detector already made it; otherwise
+    # converting only the boxes is far cheaper than converting the whole frame
+    shared_hsv = 'hsv' in features.cached_keys()
+
+    sizes = boxes[:, 2:] - boxes[:, :2]
+    inner = np.hstack([boxes[:, :2] + sizes * BOX_MARGIN, boxes[:, 2:] - sizes * BOX_MARGIN])
+    inner = np.clip(inner, 0, [features.width, features.height, features.width, features.height]).astype(np.int64)
+    for i, (x1, y1, x2, y2) in enumerate(inner.tolist()):
+        if x2 <= x1 or y2 <= y1:
+            continue
+        if shared_hsv:
+            region = features.hsv_region(x1, y1, x2, y2)
+        else:
+            region = cv2.cvtColor(np.ascontiguousarray(features.image[y1:y2, x1:x2]), cv2.COLOR_BGR2HSV)
+        histogram = cv2.calcHist([region], [0, 1], None, [HUE_BINS, SATURATION_BINS], [0, 180, 0, 256])
+        embeddings[i] = histogram.ravel()
+
+    norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+    return np.divide(embeddings, norms, out=embeddings, where=norms > 0)
+
+def blend_embeddings(previous: np.ndarray, current: np.ndarray, momentum: float = 0.9) -> np.ndarray:
+    """
+    Exponential moving average of unit embeddings, row for row; an empty
+    previous row takes the current one as is, an empty current row is ignored
+    """
+    has_previous = previous.any(axis=1, keepdims=True)
+    has_current = current.any(axis=1, keepdims=True)
+    blended = np.where(has_previous & has_current, momentum * previous + (1.0 - momentum) * current,
+                       np.where(has_current, current, previous))
+    norms = np.linalg.norm(blended, axis=1, keepdims=True)
+    return np.divide(blended, norms, out=np.zeros_like(blended), where=norms > 0)
+
+def similarity_matrix(embeddings_a: np.ndarray, embeddings_b: np.ndarray) -> np.ndarray:
+    """Cosine similarity (N, M) of unit embeddings; pairs with an empty embedding score 0"""
+    return np.asarray(embeddings_a, dtype=np.float32) @ np.asarray(embeddings_b, dtype=np.float32).T
+
+__all__ = [
+    'HUE_BINS', 'SATURATION_BINS', 'EMBEDDING_SIZE', 'box_histograms', 'blend_embeddings', 'similarity_matrix'
+]
@@ -92,4 +92,8 @@ class ARError(EkkalavyaBaseError):
 
 class VideoProcessingError(EkkalavyaBaseError):
     """Raised when video processing fails"""
-    pass
\ No newline at end of file
+    pass
+
+class InferenceOverloadError(EkkalavyaBaseError):
+    """Raised when the inference executor queue is full and work must be retried later"""
+    pass
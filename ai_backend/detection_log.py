@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Detection Log - Compact recordings of the detections fed to the tracker
+Each frame's detection list (and optional ground-truth boxes) is stored as flat
+NumPy columns plus frame offsets in one compressed .npz file, so a session can
+be replayed through MultiObjectTracker offline and reproducibly
+"""
+
+import logging
+from dataclasses import dataclass
+from typing import Dict, List, Any, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+LOG_VERSION = 1
+
+@dataclass
+class DetectionLog:
+    """
+    Recorded frames as columns. Detection rows of frame i are
+    frame_offsets[i]:frame_offsets[i + 1]; ground-truth rows likewise
+    with gt_offsets when the log carries ground truth.
+    """
+    timestamps: np.ndarray                    # (F,)
+    frame_offsets: np.ndarray                 # (F + 1,)
+    boxes: np.ndarray                         # (N, 4) x1, y1, x2, y2
+    confidences: np.ndarray                   # (N,)
+    class_ids: np.ndarray                     # (N,)
+    class_codes: np.ndarray                   # (N,) indexes into class_names
+    class_names: List[str]
+    sport: str = ''
+    gt_offsets: Optional[np.ndarray] = None   # (F + 1,)
+    gt_ids: Optional[np.ndarray] = None       # (G,)
+    gt_boxes: Optional[np.ndarray] = None     # (G, 4)
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    @property
+    def has_ground_truth(self) -> bool:
+        return self.gt_offsets is not None
+
+    @property
+    def detection_count(self) -> int:
+        return len(self.boxes)
+
+    def detections(self, frame: int) -> List[Dict[str, Any]]:
+        """A frame's detections in the format MultiObjectTracker.process_frame takes"""
+        start, end = self.frame_offsets[frame], self.frame_offsets[frame + 1]
+        return [
+            {
+                'class_name': self.class_names[code],
+                'class_id': class_id,
+                'confidence': confidence,
+                'bbox': {'x1': box[0], 'y1': box[1], 'x2': box[2], 'y2': box[3]}
+            }
+            for box, confidence, class_id, code in zip(
+                self.boxes[start:end].tolist(), self.confidences[start:end].tolist(),
+                self.class_ids[start:end].tolist(), self.class_codes[start:end].tolist()
+            )
+        ]
+
+    def ground_truth(self, frame: int) -> Tuple[np.ndarray, np.ndarray]:
+        """A frame's ground-truth identities (G,) and boxes (G, 4)"""
+        start, end = self.gt_offsets[frame], self.gt_offsets[frame + 1]
+        return self.gt_ids[start:end], self.gt_boxes[start:end]
+
+    def save(self, path: str):
+        columns = {
+            'version': np.array(LOG_VERSION),
+            'sport': np.array(self.sport),
+            'timestamps': self.timestamps,
+            'frame_offsets': self.frame_offsets,
+            'boxes': self.boxes,
+            'confidences': self.confidences,
+            'class_ids': self.class_ids,
+            'class_codes': self.class_codes,
+            'class_names': np.array(self.class_names, dtype=str)
+        }
+        if self.has_ground_truth:
+            columns.update(gt_offsets=self.gt_offsets, gt_ids=self.gt_ids, gt_boxes=self.gt_boxes)
+        np.savez_compressed(path, **columns)
+
+    @classmethod
+    def load(cls, path: str) -> 'DetectionLog':
+        with np.load(path, allow_pickle=False) as data:
+            version = int(data['version'])
+            if version != LOG_VERSION:
+                raise ValueError(f"Unsupported detection log version {version} in {path}")
+            ground_truth = 'gt_offsets' in data
+            return cls(
+                timestamps=data['timestamps'],
+                frame_offsets=data['frame_offsets'],
+                boxes=data['boxes'],
+                confidences=data['confidences'],
+                class_ids=data['class_ids'],
+                class_codes=data['class_codes'],
+                class_names=data['class_names'].tolist(),
+                sport=str(data['sport']),
+                gt_offsets=data['gt_offsets'] if ground_truth else None,
+                gt_ids=data['gt_ids'] if ground_truth else None,
+                gt_boxes=data['gt_boxes'] if ground_truth else None
+            )
+
+class DetectionRecorder:
+    """Collects the detection lists given to the tracker, frame by frame"""
+
+    def __init__(self, sport: str = ''):
+        self.sport = sport
+        self._timestamps: List[float] = []
+        self._frames: List[Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]] = []
+        self._ground_truth: List[Tuple[np.ndarray, np.ndarray]] = []
+        self._class_codes: Dict[str, int] = {}
+        self._bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._timestamps)
+
+    def record(self, detections: List[Dict[str, Any]], frame_timestamp: float,
+               ground_truth: Optional[List[Dict[str, Any]]] = None):
+        """
+        Append one frame. ground_truth, if given, is a list of {'id', 'bbox'}
+        for the frame; give it for every frame of a log or for none.
+        """
+        rows = []
+        for det in detections:
+            try:
+                bbox = det['bbox']
+                values = (float(bbox['x1']), float(bbox['y1']), float(bbox['x2']), float(bbox['y2']),
+                          float(det['confidence']), float(det.get('class_id', 0)))
+            except (KeyError, TypeError, ValueError):
+                continue  # The tracker skips malformed detections too
+            code = self._class_codes.setdefault(det.get('class_name', 'unknown'), len(self._class_codes))
+            rows.append((*values, code))
+
+        table = np.array(rows, dtype=np.float64).reshape(-1, 7)
+        frame = (table[:, :4].astype(np.float32), table[:, 4].astype(np.float32),
+                 table[:, 5].astype(np.int32), table[:, 6].astype(np.int32))
+        self._timestamps.append(float(frame_timestamp))
+        self._frames.append(frame)
+        self._bytes += sum(column.nbytes for column in frame)
+
+        if ground_truth is not None:
+            ids = np.array([g['id'] for g in ground_truth], dtype=np.int64)
+            boxes = np.array([[g['bbox']['x1'], g['bbox']['y1'], g['bbox']['x2'], g['bbox']['y2']]
+                              for g in ground_truth], dtype=np.float32).reshape(-1, 4)
+            self._ground_truth.append((ids, boxes))
+            self._bytes += ids.nbytes + boxes.nbytes
+
+    def memory_bytes(self) -> int:
+        return self._bytes
+
+    def _column(self, index: int, dtype, width: Optional[int] = None) -> np.ndarray:
+        shape = (-1, width) if width else (-1,)
+        parts = [frame[index] for frame in self._frames]
+        if not parts:
+            return np.zeros((0, width) if width else 0, dtype=dtype)
+        return np.concatenate(parts).astype(dtype).reshape(shape)
+
+    def to_log(self) -> DetectionLog:
+        counts = [len(frame[0]) for frame in self._frames]
+        log = DetectionLog(
+            timestamps=np.array(self._timestamps, dtype=np.float64),
+            frame_offsets=np.concatenate([[0], np.cumsum(counts)]).astype(np.int64),
+            boxes=self._column(0, np.float32, 4),
+            confidences=self._column(1, np.float32),
+            class_ids=self._column(2, np.int32),
+            class_codes=self._column(3, np.int32),
+            class_names=sorted(self._class_codes, key=self._class_codes.get),
+            sport=self.sport
+        )
+
+        if self._ground_truth:
+            if len(self._ground_truth) != len(self._frames):
+                logger.warning("Ground truth was recorded for only some frames; leaving it out of the log")
+            else:
+                ids, boxes = zip(*self._ground_truth)
+                log.gt_offsets = np.concatenate([[0], np.cumsum([len(i) for i in ids])]).astype(np.int64)
+                log.gt_ids = np.concatenate(ids)
+                log.gt_boxes = np.concatenate(boxes)
+        return log
+
+    def save(self, path: str) -> DetectionLog:
+        log = self.to_log()
+        log.save(path)
+        return log
+
+__all__ = ['LOG_VERSION', 'DetectionLog', 'DetectionRecorder']
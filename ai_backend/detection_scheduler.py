@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+Detection Scheduler - Detect every N frames and propagate tracks in between
+Decides per stream frame whether to run full detection, and moves track boxes
+on skipped frames with optical flow, or kinematics when no frame pair is available
+"""
+
+import os
+import logging
+from dataclasses import dataclass
+from typing import Dict, Any, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from sport_pack_system import sport_pack_loader
+
+logger = logging.getLogger(__name__)
+
+# Reasons reported for running a full detection
+REASON_FIRST_FRAME = 'first_frame'
+REASON_INTERVAL = 'interval'
+REASON_NO_TRACKS = 'no_tracks'
+REASON_LOW_CONFIDENCE = 'low_confidence'
+
+@dataclass
+class DetectionScheduleConfig:
+    """How often full detection runs on a tracked stream"""
+    detection_interval: int = 1          # Frames between detections at slow motion; 1 detects every frame
+    min_track_confidence: float = 0.45   # Detect early once propagated confidence falls below this
+    confidence_decay: float = 0.9        # Confidence multiplier per propagated frame
+    slow_motion: float = 0.05            # Box sizes moved per frame below which the full interval is used
+    fast_motion: float = 0.3             # Box sizes moved per frame at which every frame is detected
+    use_optical_flow: bool = True
+    flow_grid: int = 3                   # Points per box side tracked by optical flow
+    min_flow_points: float = 0.5         # Fraction of points optical flow must follow to trust its shift
+
+    @classmethod
+    def for_sport(cls, sport_name: str) -> 'DetectionScheduleConfig':
+        """Interval from the sport pack, thresholds from EKKALAVYA_TRACK_* variables"""
+        return cls(
+            detection_interval=sport_pack_loader.get_performance_config(sport_name).detection_interval,
+            min_track_confidence=float(os.getenv('EKKALAVYA_TRACK_MIN_CONFIDENCE', 0.45)),
+            confidence_decay=float(os.getenv('EKKALAVYA_TRACK_CONFIDENCE_DECAY', 0.9)),
+            use_optical_flow=os.getenv('EKKALAVYA_TRACK_OPTICAL_FLOW', 'true').lower() not in ('0', 'false', 'no')
+        )
+
+class DetectionScheduler:
+    """
+    Detect/track interleaving for one stream.
+    should_detect() asks for a full detection on the first frame, when no
+    tracks are alive, when the mean track confidence has decayed below
+    min_track_confidence, or once the current interval has elapsed. The
+    interval shrinks from detection_interval towards 1 as tracks move faster
+    relative to their size. propagate() estimates the boxes of a skipped frame.
+    """
+
+    def __init__(self, config: Optional[DetectionScheduleConfig] = None):
+        self.config = config or DetectionScheduleConfig()
+        self.current_interval = self.config.detection_interval
+        self.frames_since_detection: Optional[int] = None
+        self.last_timestamp: Optional[float] = None
+        self._previous_gray: Optional[np.ndarray] = None
+        self.stats = {
+            'frames': 0,
+            'detections': 0,
+            'propagated_frames': 0,
+            'optical_flow_frames': 0,
+            'detection_reasons': {}
+        }
+
+    @property
+    def enabled(self) -> bool:
+        return self.config.detection_interval > 1
+
+    def should_detect(self, track_confidences: List[float]) -> Tuple[bool, Optional[str]]:
+        """Whether the next frame needs a full detection, and why"""
+        if self.frames_since_detection is None:
+            return True, REASON_FIRST_FRAME
+        if not self.enabled or self.frames_since_detection + 1 >= self.current_interval:
+            return True, REASON_INTERVAL
+        if not track_confidences:
+            return True, REASON_NO_TRACKS
+        if float(np.mean(track_confidences)) < self.config.min_track_confidence:
+            return True, REASON_LOW_CONFIDENCE
+        return False, None
+
+    def record_detection(self, reason: str, timestamp: float, image: Optional[np.ndarray],
+                         boxes: np.ndarray, velocities: np.ndarray):
+        """Account for a detected frame and re-plan the interval from the tracks' motion"""
+        self.stats['frames'] += 1
+        self.stats['detections'] += 1
+        reasons = self.stats['detection_reasons']
+        reasons[reason] = reasons.get(reason, 0) + 1
+
+        self.frames_since_detection = 0
+        self.current_interval = self._interval_for_motion(boxes, velocities, timestamp)
+        self.last_timestamp = timestamp
+        self._previous_gray = self._to_gray(image)
+
+    def propagate(self, timestamp: float, image: Optional[np.ndarray], boxes: np.ndarray,
+                  velocities: np.ndarray, accelerations: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Boxes (N, 4 as x1, y1, x2, y2) of the tracks on a skipped frame and a
+        per-track confidence factor, from optical flow between the previous and
+        current frame where it holds, otherwise from velocity and acceleration
+        """
+        dt = max(0.0, timestamp - self.last_timestamp) if self.last_timestamp is not None else 0.0
+        shifts = velocities * dt + 0.5 * accelerations * dt * dt
+        factors = np.full(len(boxes), self.config.confidence_decay)
+
+        gray = self._to_gray(image)
+        if len(boxes) and gray is not None and self._previous_gray is not None \
+                and self._previous_gray.shape == gray.shape:
+            flow_shifts, followed = self._optical_flow_shifts(self._previous_gray, gray, boxes)
+            shifts = np.where(followed[:, None], flow_shifts, shifts)
+            # Tracks optical flow lost are carried by kinematics at a steeper confidence loss
+            factors = np.where(followed, factors, factors * self.config.confidence_decay)
+            self.stats['optical_flow_frames'] += 1
+
+        self.stats['frames'] += 1
+        self.stats['propagated_frames'] += 1
+        self.frames_since_detection += 1
+        self.last_timestamp = timestamp
+        self._previous_gray = gray
+        return boxes + np.tile(shifts, 2), factors
+
+    def _interval_for_motion(self, boxes: np.ndarray, velocities: np.ndarray, timestamp: float) -> int:
+        base = self.config.detection_interval
+        if base <= 1 or not len(boxes):
+            return base
+
+        frame_dt = timestamp - self.last_timestamp if self.last_timestamp is not None else 0.0
+        if frame_dt <= 0:
+            return base
+
+        # Fastest track, in box sizes moved per frame
+        sizes = np.maximum(np.maximum(boxes[:, 2] - boxes[:, 0], boxes[:, 3] - boxes[:, 1]), 1.0)
+        motion = float(np.max(np.hypot(velocities[:, 0], velocities[:, 1]) * frame_dt / sizes))
+
+        span = max(self.config.fast_motion - self.config.slow_motion, 1e-6)
+        speed = min(1.0, max(0.0, (motion - self.config.slow_motion) / span))
+        return max(1, int(round(base - (base - 1) * speed)))
+
+    def _optical_flow_shifts(self, previous: np.ndarray, current: np.ndarray,
+                             boxes: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Median Lucas-Kanade shift of a point grid inside each box, tracked in one call"""
+        grid = self.config.flow_grid
+        steps = (np.arange(grid) + 0.5) / grid * 0.6 + 0.2  # Inner 60% of the box
+        fx, fy = np.meshgrid(steps, steps)
+        fx, fy = fx.ravel(), fy.ravel()
+
+        widths = (boxes[:, 2] - boxes[:, 0])[:, None]
+        heights = (boxes[:, 3] - boxes[:, 1])[:, None]
+        points = np.stack([boxes[:, 0:1] + widths * fx, boxes[:, 1:2] + heights * fy], axis=-1)
+        points = points.reshape(-1, 1, 2).astype(np.float32)
+
+        moved, status, _ = cv2.calcOpticalFlowPyrLK(previous, current, points, None, winSize=(15, 15), maxLevel=2)
+        status = status.reshape(len(boxes), grid * grid).astype(bool)
+        deltas = (moved - points).reshape(len(boxes), grid * grid, 2)
+
+        followed = status.mean(axis=1) >= self.config.min_flow_points
+        shifts = np.zeros((len(boxes), 2))
+        for i in np.flatnonzero(followed):
+            shifts[i] = np.median(deltas[i][status[i]], axis=0)
+        return shifts, followed
+
+    def _to_gray(self, image: Optional[np.ndarray]) -> Optional[np.ndarray]:
+        if image is None or not self.config.use_optical_flow:
+            return None
+        return image if image.ndim == 2 else cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+
+    def reset(self):
+        self.current_interval = self.config.detection_interval
+        self.frames_since_detection = None
+        self.last_timestamp = None
+        self._previous_gray = None
+
+    def memory_bytes(self) -> int:
+        """Bytes held by the previous frame kept for optical flow"""
+        return self._previous_gray.nbytes if self._previous_gray is not None else 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        frames = self.stats['frames']
+        return {
+            'detection_interval': self.config.detection_interval,
+            'current_interval': self.current_interval,
+            'frames': frames,
+            'detections': self.stats['detections'],
+            'propagated_frames': self.stats['propagated_frames'],
+            'optical_flow_frames': self.stats['optical_flow_frames'],
+            'detection_reasons': dict(self.stats['detection_reasons']),
+            'frames_per_detection': frames / self.stats['detections'] if self.stats['detections'] else 0.0
+        }
+
+__all__ = [
+    'DetectionScheduleConfig', 'DetectionScheduler', 'REASON_FIRST_FRAME', 'REASON_INTERVAL',
+    'REASON_NO_TRACKS', 'REASON_LOW_CONFIDENCE'
+]
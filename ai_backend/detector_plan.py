@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Detector Execution Plan - Per-sport selection of the detectors worth running
+Compiles a SportPackConfig into the pose/object detectors, ball colour ranges
+and equipment shape detectors a frame of that sport needs, cached per sport
+"""
+
+import logging
+import threading
+from dataclasses import dataclass, asdict
+from typing import Dict, Any, List, Optional, Tuple
+
+from sport_pack_system import SportPackConfig
+from object_detection_backends import class_thresholds_from_sport_pack
+
+logger = logging.getLogger(__name__)
+
+# Ball colour buckets of the heuristic detector, by the colour_range a pack declares
+BALL_BUCKETS_BY_COLOR = {
+    'orange': 'orange_basketball',
+    'yellow': 'yellow_tennis',
+    'white': 'white_volleyball',
+    'dark': 'soccer_ball',
+    'black': 'soccer_ball'
+}
+
+# Ball buckets by object name when a pack declares no colour_range
+BALL_BUCKETS_BY_NAME = {
+    'basketball': 'orange_basketball',
+    'tennis': 'yellow_tennis',
+    'volleyball': 'white_volleyball',
+    'football': 'soccer_ball',
+    'soccer': 'soccer_ball'
+}
+
+ALL_BALL_BUCKETS = ('orange_basketball', 'yellow_tennis', 'white_volleyball', 'soccer_ball')
+
+# Sport categories played without a ball, for packs that list only generic equipment
+BALL_FREE_CATEGORIES = ('combat', 'aquatic', 'target')
+
+# Equipment shape detectors and the object names in a pack's equipment list that need them
+RACKET_DETECTOR = 'racket'
+HOOP_DETECTOR = 'hoop'
+SHAPE_DETECTOR_OBJECTS = {
+    RACKET_DETECTOR: ('racket', 'racquet', 'paddle'),
+    HOOP_DETECTOR: ('hoop', 'basket_rim')
+}
+
+@dataclass(frozen=True)
+class DetectorExecutionPlan:
+    """Detectors to run on a frame of one sport"""
+    sport: Optional[str]
+    run_pose: bool = True
+    run_objects: bool = True
+    min_pose_complexity: int = 0
+    ball_types: Tuple[str, ...] = ALL_BALL_BUCKETS
+    detect_people: bool = True
+    shape_detectors: Tuple[str, ...] = ()
+    class_thresholds: Tuple[Tuple[str, float], ...] = ()
+
+    @property
+    def class_threshold_map(self) -> Dict[str, float]:
+        return dict(self.class_thresholds)
+
+    def to_dict(self) -> Dict[str, Any]:
+        plan = asdict(self)
+        plan['class_thresholds'] = self.class_threshold_map
+        return plan
+
+# Plan used when no sport is given: every heuristic detector, no equipment shapes
+DEFAULT_PLAN = DetectorExecutionPlan(sport=None)
+
+def _ball_buckets(sport_pack: SportPackConfig) -> Tuple[str, ...]:
+    buckets: List[str] = []
+    unknown_equipment = False
+    for obj in sport_pack.objects:
+        name = obj.name.lower()
+        if obj.type == 'ball':
+            bucket = BALL_BUCKETS_BY_COLOR.get(str(obj.detection_config.get('color_range', '')).lower())
+            if bucket is None:
+                bucket = next((b for key, b in BALL_BUCKETS_BY_NAME.items() if key in name), None)
+            if bucket is None:
+                # A ball of unknown colour may match any bucket
+                return ALL_BALL_BUCKETS
+            if bucket not in buckets:
+                buckets.append(bucket)
+        elif obj.type == 'general':
+            unknown_equipment = True
+
+    # Packs listing only generic equipment keep every bucket unless the sport is played without a ball
+    if not buckets and unknown_equipment and sport_pack.category not in BALL_FREE_CATEGORIES:
+        return ALL_BALL_BUCKETS
+    return tuple(buckets)
+
+def _shape_detectors(sport_pack: SportPackConfig) -> Tuple[str, ...]:
+    names = [obj.name.lower() for obj in sport_pack.objects]
+    return tuple(
+        detector for detector, keywords in SHAPE_DETECTOR_OBJECTS.items()
+        if any(keyword in name for name in names for keyword in keywords)
+    )
+
+def compile_execution_plan(sport_pack: Optional[SportPackConfig]) -> DetectorExecutionPlan:
+    """Decide which detectors a frame of the pack's sport needs"""
+    if sport_pack is None:
+        return DEFAULT_PLAN
+
+    ball_types = _ball_buckets(sport_pack)
+    shape_detectors = _shape_detectors(sport_pack)
+    # Pose follows one athlete; the contour person detector only helps when several are on court
+    detect_people = sport_pack.teams.count * sport_pack.teams.players_per_team > 1
+
+    return DetectorExecutionPlan(
+        sport=sport_pack.sport,
+        run_pose=True,
+        run_objects=bool(sport_pack.objects) and bool(ball_types or detect_people or shape_detectors),
+        min_pose_complexity=sport_pack.performance.min_pose_complexity,
+        ball_types=ball_types,
+        detect_people=detect_people,
+        shape_detectors=shape_detectors,
+        class_thresholds=tuple(sorted(class_thresholds_from_sport_pack(sport_pack).items()))
+    )
+
+class ExecutionPlanCache:
+    """Compiled plans per sport, recompiled when the loader hands out a new pack object"""
+
+    def __init__(self):
+        self._plans: Dict[str, Tuple[SportPackConfig, DetectorExecutionPlan]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, sport_pack: Optional[SportPackConfig]) -> DetectorExecutionPlan:
+        if sport_pack is None:
+            return DEFAULT_PLAN
+
+        cached = self._plans.get(sport_pack.sport)
+        if cached is not None and cached[0] is sport_pack:
+            return cached[1]
+
+        plan = compile_execution_plan(sport_pack)
+        with self._lock:
+            self._plans[sport_pack.sport] = (sport_pack, plan)
+        logger.debug(f"Compiled detector plan for {sport_pack.sport}: {plan}")
+        return plan
+
+    def get_plans(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {sport: plan.to_dict() for sport, (_, plan) in self._plans.items()}
+
+# Global plan cache instance
+execution_plan_cache = ExecutionPlanCache()
+
+__all__ = [
+    'DetectorExecutionPlan', 'DEFAULT_PLAN', 'ALL_BALL_BUCKETS', 'RACKET_DETECTOR', 'HOOP_DETECTOR',
+    'compile_execution_plan', 'ExecutionPlanCache', 'execution_plan_cache'
+]
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Frame Features - Per-frame cache of colour spaces and edge maps
+Lazily computes and memoizes grayscale, HSV, RGB, blurred and edge images so
+every detector working on the same frame shares one conversion of each
+"""
+
+import logging
+import threading
+from typing import Dict, Any, Optional, Tuple, Union
+
+import cv2
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+class FrameFeatures:
+    """
+    Lazily computed representations of one BGR frame.
+    Each representation is computed on first access and reused afterwards;
+    the cache is safe to share between detector threads.
+    """
+
+    def __init__(self, image: np.ndarray):
+        self.image = image
+        self.height, self.width = image.shape[:2]
+        self._cache: Dict[Any, np.ndarray] = {}
+        self._lock = threading.RLock()
+
+    @classmethod
+    def of(cls, image: Union[np.ndarray, 'FrameFeatures']) -> 'FrameFeatures':
+        """Wrap an image, or return existing features unchanged"""
+        return image if isinstance(image, FrameFeatures) else cls(image)
+
+    def _memoize(self, key: Any, compute) -> np.ndarray:
+        cached = self._cache.get(key)
+        if cached is not None:
+            return cached
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is None:
+                cached = compute()
+                self._cache[key] = cached
+            return cached
+
+    @property
+    def gray(self) -> np.ndarray:
+        return self._memoize('gray', lambda: cv2.cvtColor(self.image, cv2.COLOR_BGR2GRAY))
+
+    @property
+    def hsv(self) -> np.ndarray:
+        return self._memoize('hsv', lambda: cv2.cvtColor(self.image, cv2.COLOR_BGR2HSV))
+
+    @property
+    def rgb(self) -> np.ndarray:
+        return self._memoize('rgb', lambda: cv2.cvtColor(self.image, cv2.COLOR_BGR2RGB))
+
+    def blurred_gray(self, kernel_size: int = 5) -> np.ndarray:
+        """Median-blurred grayscale, as used before Hough circle searches"""
+        return self._memoize(('blurred_gray', kernel_size), lambda: cv2.medianBlur(self.gray, kernel_size))
+
+    def edges(self, low: int = 50, high: int = 150, aperture_size: int = 3) -> np.ndarray:
+        """Canny edge map of the grayscale frame"""
+        return self._memoize(
+            ('edges', low, high, aperture_size),
+            lambda: cv2.Canny(self.gray, low, high, apertureSize=aperture_size)
+        )
+
+    def hsv_mask(self, lower: Tuple[int, int, int], upper: Tuple[int, int, int]) -> np.ndarray:
+        """inRange mask over the HSV frame"""
+        lower, upper = tuple(lower), tuple(upper)
+        return self._memoize(
+            ('hsv_mask', lower, upper),
+            lambda: cv2.inRange(self.hsv, np.array(lower), np.array(upper))
+        )
+
+    def hsv_region(self, x1: int, y1: int, x2: int, y2: int) -> np.ndarray:
+        """HSV pixels of a region, sliced from the full-frame conversion"""
+        x1, y1 = max(0, int(x1)), max(0, int(y1))
+        x2, y2 = min(self.width, int(x2)), min(self.height, int(y2))
+        return self.hsv[y1:y2, x1:x2]
+
+    def cached_keys(self) -> list:
+        return list(self._cache.keys())
+
+__all__ = ['FrameFeatures']
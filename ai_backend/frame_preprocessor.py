@@ -0,0 +1,308 @@
+#!/usr/bin/env python3
+"""
+Frame Preprocessor - Reduced decoding, per-detector downscaling and ROI cropping
+Shrinks large uploads to the resolution each detector actually needs and maps
+detector coordinates back to the original frame
+"""
+
+import os
+import logging
+from io import BytesIO
+from dataclasses import dataclass, field
+from typing import Dict, Any, Optional, Set, Tuple, Union
+
+import cv2
+import numpy as np
+from PIL import Image
+
+from custom_exceptions import ValidationError
+from frame_features import FrameFeatures
+
+logger = logging.getLogger(__name__)
+
+# (x1, y1, x2, y2) in original-frame pixels
+RegionOfInterest = Tuple[int, int, int, int]
+
+# cv2 reduced-decode flags by downscale factor (JPEG decodes at 1/2, 1/4, 1/8 in the DCT)
+_REDUCED_DECODE_FLAGS = (
+    (8, cv2.IMREAD_REDUCED_COLOR_8),
+    (4, cv2.IMREAD_REDUCED_COLOR_4),
+    (2, cv2.IMREAD_REDUCED_COLOR_2),
+)
+
+@dataclass
+class FrameTransform:
+    """
+    Maps coordinates in a processed (cropped and/or scaled) image back to the
+    original frame: original = offset + processed / scale
+    """
+    original_width: int
+    original_height: int
+    scale_x: float = 1.0
+    scale_y: float = 1.0
+    offset_x: float = 0.0
+    offset_y: float = 0.0
+
+    @classmethod
+    def identity(cls, width: int, height: int) -> 'FrameTransform':
+        return cls(original_width=width, original_height=height)
+
+    @property
+    def is_identity(self) -> bool:
+        return (self.scale_x == 1.0 and self.scale_y == 1.0 and
+                self.offset_x == 0.0 and self.offset_y == 0.0)
+
+    def crop(self, x1: int, y1: int) -> 'FrameTransform':
+        """Transform after cropping the processed image at (x1, y1)"""
+        return FrameTransform(
+            self.original_width, self.original_height, self.scale_x, self.scale_y,
+            self.offset_x + x1 / self.scale_x, self.offset_y + y1 / self.scale_y
+        )
+
+    def resize(self, factor_x: float, factor_y: float) -> 'FrameTransform':
+        """Transform after resizing the processed image by the given factors"""
+        return FrameTransform(
+            self.original_width, self.original_height, self.scale_x * factor_x, self.scale_y * factor_y,
+            self.offset_x, self.offset_y
+        )
+
+    def point_to_original(self, x: float, y: float) -> Tuple[float, float]:
+        return self.offset_x + x / self.scale_x, self.offset_y + y / self.scale_y
+
+    def boxes_to_original(self, boxes: np.ndarray) -> np.ndarray:
+        """Map (N, 4) x1/y1/x2/y2 boxes from the processed image to the original frame"""
+        scale = np.array([self.scale_x, self.scale_y, self.scale_x, self.scale_y])
+        offset = np.array([self.offset_x, self.offset_y, self.offset_x, self.offset_y])
+        return offset + np.asarray(boxes, dtype=np.float64) / scale
+
+    def boxes_from_original(self, boxes: np.ndarray) -> np.ndarray:
+        """Map (N, 4) x1/y1/x2/y2 boxes from the original frame into the processed image"""
+        scale = np.array([self.scale_x, self.scale_y, self.scale_x, self.scale_y])
+        offset = np.array([self.offset_x, self.offset_y, self.offset_x, self.offset_y])
+        return (np.asarray(boxes, dtype=np.float64) - offset) * scale
+
+    def bbox_to_original(self, bbox: Dict[str, Any]) -> Dict[str, Any]:
+        """Map an x1/y1/x2/y2 pixel bbox dict, keeping any extra keys"""
+        x1, y1 = self.point_to_original(bbox['x1'], bbox['y1'])
+        x2, y2 = self.point_to_original(bbox['x2'], bbox['y2'])
+        mapped = dict(bbox)
+        mapped.update({
+            'x1': int(round(x1)),
+            'y1': int(round(y1)),
+            'x2': int(round(x2)),
+            'y2': int(round(y2)),
+            'width': int(round(x2 - x1)),
+            'height': int(round(y2 - y1))
+        })
+        return mapped
+
+    def area_to_original(self, area: float) -> float:
+        return area / (self.scale_x * self.scale_y)
+
+    def landmarks_to_original(self, landmarks: Dict[str, Dict[str, float]],
+                              processed_width: int, processed_height: int) -> Dict[str, Dict[str, float]]:
+        """Map landmarks normalized to the processed image to landmarks normalized to the original frame"""
+        mapped = {}
+        for name, landmark in landmarks.items():
+            x, y = self.point_to_original(landmark['x'] * processed_width, landmark['y'] * processed_height)
+            mapped[name] = dict(landmark, x=x / self.original_width, y=y / self.original_height)
+        return mapped
+
+@dataclass
+class PreparedFrame:
+    """
+    A decoded frame, the transform from its pixels to the original frame, and an
+    optional ROI. features caches colour conversions of image for every stage
+    that looks at the frame as decoded (detectors at full size, the tracker).
+    """
+    image: np.ndarray
+    transform: FrameTransform
+    roi: Optional[RegionOfInterest] = None
+    features: FrameFeatures = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        self.features = FrameFeatures(self.image)
+
+    @classmethod
+    def from_image(cls, image: np.ndarray, roi: Optional[RegionOfInterest] = None) -> 'PreparedFrame':
+        height, width = image.shape[:2]
+        return cls(image=image, transform=FrameTransform.identity(width, height), roi=roi)
+
+    @classmethod
+    def of(cls, image: Union[np.ndarray, 'PreparedFrame']) -> 'PreparedFrame':
+        """Wrap an original-size image, or return a prepared frame unchanged"""
+        return image if isinstance(image, PreparedFrame) else cls.from_image(image)
+
+@dataclass
+class PreprocessingConfig:
+    """Per-detector target resolutions (longest side in pixels) and ROI settings"""
+    enabled: bool = True
+    max_side: Dict[str, int] = field(default_factory=lambda: {
+        'mediapipe_pose': 640,
+        'yolo_objects': 960
+    })
+    default_max_side: int = 960
+    # Detectors whose input is cropped to the frame's ROI; the ROI follows the
+    # athlete, so object detectors keep the whole frame to find balls and equipment
+    roi_detectors: Set[str] = field(default_factory=lambda: {'mediapipe_pose'})
+    roi_margin: float = 0.25
+    min_roi_fraction: float = 0.2
+
+    @classmethod
+    def from_env(cls) -> 'PreprocessingConfig':
+        """Build config from EKKALAVYA_PREPROCESS_* variables"""
+        config = cls()
+        config.enabled = os.getenv('EKKALAVYA_PREPROCESS_ENABLED', 'true').lower() not in ('0', 'false', 'no')
+        config.max_side['mediapipe_pose'] = int(os.getenv('EKKALAVYA_PREPROCESS_POSE_MAX_SIDE', 640))
+        config.max_side['yolo_objects'] = int(os.getenv('EKKALAVYA_PREPROCESS_OBJECTS_MAX_SIDE', 960))
+        config.roi_margin = float(os.getenv('EKKALAVYA_PREPROCESS_ROI_MARGIN', 0.25))
+        roi_detectors = os.getenv('EKKALAVYA_PREPROCESS_ROI_DETECTORS')
+        if roi_detectors is not None:
+            config.roi_detectors = {key.strip() for key in roi_detectors.split(',') if key.strip()}
+        return config
+
+    def target_side(self, detector_key: str) -> int:
+        return self.max_side.get(detector_key, self.default_max_side)
+
+    def crops_to_roi(self, detector_key: str) -> bool:
+        return detector_key in self.roi_detectors
+
+    @property
+    def decode_side(self) -> int:
+        """Largest resolution any detector needs; decoding never goes below it"""
+        return max([self.default_max_side, *self.max_side.values()])
+
+class FramePreprocessor:
+    """
+    Preprocessing stage in front of the detectors.
+    decode() uses libjpeg's reduced decoding when the upload is far larger than
+    any detector needs; prepare() crops to the ROI for the pose detector and
+    downscales to the detector's target size. Every step is recorded in a
+    FrameTransform so results can be mapped back to original-frame coordinates.
+    """
+
+    def __init__(self, config: Optional[PreprocessingConfig] = None):
+        self.config = config or PreprocessingConfig.from_env()
+
+    def decode(self, data: Union[bytes, memoryview],
+               roi: Optional[RegionOfInterest] = None) -> Optional[PreparedFrame]:
+        """Decode encoded image bytes, at reduced resolution when possible; None if undecodable"""
+        buffer = np.frombuffer(data, np.uint8)
+        original_size = self._read_image_size(data) if self.config.enabled else None
+
+        flag, factor = cv2.IMREAD_COLOR, 1
+        if original_size is not None:
+            longest = max(original_size)
+            for candidate, reduced_flag in _REDUCED_DECODE_FLAGS:
+                if longest / candidate >= self.config.decode_side:
+                    flag, factor = reduced_flag, candidate
+                    break
+
+        image = cv2.imdecode(buffer, flag)
+        if image is None:
+            return None
+
+        height, width = image.shape[:2]
+        if factor == 1 or original_size is None:
+            return PreparedFrame.from_image(image, roi)
+
+        original_width, original_height = original_size
+        if (width > height) != (original_width > original_height):
+            # imdecode applied an EXIF rotation the header size does not reflect
+            original_width, original_height = original_height, original_width
+        transform = FrameTransform.identity(original_width, original_height).resize(
+            width / original_width, height / original_height
+        )
+        return PreparedFrame(image=image, transform=transform, roi=roi)
+
+    def _read_image_size(self, data: Union[bytes, memoryview]) -> Optional[Tuple[int, int]]:
+        """Read (width, height) from the image header without decoding pixels"""
+        try:
+            with Image.open(BytesIO(data)) as header:
+                if header.format != 'JPEG':
+                    return None  # Reduced decoding only skips work for JPEG
+                return header.size
+        except Exception:
+            return None
+
+    def prepare(self, frame: PreparedFrame, detector_key: str) -> Tuple[np.ndarray, FrameTransform]:
+        """Crop to the frame's ROI (for ROI detectors only) and downscale to the detector's target size"""
+        image, transform = frame.image, frame.transform
+        if not self.config.enabled:
+            return image, transform
+
+        if frame.roi is not None and self.config.crops_to_roi(detector_key):
+            image, transform = self._crop_to_roi(image, transform, frame.roi)
+
+        height, width = image.shape[:2]
+        factor = self.config.target_side(detector_key) / max(height, width)
+        if factor < 1.0:
+            new_width, new_height = max(1, int(round(width * factor))), max(1, int(round(height * factor)))
+            image = cv2.resize(image, (new_width, new_height), interpolation=cv2.INTER_AREA)
+            transform = transform.resize(new_width / width, new_height / height)
+
+        return image, transform
+
+    def _crop_to_roi(self, image: np.ndarray, transform: FrameTransform,
+                     roi: RegionOfInterest) -> Tuple[np.ndarray, FrameTransform]:
+        height, width = image.shape[:2]
+
+        # ROI is in original-frame pixels; bring it into this image and add a margin
+        x1 = (roi[0] - transform.offset_x) * transform.scale_x
+        y1 = (roi[1] - transform.offset_y) * transform.scale_y
+        x2 = (roi[2] - transform.offset_x) * transform.scale_x
+        y2 = (roi[3] - transform.offset_y) * transform.scale_y
+        margin_x = (x2 - x1) * self.config.roi_margin
+        margin_y = (y2 - y1) * self.config.roi_margin
+        x1, y1 = max(0, int(x1 - margin_x)), max(0, int(y1 - margin_y))
+        x2, y2 = min(width, int(x2 + margin_x)), min(height, int(y2 + margin_y))
+
+        # Degenerate or tiny ROIs (lost subject) fall back to the whole frame
+        if (x2 - x1) < width * self.config.min_roi_fraction or (y2 - y1) < height * self.config.min_roi_fraction:
+            return image, transform
+
+        return image[y1:y2, x1:x2], transform.crop(x1, y1)
+
+def pose_bounding_box(landmarks: Optional[Dict[str, Dict[str, float]]],
+                      width: int,
+                      height: int,
+                      min_visibility: float = 0.5) -> Optional[RegionOfInterest]:
+    """Pixel bounding box of visible pose landmarks (normalized to a width x height frame), for the next frame's ROI"""
+    if not landmarks:
+        return None
+
+    points = [(lm['x'], lm['y']) for lm in landmarks.values() if lm.get('visibility', 1.0) >= min_visibility]
+    if not points:
+        return None
+
+    xs, ys = zip(*points)
+    return (
+        max(0, int(min(xs) * width)),
+        max(0, int(min(ys) * height)),
+        min(width, int(max(xs) * width)),
+        min(height, int(max(ys) * height))
+    )
+
+def parse_roi(value: Optional[str]) -> Optional[RegionOfInterest]:
+    """Parse an 'x1,y1,x2,y2' query parameter"""
+    if not value:
+        return None
+    try:
+        x1, y1, x2, y2 = (int(float(part)) for part in value.split(','))
+    except ValueError:
+        x1 = y1 = x2 = y2 = 0
+    if x2 <= x1 or y2 <= y1:
+        raise ValidationError(
+            "ROI must be 'x1,y1,x2,y2' with x2 > x1 and y2 > y1",
+            "INVALID_ROI",
+            {"roi": value}
+        )
+    return x1, y1, x2, y2
+
+# Global preprocessor instance
+frame_preprocessor = FramePreprocessor()
+
+__all__ = [
+    'RegionOfInterest', 'FrameTransform', 'PreparedFrame', 'PreprocessingConfig', 'FramePreprocessor',
+    'pose_bounding_box', 'parse_roi', 'frame_preprocessor'
+]
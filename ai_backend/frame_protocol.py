@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Binary Frame Protocol - Compact WebSocket frame format for realtime analysis
+A fixed 64-byte header (sport, analysis type, sequence number, capture
+timestamp) followed by raw JPEG/WebP bytes, decoded straight into a NumPy
+image without base64 or JSON
+"""
+
+import struct
+import logging
+from dataclasses import dataclass
+from typing import Optional, Union
+
+import cv2
+import numpy as np
+from fastapi import WebSocket, WebSocketDisconnect
+
+from custom_exceptions import ValidationError
+
+logger = logging.getLogger(__name__)
+
+FRAME_MAGIC = b'EK'
+FRAME_PROTOCOL_VERSION = 1
+
+# magic, version, flags, sequence, timestamp, sport, analysis_type (little-endian, 64 bytes)
+FRAME_HEADER = struct.Struct('<2sBBId24s24s')
+FRAME_HEADER_SIZE = FRAME_HEADER.size
+
+@dataclass
+class BinaryFrame:
+    """One binary realtime frame: header fields plus the encoded image bytes"""
+    sport: str
+    analysis_type: str
+    sequence: int
+    timestamp: float
+    payload: memoryview
+    flags: int = 0
+
+    def decode_image(self) -> Optional[np.ndarray]:
+        """Decode the JPEG/WebP payload to a BGR image"""
+        return decode_frame_image(self.payload)
+
+def _decode_field(raw: bytes) -> str:
+    return raw.rstrip(b'\x00').decode('utf-8', errors='replace')
+
+def _encode_field(value: str, name: str) -> bytes:
+    encoded = value.encode('utf-8')
+    if len(encoded) > 24:
+        raise ValidationError(
+            f"Frame header field '{name}' exceeds 24 bytes",
+            "INVALID_FRAME_HEADER",
+            {"field": name, "value": value}
+        )
+    return encoded
+
+def parse_binary_frame(message: bytes) -> BinaryFrame:
+    """Parse a binary WebSocket message into header fields and a zero-copy payload view"""
+    if len(message) <= FRAME_HEADER_SIZE:
+        raise ValidationError(
+            "Binary frame is shorter than its header",
+            "INVALID_FRAME_HEADER",
+            {"message_size": len(message), "header_size": FRAME_HEADER_SIZE}
+        )
+
+    magic, version, flags, sequence, timestamp, sport, analysis_type = FRAME_HEADER.unpack_from(message)
+    if magic != FRAME_MAGIC or version != FRAME_PROTOCOL_VERSION:
+        raise ValidationError(
+            "Unsupported binary frame format",
+            "INVALID_FRAME_HEADER",
+            {"magic": magic.hex(), "version": version, "expected_version": FRAME_PROTOCOL_VERSION}
+        )
+
+    return BinaryFrame(
+        sport=_decode_field(sport) or 'basketball',
+        analysis_type=_decode_field(analysis_type) or 'general',
+        sequence=sequence,
+        timestamp=timestamp,
+        payload=memoryview(message)[FRAME_HEADER_SIZE:],
+        flags=flags
+    )
+
+def encode_binary_frame(image_bytes: bytes,
+                        sport: str,
+                        analysis_type: str = 'general',
+                        sequence: int = 0,
+                        timestamp: float = 0.0,
+                        flags: int = 0) -> bytes:
+    """Build a binary frame message (reference encoder for clients and tools)"""
+    header = FRAME_HEADER.pack(
+        FRAME_MAGIC, FRAME_PROTOCOL_VERSION, flags, sequence & 0xFFFFFFFF, timestamp,
+        _encode_field(sport, 'sport'), _encode_field(analysis_type, 'analysis_type')
+    )
+    return header + bytes(image_bytes)
+
+def decode_frame_image(data: Union[bytes, memoryview]) -> Optional[np.ndarray]:
+    """Decode encoded image bytes to BGR without intermediate copies"""
+    return cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_COLOR)
+
+async def receive_frame_message(websocket: WebSocket) -> Union[BinaryFrame, str]:
+    """
+    Receive the next realtime message.
+    Binary messages are parsed as BinaryFrame; text messages are returned
+    unchanged for the legacy base64-in-JSON path.
+    """
+    message = await websocket.receive()
+    if message['type'] == 'websocket.disconnect':
+        raise WebSocketDisconnect(message.get('code', 1000))
+
+    if message.get('bytes') is not None:
+        return parse_binary_frame(message['bytes'])
+    return message.get('text') or ''
+
+__all__ = [
+    'BinaryFrame', 'FRAME_HEADER', 'FRAME_HEADER_SIZE', 'FRAME_MAGIC', 'FRAME_PROTOCOL_VERSION',
+    'parse_binary_frame', 'encode_binary_frame', 'decode_frame_image', 'receive_frame_message'
+]
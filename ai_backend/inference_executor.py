@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+Inference Executor - Non-blocking execution of CPU-bound analysis work
+Runs MediaPipe, OpenCV detection and tracking off the asyncio event loop on a
+bounded worker pool sized from the CPU count, with queue backpressure
+"""
+
+import os
+import asyncio
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, Future
+from dataclasses import dataclass
+from typing import Dict, Any, Callable, Optional
+
+from custom_exceptions import InferenceOverloadError
+
+logger = logging.getLogger(__name__)
+
+def _env_int(name: str, default: int, minimum: int = 1) -> int:
+    """Read a positive integer from the environment, falling back to default"""
+    raw = os.getenv(name)
+    if raw is None or raw.strip() == "":
+        return default
+    try:
+        return max(minimum, int(raw))
+    except ValueError:
+        logger.warning(f"Invalid value for {name}: {raw!r}, using {default}")
+        return default
+
+@dataclass
+class InferenceExecutorConfig:
+    """Sizing of the inference worker pool and its waiting queue"""
+    max_workers: int
+    max_queue_size: int
+    retry_after_seconds: int = 1
+    background_timeout_seconds: int = 300
+
+    @classmethod
+    def from_env(cls) -> 'InferenceExecutorConfig':
+        """Build config from EKKALAVYA_INFERENCE_* variables, defaulting to one worker per core"""
+        workers = _env_int('EKKALAVYA_INFERENCE_WORKERS', os.cpu_count() or 1)
+        return cls(
+            max_workers=workers,
+            max_queue_size=_env_int('EKKALAVYA_INFERENCE_QUEUE_SIZE', workers * 4, minimum=0),
+            retry_after_seconds=_env_int('EKKALAVYA_INFERENCE_RETRY_AFTER', 1),
+            background_timeout_seconds=_env_int('EKKALAVYA_INFERENCE_BACKGROUND_TIMEOUT', 300)
+        )
+
+class InferenceExecutor:
+    """
+    Bounded thread pool for CPU-bound inference.
+    MediaPipe and OpenCV release the GIL inside native code, so threads scale
+    with cores while sharing the already-loaded models. Work beyond
+    max_workers + max_queue_size is rejected with InferenceOverloadError
+    instead of queueing without bound. Background work (queued video jobs)
+    is only admitted while a worker is idle, so it never queues ahead of
+    requests.
+    """
+
+    def __init__(self, config: Optional[InferenceExecutorConfig] = None):
+        self.config = config or InferenceExecutorConfig.from_env()
+        self.executor = ThreadPoolExecutor(
+            max_workers=self.config.max_workers,
+            thread_name_prefix='inference'
+        )
+        self.capacity = self.config.max_workers + self.config.max_queue_size
+        self._slots = threading.BoundedSemaphore(self.capacity)
+        self._shutdown_event = threading.Event()
+        self._stats_lock = threading.Lock()
+        self.stats = {
+            'submitted': 0,
+            'completed': 0,
+            'failed': 0,
+            'rejected': 0,
+            'background_deferred': 0,
+            'in_flight': 0,
+            'running': 0,
+            'average_wait_ms': 0.0,
+            'average_run_ms': 0.0
+        }
+
+        logger.info(f"Inference executor started with {self.config.max_workers} workers, "
+                    f"queue size {self.config.max_queue_size}")
+
+    def submit(self, fn: Callable, *args, **kwargs) -> Future:
+        """Submit work to the pool, raising InferenceOverloadError when the queue is full"""
+        if not self._slots.acquire(blocking=False):
+            with self._stats_lock:
+                self.stats['rejected'] += 1
+            raise InferenceOverloadError(
+                "Inference queue is full, retry later",
+                error_code="INFERENCE_OVERLOADED",
+                context={
+                    'capacity': self.capacity,
+                    'retry_after_seconds': self.config.retry_after_seconds
+                }
+            )
+
+        with self._stats_lock:
+            self.stats['submitted'] += 1
+            self.stats['in_flight'] += 1
+        return self._submit_admitted(fn, args, kwargs)
+
+    def submit_background(self, fn: Callable, *args, **kwargs) -> Future:
+        """Submit low-priority work, raising InferenceOverloadError unless a worker is idle"""
+        with self._stats_lock:
+            admitted = (self.stats['in_flight'] < self.config.max_workers
+                        and self._slots.acquire(blocking=False))
+            if admitted:
+                self.stats['submitted'] += 1
+                self.stats['in_flight'] += 1
+            else:
+                self.stats['background_deferred'] += 1
+        if not admitted:
+            raise InferenceOverloadError(
+                "No idle inference worker for background work",
+                error_code="INFERENCE_BUSY",
+                context={'max_workers': self.config.max_workers, 'retry_after_seconds': 1}
+            )
+        return self._submit_admitted(fn, args, kwargs)
+
+    def run_background(self, fn: Callable, *args,
+                       stop_event: Optional[threading.Event] = None,
+                       timeout: Optional[float] = None, **kwargs) -> Any:
+        """
+        Block until fn(*args, **kwargs) has run on the pool as background work, waiting out busy
+        periods. Gives up with InferenceOverloadError once stop_event is set, the executor shuts
+        down, or no worker became idle within timeout seconds (background_timeout_seconds by default).
+        """
+        timeout = self.config.background_timeout_seconds if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+        waiter = stop_event or self._shutdown_event
+        delay = 0.05
+        while True:
+            if self._shutdown_event.is_set() or (stop_event is not None and stop_event.is_set()):
+                raise InferenceOverloadError(
+                    "Background work cancelled",
+                    error_code="INFERENCE_STOPPED",
+                    context={'retry_after_seconds': self.config.retry_after_seconds}
+                )
+            try:
+                future = self.submit_background(fn, *args, **kwargs)
+            except InferenceOverloadError:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise InferenceOverloadError(
+                        "No idle inference worker for background work",
+                        error_code="INFERENCE_BACKGROUND_TIMEOUT",
+                        context={'timeout_seconds': timeout,
+                                 'retry_after_seconds': self.config.retry_after_seconds}
+                    )
+                waiter.wait(min(delay, remaining))
+                delay = min(delay * 2, 1.0)
+                continue
+            return future.result()
+
+    def _submit_admitted(self, fn: Callable, args: tuple, kwargs: dict) -> Future:
+        """Hand admitted work to the pool; the caller already holds a slot"""
+        try:
+            future = self.executor.submit(self._run_task, time.perf_counter(), fn, args, kwargs)
+        except Exception:
+            self._release_slot()
+            raise
+
+        future.add_done_callback(lambda _: self._release_slot())
+        return future
+
+    async def run(self, fn: Callable, *args, **kwargs) -> Any:
+        """Await fn(*args, **kwargs) on the pool without blocking the event loop"""
+        return await asyncio.wrap_future(self.submit(fn, *args, **kwargs))
+
+    def _run_task(self, enqueued_at: float, fn: Callable, args: tuple, kwargs: dict) -> Any:
+        """Execute one unit of work and record queue wait and run time"""
+        started_at = time.perf_counter()
+        with self._stats_lock:
+            self.stats['running'] += 1
+            self._update_average('average_wait_ms', (started_at - enqueued_at) * 1000)
+
+        success = False
+        try:
+            result = fn(*args, **kwargs)
+            success = True
+            return result
+        finally:
+            with self._stats_lock:
+                self.stats['running'] -= 1
+                self.stats['completed' if success else 'failed'] += 1
+                self._update_average('average_run_ms', (time.perf_counter() - started_at) * 1000)
+
+    def _update_average(self, key: str, value: float) -> None:
+        """Exponential moving average, caller must hold the stats lock"""
+        alpha = 0.1
+        self.stats[key] = (1 - alpha) * self.stats[key] + alpha * value
+
+    def _release_slot(self) -> None:
+        with self._stats_lock:
+            self.stats['in_flight'] -= 1
+        self._slots.release()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Snapshot of pool sizing and load"""
+        with self._stats_lock:
+            stats = dict(self.stats)
+        stats['queued'] = max(0, stats['in_flight'] - stats['running'])
+        stats['max_workers'] = self.config.max_workers
+        stats['max_queue_size'] = self.config.max_queue_size
+        stats['capacity'] = self.capacity
+        return stats
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop accepting work, cancel background waits and release worker threads"""
+        self._shutdown_event.set()
+        self.executor.shutdown(wait=wait)
+        logger.info("Inference executor shut down")
+
+# Global executor instance
+inference_executor = InferenceExecutor()
+
+__all__ = ['InferenceExecutor', 'InferenceExecutorConfig', 'inference_executor']
@@ -12,16 +12,16 @@ import mediapipe as mp
 import random
 import math
 import time
-from fastapi import FastAPI, File, UploadFile, HTTPException, WebSocket
+import uuid
+import threading
+from fastapi import FastAPI, File, UploadFile, HTTPException, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Callable
 import logging
 import asyncio
 from datetime import datetime
 import base64
-from io import BytesIO
-from PIL import Image
 
 # Import Sport Pack System
 from sport_pack_system import (
@@ -55,9 +55,39 @@ from basketball_value_model import (
 # Import Custom Exceptions for Enhanced Error Handling
 from custom_exceptions import (
     EkkalavyaBaseError, AnalysisError, InvalidSportError, InvalidImageError,
-    PoseDetectionError, ValidationError, CalculationError, VideoProcessingError
+    PoseDetectionError, ValidationError, CalculationError, VideoProcessingError,
+    InferenceOverloadError
 )
 
+# Import Inference Executor and Pose Graph Pool
+from inference_executor import inference_executor
+from pose_graph_pool import (
+    PoseSessionRegistry, get_pose_graph_pool, warm_up_pose_graph_pools,
+    get_pose_graph_pool_stats
+)
+from adaptive_complexity import pose_complexity_controller
+
+# Import Binary Frame Protocol
+from frame_protocol import BinaryFrame, decode_frame_image, receive_frame_message
+
+# Import Realtime Frame Scheduler
+from realtime_scheduler import LatestFrameScheduler, ScheduledFrame, run_latest_frame_loop
+
+# Import Streaming Video Pipeline
+from video_pipeline import (
+    video_analysis_pipeline, save_upload_to_tempfile, aggregate_frame_results,
+    build_sampling_config, SamplingConfig, VideoProgress, MAX_VIDEO_UPLOAD_BYTES
+)
+
+# Import Frame Preprocessor
+from frame_preprocessor import frame_preprocessor, pose_bounding_box, parse_roi
+
+# Import Frame Feature Cache
+from frame_features import FrameFeatures
+
+# Import Video Job Queue
+from video_job_queue import VideoJob, VideoJobQueue
+
 # Import Dynamic Overlay Renderer
 from dynamic_overlay_renderer import (
     DynamicOverlayRenderer, SportOverlay, OverlayElement, OverlayType,
@@ -80,7 +110,7 @@ from unity_ar_bridge import (
 # Import Multi-Object Tracker
 from multi_object_tracker import (
     MultiObjectTracker, ByteTracker, SportTrack, Detection, BoundingBox,
-    TrackState, ObjectCategory, get_tracker
+    TrackState, ObjectCategory, get_tracker, find_tracker, tracker_registry
 )
 
 # Import Sport-Specific Detectors
@@ -105,9 +135,6 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Global multi-object tracker dictionary
-multi_object_trackers: Dict[str, Any] = {}
-
 # Initialize MediaPipe solutions with proper type handling
 try:
     import mediapipe as mp
@@ -433,6 +460,8 @@ class AnalysisResult(BaseModel):
     joint_angles: Dict[str, float]
     recommendations: List[str]
     timestamp: str
+    pose_inferences: int = 0
+    pose_model_complexity: Optional[int] = None
 
 # Sport Pack API Models
 class SportPackListResponse(BaseModel):
@@ -463,6 +492,7 @@ class DetectionResultResponse(BaseModel):
     fps: float
     pose_detected: bool = False
     objects_detected: int = 0
+    model_complexity: Optional[int] = None
     sport_context: Optional[Dict[str, Any]] = None
 
 class UnifiedAnalysisResponse(BaseModel):
@@ -479,16 +509,19 @@ class UnifiedAnalysisResponse(BaseModel):
 class BiomechanicalAnalyzer:
     """Real biomechanical analysis using MediaPipe pose detection"""
     
+    POSE_MODEL_COMPLEXITY = 2
+    
     def __init__(self):
+        self._pose_session_registries: Dict[int, PoseSessionRegistry] = {}
+        self._pose_session_lock = threading.Lock()
         if mp_pose is not None:
-            self.pose_detector = mp_pose.Pose(
-                static_image_mode=True,
-                model_complexity=2,
-                enable_segmentation=True,
-                min_detection_confidence=0.5
-            )
+            # One static-image graph per concurrent inference worker
+            self.pose_pool = self._pose_pool(self.POSE_MODEL_COMPLEXITY)
+            # Video-mode graphs pinned to streaming sessions (WebSocket, AR)
+            self.pose_sessions = self._pose_session_registry(self.POSE_MODEL_COMPLEXITY)
         else:
-            self.pose_detector = None
+            self.pose_pool = None
+            self.pose_sessions = None
             
         if mp_hands is not None:
             self.hands_detector = mp_hands.Hands(
@@ -513,17 +546,61 @@ class BiomechanicalAnalyzer:
             
         return angle
     
-    def extract_pose_landmarks(self, image):
-        """Extract pose landmarks from image"""
-        if self.pose_detector is None:
+    def _pose_pool(self, model_complexity: int):
+        return get_pose_graph_pool(
+            model_complexity=model_complexity,
+            enable_segmentation=True,
+            min_detection_confidence=0.5
+        )
+    
+    def _pose_session_registry(self, model_complexity: int) -> PoseSessionRegistry:
+        with self._pose_session_lock:
+            registry = self._pose_session_registries.get(model_complexity)
+            if registry is None:
+                registry = PoseSessionRegistry(
+                    model_complexity=model_complexity,
+                    enable_segmentation=True,
+                    min_detection_confidence=0.5
+                )
+                self._pose_session_registries[model_complexity] = registry
+            return registry
+    
+    def pose_complexity_for(self, sport: Optional[str]) -> int:
+        """Pose model complexity for the current load, kept at or above the sport's floor"""
+        return pose_complexity_controller.select_for_sport(sport, ceiling=self.POSE_MODEL_COMPLEXITY)
+    
+    def release_pose_session(self, session_id: str):
+        """Release a streaming session's tracking graphs at every complexity"""
+        with self._pose_session_lock:
+            registries = list(self._pose_session_registries.values())
+        for registry in registries:
+            registry.release(session_id)
+    
+    def get_pose_session_stats(self) -> Dict[int, Dict[str, Any]]:
+        with self._pose_session_lock:
+            registries = dict(self._pose_session_registries)
+        return {complexity: registry.get_stats() for complexity, registry in registries.items()}
+    
+    def extract_pose_landmarks(self, image, session_id: Optional[str] = None,
+                               model_complexity: Optional[int] = None):
+        """Extract pose landmarks from image, using the session's tracking graph if given"""
+        if self.pose_pool is None:
             return {
                 'error': 'pose_detector_unavailable',
                 'message': 'MediaPipe pose detector not available',
                 'fallback_analysis': True
             }
+        
+        if model_complexity is None:
+            model_complexity = self.POSE_MODEL_COMPLEXITY
             
         rgb_image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
-        results = self.pose_detector.process(rgb_image)
+        start_time = time.time()
+        if session_id is not None:
+            results = self._pose_session_registry(model_complexity).process(session_id, rgb_image)
+        else:
+            results = self._pose_pool(model_complexity).process(rgb_image)
+        pose_complexity_controller.observe(model_complexity, (time.time() - start_time) * 1000)
         
         if results.pose_landmarks and mp_pose is not None:
             landmarks = {}
@@ -663,10 +740,17 @@ class BiomechanicalAnalyzer:
             'feedback': feedback
         }
     
-    def analyze_sport_specific(self, image, sport, analysis_type):
+    def analyze_sport_specific(self, image, sport, analysis_type, session_id: Optional[str] = None):
         """Analyze sport-specific biomechanics"""
-        landmarks = self.extract_pose_landmarks(image)
-        
+        model_complexity = self.pose_complexity_for(sport)
+        landmarks = self.extract_pose_landmarks(image, session_id, model_complexity)
+        result = self.analyze_landmarks(landmarks, sport, analysis_type)
+        if result is not None:
+            result['pose_model_complexity'] = model_complexity
+        return result
+    
+    def analyze_landmarks(self, landmarks, sport, analysis_type):
+        """Dispatch already-extracted landmarks to the sport-specific analysis"""
         if sport == "basketball":
             return self.analyze_basketball_shooting(landmarks)
         elif sport == "archery":
@@ -936,9 +1020,92 @@ class BiomechanicalAnalyzer:
             'feedback': feedback
         }
 
+class PoseAnalysisContext:
+    """Per-request analysis context that runs pose inference at most once.
+    
+    The sport analyzer, joint-angle builder and biomechanics/physics blocks all
+    read the same landmarks, so a request pays for a single MediaPipe pass.
+    """
+    
+    def __init__(self, analyzer: 'BiomechanicalAnalyzer', image: np.ndarray,
+                 session_id: Optional[str] = None, sport: Optional[str] = None):
+        self.analyzer = analyzer
+        self.image = image
+        self.session_id = session_id
+        self.sport = sport
+        self.pose_inferences = 0
+        self.model_complexity: Optional[int] = None
+        self._landmarks: Optional[Dict[str, Any]] = None
+    
+    @property
+    def landmarks(self) -> Dict[str, Any]:
+        """Pose landmarks for the image, extracted on first access"""
+        if self._landmarks is None:
+            self.model_complexity = self.analyzer.pose_complexity_for(self.sport)
+            self._landmarks = self.analyzer.extract_pose_landmarks(
+                self.image, self.session_id, self.model_complexity
+            )
+            self.pose_inferences += 1
+        return self._landmarks
+    
+    @property
+    def pose_detected(self) -> bool:
+        """Whether inference produced real landmarks rather than a fallback"""
+        return bool(self.landmarks) and 'error' not in self.landmarks
+    
+    def analyze_sport_specific(self, sport: str, analysis_type: str) -> Dict[str, Any]:
+        """Sport-specific analysis on the shared landmarks"""
+        return self.analyzer.analyze_landmarks(self.landmarks, sport, analysis_type)
+    
+    def joint_angles(self, sport: str) -> Dict[str, float]:
+        """Key joint angles for the sport from the shared landmarks"""
+        joint_angles = {}
+        landmarks = self.landmarks
+        
+        if landmarks:
+            sport_config = SPORTS_CONFIG.get(sport, {})
+            for joint in sport_config.get("key_joints", []):
+                if joint in landmarks:
+                    joint_angles[joint] = landmarks[joint]['y'] * 180  # Convert to angle
+        
+        return joint_angles
+
 # Initialize analyzer
 analyzer = BiomechanicalAnalyzer()
 
+async def run_inference(fn, *args, **kwargs):
+    """Run CPU-bound work on the inference executor, mapping overload to HTTP 503"""
+    try:
+        return await inference_executor.run(fn, *args, **kwargs)
+    except InferenceOverloadError as e:
+        raise HTTPException(
+            status_code=503,
+            detail=e.to_dict(),
+            headers={"Retry-After": str(e.context.get('retry_after_seconds', 1))}
+        )
+
+@app.on_event("startup")
+async def warm_up_inference():
+    """Load pose graphs before the first request so it does not pay model start-up"""
+    if os.getenv('EKKALAVYA_POSE_POOL_WARMUP', 'true').lower() not in ('0', 'false', 'no'):
+        try:
+            graphs = await asyncio.get_running_loop().run_in_executor(None, warm_up_pose_graph_pools)
+            logger.info(f"Pose graph pools ready ({graphs} graphs warmed up)")
+        except Exception as e:
+            logger.warning(f"Pose graph warm-up failed: {str(e)}")
+
+@app.on_event("startup")
+async def calibrate_model_variants():
+    """Time each pose/object model variant on this CPU so sport latency budgets can pick between them"""
+    if os.getenv('EKKALAVYA_MODEL_CALIBRATION', 'true').lower() not in ('0', 'false', 'no'):
+        runs = int(os.getenv('EKKALAVYA_MODEL_CALIBRATION_RUNS', 3))
+        try:
+            await asyncio.get_running_loop().run_in_executor(
+                None, lambda: unified_cv_pipeline.calibrate_model_variants(runs=runs)
+            )
+        except Exception as e:
+            logger.warning(f"Model variant calibration failed: {str(e)}")
+
 @app.get("/health")
 async def health_check():
     return {"status": "healthy", "service": "Ekkalavya Sports AI Backend"}
@@ -963,7 +1130,7 @@ async def analyze_technique(
         # Read and process image
         contents = await file.read()
         nparr = np.frombuffer(contents, np.uint8)
-        image = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
+        image = await run_inference(cv2.imdecode, nparr, cv2.IMREAD_COLOR)
         
         if image is None:
             error = InvalidImageError(
@@ -973,8 +1140,9 @@ async def analyze_technique(
             )
             raise HTTPException(status_code=400, detail=error.to_dict())
         
-        # Perform analysis
-        analysis_result = analyzer.analyze_sport_specific(image, sport, analysis_type)
+        # Perform analysis (single pose inference shared across the request)
+        context = PoseAnalysisContext(analyzer, image, sport=sport)
+        analysis_result = await run_inference(context.analyze_sport_specific, sport, analysis_type)
         
         if analysis_result is None:
             error = PoseDetectionError(
@@ -984,15 +1152,8 @@ async def analyze_technique(
             )
             raise HTTPException(status_code=422, detail=error.to_dict())
         
-        # Extract landmarks for joint angles
-        landmarks = analyzer.extract_pose_landmarks(image)
-        joint_angles = {}
-        
-        if landmarks:
-            sport_config = SPORTS_CONFIG[sport]
-            for joint in sport_config["key_joints"]:
-                if joint in landmarks:
-                    joint_angles[joint] = landmarks[joint]['y'] * 180  # Convert to angle
+        # Joint angles from the landmarks already extracted above
+        joint_angles = context.joint_angles(sport)
         
         # Generate recommendations based on analysis
         recommendations = []
@@ -1017,113 +1178,319 @@ async def analyze_technique(
             feedback=analysis_result.get('feedback', []),
             joint_angles=joint_angles,
             recommendations=recommendations,
-            timestamp=datetime.now().isoformat()
+            timestamp=datetime.now().isoformat(),
+            pose_inferences=context.pose_inferences,
+            pose_model_complexity=context.model_complexity
         )
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Analysis error: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Analysis failed: {str(e)}")
 
+def analyze_video_file(video_path: str,
+                       sport: str,
+                       analysis_type: str,
+                       sampling_config: SamplingConfig,
+                       progress_callback: Optional[Callable[[VideoProgress], None]] = None,
+                       background: bool = False,
+                       stop_event: Optional[threading.Event] = None) -> Dict[str, Any]:
+    """
+    Analyze sampled frames of a video file and aggregate them into a clip summary.
+    With background=True each frame runs on the inference executor as background
+    work, so queued jobs only use workers that requests leave idle; setting
+    stop_event abandons the wait for a worker.
+    """
+    def analyze_frame(frame: np.ndarray) -> Optional[Dict[str, Any]]:
+        if background:
+            return inference_executor.run_background(analyzer.analyze_sport_specific, frame, sport, analysis_type,
+                                                     stop_event=stop_event)
+        return analyzer.analyze_sport_specific(frame, sport, analysis_type)
+    
+    video_result = video_analysis_pipeline.run(video_path, analyze_frame, sampling_config, progress_callback)
+    if not video_result.frame_results:
+        raise VideoProcessingError("Could not analyze video frames", "NO_FRAMES_ANALYZED", video_result.to_dict())
+    
+    # Aggregate results over the whole clip
+    summary = aggregate_frame_results(video_result)
+    
+    return {
+        "sport": sport,
+        "analysis_type": analysis_type,
+        "average_score": summary['average_score'],
+        "frame_count": summary['frame_count'],
+        "feedback": summary['feedback'],
+        "score_range": {
+            "min": summary['min_score'],
+            "max": summary['max_score'],
+            "std": summary['score_std']
+        },
+        "metrics": summary['metrics'],
+        "best_frame": summary['best_frame'],
+        "worst_frame": summary['worst_frame'],
+        "timeline": summary['timeline'],
+        "pose_model_complexity_frames": summary['pose_model_complexity_frames'],
+        "video": video_result.to_dict(),
+        "sampling": {
+            "mode": sampling_config.mode.value,
+            "target_fps": sampling_config.target_fps,
+            "every_nth": sampling_config.every_nth,
+            "max_frames": sampling_config.max_frames
+        },
+        "timestamp": datetime.now().isoformat()
+    }
+
 @app.post("/analyze/video")
 async def analyze_video_technique(
     file: UploadFile = File(...),
     sport: str = "basketball",
-    analysis_type: str = "general"
+    analysis_type: str = "general",
+    sampling: str = "target_fps",
+    sample_fps: float = 5.0,
+    every_nth: int = 5,
+    max_frames: Optional[int] = None
 ):
-    """Analyze sports technique from uploaded video"""
+    """Analyze sports technique across a whole uploaded video using sampled frames"""
     try:
         if sport not in SPORTS_CONFIG:
             raise HTTPException(status_code=400, detail=f"Sport '{sport}' not supported")
         
-        # Save uploaded video temporarily
-        contents = await file.read()
-        temp_path = f"/tmp/{file.filename}"
-        
-        with open(temp_path, "wb") as f:
-            f.write(contents)
+        sampling_config = build_sampling_config(sampling, every_nth, sample_fps, max_frames)
         
-        # Process video frames
-        cap = cv2.VideoCapture(temp_path)
-        frame_results = []
-        frame_count = 0
+        # Stream the upload to disk instead of buffering it in memory
+        temp_path = await save_upload_to_tempfile(file, max_bytes=MAX_VIDEO_UPLOAD_BYTES)
         
-        while cap.isOpened() and frame_count < 30:  # Analyze first 30 frames
-            ret, frame = cap.read()
-            if not ret:
-                break
-            
-            result = analyzer.analyze_sport_specific(frame, sport, analysis_type)
-            if result:
-                frame_results.append(result)
-            
-            frame_count += 1
+        try:
+            return await run_inference(analyze_video_file, temp_path, sport, analysis_type, sampling_config)
+        finally:
+            os.remove(temp_path)  # Clean up
         
-        cap.release()
-        os.remove(temp_path)  # Clean up
-        
-        if not frame_results:
-            raise HTTPException(status_code=400, detail="Could not analyze video frames")
+    except VideoProcessingError as e:
+        status_code = 413 if e.error_code == "VIDEO_TOO_LARGE" else 400
+        raise HTTPException(status_code=status_code, detail=e.to_dict())
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Video analysis error: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Video analysis failed: {str(e)}")
+
+def process_video_job(job: VideoJob, progress_callback: Callable[[VideoProgress], None]) -> Dict[str, Any]:
+    """Run a queued video job through the same analysis as /analyze/video, at background priority"""
+    sampling_config = build_sampling_config(**job.sampling)
+    return analyze_video_file(job.video_path, job.sport, job.analysis_type, sampling_config,
+                              progress_callback, background=True, stop_event=video_job_queue.stop_event)
+
+# Background video jobs, persisted to SQLite and processed by a local worker pool;
+# the store is opened by the startup hook
+video_job_queue = VideoJobQueue(kind="technique", handler=process_video_job)
+
+@app.on_event("startup")
+async def start_video_job_queue():
+    """Open the job store, start job workers and resume jobs left unfinished by a previous run"""
+    video_job_queue.start()
+
+@app.on_event("shutdown")
+async def stop_video_job_queue():
+    video_job_queue.stop()
+
+@app.post("/jobs/video")
+async def submit_video_job(
+    file: UploadFile = File(...),
+    sport: str = "basketball",
+    analysis_type: str = "general",
+    sampling: str = "target_fps",
+    sample_fps: float = 5.0,
+    every_nth: int = 5,
+    max_frames: Optional[int] = None,
+    priority: Optional[int] = None
+):
+    """Queue a video for background analysis and return its job id immediately"""
+    try:
+        if sport not in SPORTS_CONFIG:
+            raise HTTPException(status_code=400, detail=f"Sport '{sport}' not supported")
         
-        # Aggregate results
-        avg_score = sum(r['form_score'] for r in frame_results) / len(frame_results)
-        all_feedback = []
-        for r in frame_results:
-            all_feedback.extend(r.get('feedback', []))
+        # Validate sampling up front so bad parameters fail the request, not the job
+        build_sampling_config(sampling, every_nth, sample_fps, max_frames)
+        if priority is None:
+            priority = sport_pack_loader.get_performance_config(sport).job_priority
         
-        # Remove duplicates
-        unique_feedback = list(set(all_feedback))
+        video_path = await save_upload_to_tempfile(
+            file, max_bytes=MAX_VIDEO_UPLOAD_BYTES, directory=video_job_queue.upload_directory
+        )
+        try:
+            job = video_job_queue.submit(
+                video_path, sport, analysis_type,
+                sampling={
+                    "mode": sampling,
+                    "every_nth": every_nth,
+                    "target_fps": sample_fps,
+                    "max_frames": max_frames
+                },
+                priority=priority
+            )
+        except Exception:
+            os.remove(video_path)
+            raise
         
         return {
-            "sport": sport,
-            "analysis_type": analysis_type,
-            "average_score": avg_score,
-            "frame_count": len(frame_results),
-            "feedback": unique_feedback,
+            "success": True,
+            "job_id": job.job_id,
+            "status": job.status.value,
+            "priority": job.priority,
+            "queue_depth": video_job_queue.queue_depth(),
             "timestamp": datetime.now().isoformat()
         }
         
+    except VideoProcessingError as e:
+        status_code = 413 if e.error_code == "VIDEO_TOO_LARGE" else 400
+        raise HTTPException(status_code=status_code, detail=e.to_dict())
+    except InferenceOverloadError as e:
+        raise HTTPException(
+            status_code=503,
+            detail=e.to_dict(),
+            headers={"Retry-After": str(e.context.get('retry_after_seconds', 1))}
+        )
+    except HTTPException:
+        raise
     except Exception as e:
-        logger.error(f"Video analysis error: {str(e)}")
-        raise HTTPException(status_code=500, detail=f"Video analysis failed: {str(e)}")
+        logger.error(f"Video job submission error: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Video job submission failed: {str(e)}")
+
+@app.get("/jobs/{job_id}")
+async def get_video_job(job_id: str):
+    """Get progress (frames done/total, fps) and, once finished, the result of a video job"""
+    try:
+        job = video_job_queue.get_job(job_id)
+        if job is None:
+            raise HTTPException(status_code=404, detail=f"Job '{job_id}' not found")
+        return job.to_dict()
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Failed to get video job: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Failed to get video job: {str(e)}")
+
+@app.get("/jobs")
+async def list_video_jobs(limit: int = 50):
+    """List recent video jobs without their results"""
+    try:
+        jobs = []
+        for job in video_job_queue.list_jobs(limit):
+            job_data = job.to_dict()
+            job_data.pop('result')
+            jobs.append(job_data)
+        return {
+            "jobs": jobs,
+            "queue": video_job_queue.get_stats(),
+            "timestamp": datetime.now().isoformat()
+        }
+    except Exception as e:
+        logger.error(f"Failed to list video jobs: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Failed to list video jobs: {str(e)}")
 
 @app.websocket("/ws/realtime")
 async def websocket_realtime_analysis(websocket: WebSocket):
     """WebSocket endpoint for real-time analysis"""
     await websocket.accept()
     
+    # Frames from this connection go to one pinned tracking-mode pose graph
+    session_id = f"ws-{uuid.uuid4().hex}"
+    
+    # Latest-frame-wins: keep receiving while analyzing, paced to the sport's target fps
+    scheduler = LatestFrameScheduler(
+        target_fps_for=lambda sport: sport_pack_loader.get_performance_config(sport).target_fps
+    )
+    
+    async def receive_frame() -> Optional[ScheduledFrame]:
+        # Receive frame data: binary frames (header + JPEG/WebP) or legacy base64 JSON
+        try:
+            message = await receive_frame_message(websocket)
+        except ValidationError as invalid:
+            await websocket.send_text(json.dumps({
+                "status": "error",
+                "error": invalid.to_dict(),
+                "timestamp": datetime.now().isoformat()
+            }))
+            return None
+        
+        if isinstance(message, BinaryFrame):
+            return ScheduledFrame(
+                sport=message.sport,
+                analysis_type=message.analysis_type,
+                payload=message.payload,
+                sequence=message.sequence,
+                client_timestamp=message.timestamp
+            )
+        
+        frame_data = json.loads(message)
+        image_data = frame_data.get('image')
+        if not image_data:
+            return None
+        
+        # Base64 is decoded only if the frame is not superseded before analysis
+        return ScheduledFrame(
+            sport=frame_data.get('sport', 'basketball'),
+            analysis_type=frame_data.get('analysis_type', 'general'),
+            payload=image_data,
+            sequence=frame_data.get('sequence'),
+            client_timestamp=frame_data.get('timestamp')
+        )
+    
+    async def process_frame(frame: ScheduledFrame) -> None:
+        def decode_and_analyze() -> Optional[Dict[str, Any]]:
+            image_bytes = frame.payload
+            if isinstance(image_bytes, str):
+                image_bytes = base64.b64decode(image_bytes.split(',')[1])
+            image_cv = decode_frame_image(image_bytes)
+            if image_cv is None:
+                raise InvalidImageError("Unable to decode frame", "INVALID_IMAGE_FORMAT")
+            return analyzer.analyze_sport_specific(image_cv, frame.sport, frame.analysis_type, session_id)
+        
+        # Analyze frame off the event loop; tell the client to back off when saturated
+        try:
+            result = await inference_executor.run(decode_and_analyze)
+        except InferenceOverloadError as overload:
+            await websocket.send_text(json.dumps({
+                "status": "busy",
+                "sequence": frame.sequence,
+                "retry_after": overload.context.get('retry_after_seconds', 1),
+                "scheduling": scheduler.finish(frame),
+                "timestamp": datetime.now().isoformat()
+            }))
+            return
+        except InvalidImageError as invalid:
+            await websocket.send_text(json.dumps({
+                "status": "error",
+                "sequence": frame.sequence,
+                "error": invalid.to_dict(),
+                "scheduling": scheduler.finish(frame),
+                "timestamp": datetime.now().isoformat()
+            }))
+            return
+        
+        if result:
+            await websocket.send_text(json.dumps({
+                "sport": frame.sport,
+                "analysis_type": frame.analysis_type,
+                "sequence": frame.sequence,
+                "score": result['form_score'],
+                "feedback": result.get('feedback', []),
+                "pose_model_complexity": result.get('pose_model_complexity'),
+                "scheduling": scheduler.finish(frame),
+                "timestamp": datetime.now().isoformat()
+            }))
+    
     try:
-        while True:
-            # Receive frame data
-            data = await websocket.receive_text()
-            frame_data = json.loads(data)
-            
-            sport = frame_data.get('sport', 'basketball')
-            analysis_type = frame_data.get('analysis_type', 'general')
-            image_data = frame_data.get('image')
-            
-            if not image_data:
-                continue
-            
-            # Decode base64 image
-            image_bytes = base64.b64decode(image_data.split(',')[1])
-            image = Image.open(BytesIO(image_bytes))
-            image_cv = cv2.cvtColor(np.array(image), cv2.COLOR_RGB2BGR)
-            
-            # Analyze frame
-            result = analyzer.analyze_sport_specific(image_cv, sport, analysis_type)
-            
-            if result:
-                await websocket.send_text(json.dumps({
-                    "sport": sport,
-                    "analysis_type": analysis_type,
-                    "score": result['form_score'],
-                    "feedback": result.get('feedback', []),
-                    "timestamp": datetime.now().isoformat()
-                }))
-            
+        await run_latest_frame_loop(scheduler, receive_frame, process_frame)
+    
+    except WebSocketDisconnect:
+        logger.info(f"Realtime client disconnected ({session_id})")
     except Exception as e:
         logger.error(f"WebSocket error: {str(e)}")
         await websocket.close()
+    finally:
+        analyzer.release_pose_session(session_id)
 
 @app.post("/api/analysis/advanced-realtime")
 async def advanced_realtime_analysis(request: dict):
@@ -1135,6 +1502,8 @@ async def advanced_realtime_analysis(request: dict):
         include_physics = request.get('includePhysics', True)
         include_biomechanics = request.get('includeBiomechanics', True)
         include_performance_prediction = request.get('includePerformancePrediction', True)
+        # Streaming clients (e.g. an AR session) pass a session id to reuse a tracking graph
+        session_id = request.get('sessionId')
         
         if sport not in SPORTS_CONFIG:
             raise HTTPException(status_code=400, detail=f"Sport '{sport}' not supported")
@@ -1148,13 +1517,16 @@ async def advanced_realtime_analysis(request: dict):
                 
                 image_bytes = base64.b64decode(image_base64)
                 nparr = np.frombuffer(image_bytes, np.uint8)
-                image = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
+                image = await run_inference(cv2.imdecode, nparr, cv2.IMREAD_COLOR)
                 
                 if image is None:
                     raise ValueError("Invalid image format")
                 
-                # Perform real analysis
-                analysis_result = analyzer.analyze_sport_specific(image, sport, 'comprehensive')
+                # Perform real analysis (single pose inference shared across the request)
+                context = PoseAnalysisContext(
+                    analyzer, image, f"stream-{session_id}" if session_id else None, sport
+                )
+                analysis_result = await run_inference(context.analyze_sport_specific, sport, 'comprehensive')
                 
                 if analysis_result is None:
                     # No pose detected - return zero scores with guidance
@@ -1163,21 +1535,15 @@ async def advanced_realtime_analysis(request: dict):
                         'feedback': ['No pose detected - position yourself in camera view', 'Ensure good lighting and full body visibility']
                     }
                 
-                # Extract landmarks for biomechanics
-                landmarks = analyzer.extract_pose_landmarks(image)
-                joint_angles = {}
-                
-                if landmarks:
-                    sport_config = SPORTS_CONFIG[sport]
-                    for joint in sport_config.get("key_joints", []):
-                        if joint in landmarks:
-                            joint_angles[joint] = landmarks[joint]['y'] * 180
+                # Reuse the landmarks for biomechanics
+                landmarks = context.landmarks
+                joint_angles = context.joint_angles(sport)
                 
                 # Calculate real biomechanical metrics from pose analysis
                 form_score = analysis_result.get('form_score', 0)
                 
                 # Real biomechanics calculations from landmarks
-                if landmarks:
+                if context.pose_detected:
                     # Calculate actual posture score from shoulder and hip alignment
                     left_shoulder = landmarks.get('left_shoulder', {})
                     right_shoulder = landmarks.get('right_shoulder', {})
@@ -1252,13 +1618,17 @@ async def advanced_realtime_analysis(request: dict):
                         'physics': physics_data,
                         'coaching_tips': coaching_tips,
                         'joint_angles': joint_angles,
-                        'pose_detected': landmarks is not None,
+                        'pose_detected': context.pose_detected,
+                        'pose_inferences': context.pose_inferences,
+                        'pose_model_complexity': context.model_complexity,
                         'analysis_level': analysis_level,
                         'timestamp': datetime.now().isoformat()
                     },
                     'success': True
                 }
                 
+            except HTTPException:
+                raise
             except Exception as e:
                 logger.error(f"Image processing error: {str(e)}")
                 # Return error response but with helpful message
@@ -1294,6 +1664,8 @@ async def advanced_realtime_analysis(request: dict):
                 'error': 'No image data provided'
             }
             
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Advanced analysis error: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Analysis failed: {str(e)}")
@@ -1307,10 +1679,9 @@ async def unified_computer_vision_analysis(
 ):
     """Perform unified computer vision analysis using multiple detection methods"""
     try:
-        # Read and process image
+        # Read and decode image at the resolution the detectors need
         image_data = await file.read()
-        nparr = np.frombuffer(image_data, np.uint8)
-        image = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
+        image = await run_inference(frame_preprocessor.decode, image_data)
         
         if image is None:
             raise HTTPException(status_code=400, detail="Invalid image data")
@@ -1327,12 +1698,14 @@ async def unified_computer_vision_analysis(
         
         # Perform unified detection
         if detection_methods:
-            results = unified_cv_pipeline.detect_unified(
-                image, request.sport, detection_methods
+            results = await run_inference(
+                unified_cv_pipeline.detect_unified, image, request.sport, detection_methods
             )
         else:
             # Use sport-specific detection
-            unified_result = unified_cv_pipeline.detect_sport_specific(image, request.sport)
+            unified_result = await run_inference(
+                unified_cv_pipeline.detect_sport_specific, image, request.sport
+            )
             results = {DetectionMethod.UNIFIED_PIPELINE: unified_result}
         
         # Convert results to response format
@@ -1352,6 +1725,7 @@ async def unified_computer_vision_analysis(
                 fps=result.fps,
                 pose_detected=result.pose_landmarks is not None,
                 objects_detected=len(result.objects),
+                model_complexity=result.model_complexity,
                 sport_context=result.sport_context
             )
             
@@ -1399,6 +1773,8 @@ async def unified_computer_vision_analysis(
             recommendations=recommendations
         )
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Unified analysis failed: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Analysis failed: {str(e)}")
@@ -1424,33 +1800,54 @@ async def get_available_detection_methods():
         raise HTTPException(status_code=500, detail=f"Failed to get methods: {str(e)}")
 
 @app.get("/unified-analysis/performance")
-async def get_pipeline_performance():
-    """Get comprehensive performance report for CV pipeline"""
+async def get_pipeline_performance(sport: Optional[str] = None):
+    """Get comprehensive performance report for CV pipeline, with the model variants chosen for a sport"""
     try:
-        report = unified_cv_pipeline.get_performance_report()
+        report = unified_cv_pipeline.get_performance_report(sport)
         return report
     except Exception as e:
         logger.error(f"Failed to get performance report: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Failed to get performance: {str(e)}")
 
+@app.get("/inference/executor-stats")
+async def get_inference_executor_stats():
+    """Get load and sizing of the inference executor"""
+    try:
+        return {
+            "success": True,
+            "executor": inference_executor.get_stats(),
+            "pose_graph_pools": get_pose_graph_pool_stats(),
+            "pose_sessions": analyzer.get_pose_session_stats(),
+            "pose_complexity": pose_complexity_controller.get_stats(),
+            "timestamp": datetime.now().isoformat()
+        }
+    except Exception as e:
+        logger.error(f"Failed to get executor stats: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Failed to get executor stats: {str(e)}")
+
 @app.post("/unified-analysis/pose-only")
 async def pose_only_analysis(
     sport: str,
-    file: UploadFile = File(...)
+    file: UploadFile = File(...),
+    roi: Optional[str] = None
 ):
-    """Perform pose-only analysis using MediaPipe"""
+    """
+    Perform pose-only analysis using MediaPipe.
+    Pass the previous frame's next_roi as roi ("x1,y1,x2,y2") to analyze only
+    the region around the athlete.
+    """
     try:
-        # Read and process image
+        roi = parse_roi(roi)
+        # Read and decode image at the resolution the detectors need
         image_data = await file.read()
-        nparr = np.frombuffer(image_data, np.uint8)
-        image = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
+        image = await run_inference(frame_preprocessor.decode, image_data, roi)
         
         if image is None:
             raise HTTPException(status_code=400, detail="Invalid image data")
         
         # Perform pose detection only
-        results = unified_cv_pipeline.detect_unified(
-            image, sport, [DetectionMethod.MEDIAPIPE_POSE]
+        results = await run_inference(
+            unified_cv_pipeline.detect_unified, image, sport, [DetectionMethod.MEDIAPIPE_POSE]
         )
         
         pose_result = results.get(DetectionMethod.MEDIAPIPE_POSE)
@@ -1458,6 +1855,7 @@ async def pose_only_analysis(
             return {
                 "sport": sport,
                 "pose_detected": False,
+                "model_complexity": pose_result.model_complexity if pose_result else None,
                 "message": "No pose detected in image",
                 "recommendations": [
                     "Ensure you are fully visible in the frame",
@@ -1473,10 +1871,18 @@ async def pose_only_analysis(
             "joint_angles": pose_result.joint_angles,
             "processing_time_ms": pose_result.processing_time_ms,
             "fps": pose_result.fps,
+            "model_complexity": pose_result.model_complexity,
             "sport_context": pose_result.sport_context,
-            "landmarks_count": len(pose_result.pose_landmarks) if pose_result.pose_landmarks else 0
+            "landmarks_count": len(pose_result.pose_landmarks) if pose_result.pose_landmarks else 0,
+            "next_roi": pose_bounding_box(
+                pose_result.pose_landmarks, image.transform.original_width, image.transform.original_height
+            )
         }
         
+    except ValidationError as e:
+        raise HTTPException(status_code=400, detail=e.to_dict())
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Pose analysis failed: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Pose analysis failed: {str(e)}")
@@ -1488,17 +1894,16 @@ async def objects_only_analysis(
 ):
     """Perform object detection only using YOLO"""
     try:
-        # Read and process image
+        # Read and decode image at the resolution the detectors need
         image_data = await file.read()
-        nparr = np.frombuffer(image_data, np.uint8)
-        image = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
+        image = await run_inference(frame_preprocessor.decode, image_data)
         
         if image is None:
             raise HTTPException(status_code=400, detail="Invalid image data")
         
         # Perform object detection only
-        results = unified_cv_pipeline.detect_unified(
-            image, sport, [DetectionMethod.YOLO_OBJECTS]
+        results = await run_inference(
+            unified_cv_pipeline.detect_unified, image, sport, [DetectionMethod.YOLO_OBJECTS]
         )
         
         object_result = results.get(DetectionMethod.YOLO_OBJECTS)
@@ -1525,6 +1930,8 @@ async def objects_only_analysis(
             "sport_context": object_result.sport_context
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Object analysis failed: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Object analysis failed: {str(e)}")
@@ -1532,20 +1939,26 @@ async def objects_only_analysis(
 @app.post("/unified-analysis/sport-specific/{sport_name}")
 async def sport_specific_analysis(
     sport_name: str,
-    file: UploadFile = File(...)
+    file: UploadFile = File(...),
+    roi: Optional[str] = None
 ):
-    """Perform optimized sport-specific analysis"""
+    """
+    Perform optimized sport-specific analysis.
+    Pass the previous frame's next_roi as roi ("x1,y1,x2,y2") to run pose
+    detection only on the region around the athlete; objects are detected
+    across the whole frame.
+    """
     try:
-        # Read and process image
+        roi = parse_roi(roi)
+        # Read and decode image at the resolution the detectors need
         image_data = await file.read()
-        nparr = np.frombuffer(image_data, np.uint8)
-        image = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
+        image = await run_inference(frame_preprocessor.decode, image_data, roi)
         
         if image is None:
             raise HTTPException(status_code=400, detail="Invalid image data")
         
         # Perform sport-specific detection
-        result = unified_cv_pipeline.detect_sport_specific(image, sport_name)
+        result = await run_inference(unified_cv_pipeline.detect_sport_specific, image, sport_name)
         
         if not result.success:
             return {
@@ -1571,7 +1984,10 @@ async def sport_specific_analysis(
                 "objects_detected": len(result.objects),
                 "joint_angles": result.joint_angles,
                 "sport_context": result.sport_context
-            }
+            },
+            "next_roi": pose_bounding_box(
+                result.pose_landmarks, image.transform.original_width, image.transform.original_height
+            )
         }
         
         # Add sport-specific insights
@@ -1596,6 +2012,10 @@ async def sport_specific_analysis(
         
         return response
         
+    except ValidationError as e:
+        raise HTTPException(status_code=400, detail=e.to_dict())
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Sport-specific analysis failed for {sport_name}: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Analysis failed: {str(e)}")
@@ -2942,38 +3362,55 @@ async def generate_multi_sport_ar_comparison(
 
 # =============== MULTI-OBJECT TRACKING API ENDPOINTS ===============
 
+def require_delta_session(session_id: Optional[str], delta_results: bool) -> None:
+    """Delta results are relative to what one client already received, so they need that client's session"""
+    if delta_results and not session_id:
+        raise HTTPException(status_code=400, detail="delta_results requires a session_id")
+
 @app.post("/tracking/process-frame")
 async def process_tracking_frame(
     sport_name: str,
     detections: List[Dict[str, Any]],
-    frame_timestamp: Optional[float] = None
+    frame_timestamp: Optional[float] = None,
+    session_id: Optional[str] = None,
+    delta_results: bool = False
 ):
-    """Process frame with detections for multi-object tracking"""
+    """
+    Process frame with detections for multi-object tracking, on the session's own tracker if given.
+    With delta_results (which requires session_id), tracking_results carries only the tracks changed
+    since the previous delta frame.
+    """
     try:
-        tracker = get_tracker(sport_name)
+        require_delta_session(session_id, delta_results)
+        tracker = get_tracker(sport_name, session_id)
         
         if frame_timestamp is None:
             frame_timestamp = time.time()
         
-        tracking_results = tracker.process_frame(detections, frame_timestamp)
+        tracking_results = await run_inference(tracker.process_frame, detections, frame_timestamp, delta_results)
         
         return {
             "success": True,
             "tracking_results": tracking_results,
             "sport": sport_name,
+            "session_id": session_id,
             "detections_processed": len(detections),
             "timestamp": datetime.utcnow().isoformat()
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Frame tracking failed: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Frame tracking failed: {str(e)}")
 
 @app.get("/tracking/get-track")
-async def get_track_by_id(sport_name: str, track_id: int):
+async def get_track_by_id(sport_name: str, track_id: int, session_id: Optional[str] = None):
     """Get track information by ID"""
     try:
-        tracker = get_tracker(sport_name)
+        tracker = find_tracker(sport_name, session_id)
+        if tracker is None:
+            raise HTTPException(status_code=404, detail=f"No {sport_name} tracker for session {session_id}")
         track_info = tracker.get_track_by_id(track_id)
         
         if track_info is None:
@@ -2993,10 +3430,12 @@ async def get_track_by_id(sport_name: str, track_id: int):
         raise HTTPException(status_code=500, detail=f"Track retrieval failed: {str(e)}")
 
 @app.get("/tracking/summary")
-async def get_tracking_summary(sport_name: str):
+async def get_tracking_summary(sport_name: str, session_id: Optional[str] = None):
     """Get comprehensive tracking summary"""
     try:
-        tracker = get_tracker(sport_name)
+        tracker = find_tracker(sport_name, session_id)
+        if tracker is None:
+            raise HTTPException(status_code=404, detail=f"No {sport_name} tracker for session {session_id}")
         summary = tracker.get_tracking_summary()
         
         return {
@@ -3005,33 +3444,55 @@ async def get_tracking_summary(sport_name: str):
             "timestamp": datetime.utcnow().isoformat()
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Tracking summary failed: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Tracking summary failed: {str(e)}")
 
 @app.post("/tracking/reset")
-async def reset_tracking(sport_name: str):
+async def reset_tracking(sport_name: str, session_id: Optional[str] = None):
     """Reset tracking state for sport"""
     try:
-        tracker = get_tracker(sport_name)
+        tracker = find_tracker(sport_name, session_id)
+        if tracker is None:
+            raise HTTPException(status_code=404, detail=f"No {sport_name} tracker for session {session_id}")
         tracker.reset_tracking()
         
         return {
             "success": True,
             "message": f"Tracking reset for {sport_name}",
             "sport": sport_name,
+            "session_id": session_id,
             "timestamp": datetime.utcnow().isoformat()
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Tracking reset failed: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Tracking reset failed: {str(e)}")
 
+@app.post("/tracking/release-session")
+async def release_tracking_session(sport_name: str, session_id: str):
+    """Drop a session's tracker when its stream ends"""
+    released = tracker_registry.release(sport_name, session_id)
+    if not released:
+        raise HTTPException(status_code=404, detail=f"No {sport_name} tracker for session {session_id}")
+    
+    return {
+        "success": True,
+        "sport": sport_name,
+        "session_id": session_id,
+        "timestamp": datetime.utcnow().isoformat()
+    }
+
 @app.post("/tracking/multi-sport-comparison")
 async def compare_multi_sport_tracking(
     sports: List[str],
     detections: List[Dict[str, Any]],
-    frame_timestamp: Optional[float] = None
+    frame_timestamp: Optional[float] = None,
+    session_id: Optional[str] = None
 ):
     """Compare tracking results across multiple sports"""
     try:
@@ -3042,8 +3503,8 @@ async def compare_multi_sport_tracking(
         
         for sport in sports:
             try:
-                tracker = get_tracker(sport)
-                tracking_results = tracker.process_frame(detections, frame_timestamp)
+                tracker = get_tracker(sport, session_id)
+                tracking_results = await run_inference(tracker.process_frame, detections, frame_timestamp)
                 
                 tracking_comparisons.append({
                     "sport": sport,
@@ -3053,6 +3514,8 @@ async def compare_multi_sport_tracking(
                     "processing_time_ms": tracker.performance_metrics["processing_time_ms"]
                 })
                 
+            except HTTPException:
+                raise
             except Exception as sport_error:
                 logger.warning(f"Failed to track {sport}: {str(sport_error)}")
                 tracking_comparisons.append({
@@ -3076,6 +3539,8 @@ async def compare_multi_sport_tracking(
             }
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Multi-sport tracking comparison failed: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Tracking comparison failed: {str(e)}")
@@ -3085,38 +3550,105 @@ async def realtime_tracking_analysis(
     sport_name: str,
     video_frames: List[Dict[str, Any]],
     enable_predictions: bool = True,
-    enable_sport_analysis: bool = True
+    enable_sport_analysis: bool = True,
+    interleave_detection: bool = True,
+    session_id: Optional[str] = None,
+    delta_results: bool = False
 ):
-    """Real-time tracking analysis across multiple frames"""
+    """
+    Real-time tracking analysis across multiple frames.
+    Frames carry either precomputed 'detections' or a base64 'image'. With
+    interleave_detection, images are detected only every N frames (per sport,
+    adapted to motion) and tracks are propagated in between; otherwise every
+    image is detected as one batch. Frames whose image cannot be decoded get an
+    error entry and are skipped by the tracker. Tracking runs in frame order, on
+    the session's own tracker when session_id is given. With delta_results
+    (which requires session_id) each frame carries only new/updated/lost/removed
+    tracks, and statistics arrive at the tracker's statistics interval.
+    """
     try:
-        tracker = get_tracker(sport_name)
-        frame_results = []
-        
-        for i, frame_data in enumerate(video_frames):
-            detections = frame_data.get('detections', [])
-            frame_timestamp = frame_data.get('timestamp', time.time() + i * 0.033)  # 30 FPS
+        require_delta_session(session_id, delta_results)
+        tracker = get_tracker(sport_name, session_id)
+        interleave = interleave_detection and tracker.detection_scheduler.enabled
+        
+        def detect_and_track() -> List[Dict[str, Any]]:
+            # This already holds an inference executor slot, so decoding and detection
+            # run serially here rather than fanning out to the detector pool
+            decoded, decode_errors = {}, {}
+            for i, frame_data in enumerate(video_frames):
+                if 'detections' in frame_data or not frame_data.get('image'):
+                    continue
+                try:
+                    image = frame_preprocessor.decode(base64.b64decode(frame_data['image']))
+                except (ValueError, TypeError) as e:
+                    decode_errors[i] = f"Invalid base64 image: {str(e)}"
+                    continue
+                if image is None:
+                    decode_errors[i] = "Unable to decode image"
+                else:
+                    decoded[i] = image
+            
+            detected = {}
+            if not interleave:
+                batch_results = unified_cv_pipeline.detect_sport_specific_batch(
+                    list(decoded.values()), sport_name, serial=True
+                )
+                detected = {i: result.objects for i, result in zip(decoded, batch_results)}
             
-            tracking_results = tracker.process_frame(detections, frame_timestamp)
+            def detect_frame(image) -> List[Dict[str, Any]]:
+                return unified_cv_pipeline.detect_sport_specific(image, sport_name, serial=True).objects
             
-            frame_results.append({
-                "frame_id": i,
-                "timestamp": frame_timestamp,
-                "tracking_results": tracking_results,
-                "predictions_enabled": enable_predictions,
-                "sport_analysis_enabled": enable_sport_analysis
-            })
+            # Tracking carries identity from frame to frame, so it stays sequential
+            results = []
+            for i, frame_data in enumerate(video_frames):
+                frame_timestamp = frame_data.get('timestamp', time.time() + i * 0.033)  # 30 FPS
+                
+                if i in decode_errors:
+                    # Skip the frame without advancing the tracker
+                    results.append({
+                        "frame_id": i,
+                        "timestamp": frame_timestamp,
+                        "error": decode_errors[i],
+                        "processing_successful": False
+                    })
+                    continue
+                
+                if interleave and i in decoded:
+                    tracking_results = tracker.process_stream_frame(
+                        decoded[i], frame_timestamp, detect_frame, delta_results
+                    )
+                else:
+                    detections = frame_data.get('detections', detected.get(i, []))
+                    tracking_results = tracker.process_frame(
+                        detections, frame_timestamp, delta_results, decoded.get(i)
+                    )
+                
+                results.append({
+                    "frame_id": i,
+                    "timestamp": frame_timestamp,
+                    "tracking_results": tracking_results,
+                    "predictions_enabled": enable_predictions,
+                    "sport_analysis_enabled": enable_sport_analysis,
+                    "processing_successful": True
+                })
+            return results
+        
+        frame_results = await run_inference(detect_and_track)
         
         # Generate comprehensive analysis
         comprehensive_analysis = {
             "total_frames": len(video_frames),
+            "failed_frames": sum(1 for result in frame_results if not result["processing_successful"]),
             "sport": sport_name,
+            "session_id": session_id,
             "tracking_summary": tracker.get_tracking_summary(),
             "frame_results": frame_results,
             "performance_analysis": {
                 "avg_processing_time": tracker.performance_metrics["processing_time_ms"],
                 "avg_tracking_confidence": tracker.performance_metrics["average_tracking_confidence"],
                 "total_tracks_created": tracker.performance_metrics["total_tracks_created"],
-                "fps_capability": 1000 / max(tracker.performance_metrics["processing_time_ms"], 1)
+                "fps_capability": 1000 / max(tracker.performance_metrics["processing_time_ms"], 1),
+                "detection_schedule": tracker.detection_scheduler.get_stats() if interleave else None
             }
         }
         
@@ -3132,35 +3664,36 @@ async def realtime_tracking_analysis(
             ]
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Real-time tracking analysis failed: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Real-time analysis failed: {str(e)}")
 
 @app.get("/tracking/active-trackers")
 async def get_active_trackers():
-    """Get information about all active trackers"""
+    """Get information about all live session trackers"""
     try:
-        # Initialize tracker dictionary if needed
-        global multi_object_trackers
-        if 'multi_object_trackers' not in globals():
-            multi_object_trackers = {}
-            
-        active_trackers_info = {}
-        
-        for sport_name, tracker in multi_object_trackers.items():
-            active_trackers_info[sport_name] = {
-                "sport": sport_name,
+        active_trackers_info = []
+        for session in tracker_registry.sessions():
+            tracker = session.tracker
+            active_trackers_info.append({
+                "sport": session.sport_name,
+                "session_id": session.session_id,
+                "idle_seconds": time.time() - session.last_used,
+                "memory_bytes": tracker.memory_bytes(),
                 "statistics": tracker.byte_tracker.get_tracking_statistics(),
                 "performance_metrics": tracker.performance_metrics,
                 "configuration": tracker.sport_config,
                 "history_length": len(tracker.tracking_history)
-            }
+            })
         
         return {
             "success": True,
             "active_trackers": active_trackers_info,
-            "total_trackers": len(multi_object_trackers),
-            "supported_sports": list(multi_object_trackers.keys()),
+            "total_trackers": len(active_trackers_info),
+            "supported_sports": sorted({info["sport"] for info in active_trackers_info}),
+            "registry": tracker_registry.get_stats(),
             "tracking_capabilities": [
                 "multi_object_tracking",
                 "identity_consistency",
@@ -3196,13 +3729,13 @@ async def detect_sport_specific_objects(
         # Decode base64 image
         image_bytes = base64.b64decode(image_data)
         nparr = np.frombuffer(image_bytes, np.uint8)
-        image = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
+        image = await run_inference(cv2.imdecode, nparr, cv2.IMREAD_COLOR)
         
         if image is None:
             raise HTTPException(status_code=400, detail="Invalid image data")
         
         # Detect sport-specific objects
-        detection_results = detect_sport_objects(sport_name, image, timestamp)
+        detection_results = await run_inference(detect_sport_objects, sport_name, image, timestamp)
         
         return {
             "success": True,
@@ -3216,6 +3749,8 @@ async def detect_sport_specific_objects(
             }
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Sport object detection failed: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Object detection failed: {str(e)}")
@@ -3292,16 +3827,19 @@ async def multi_sport_object_detection(
         # Decode base64 image
         image_bytes = base64.b64decode(image_data)
         nparr = np.frombuffer(image_bytes, np.uint8)
-        image = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
+        image = await run_inference(cv2.imdecode, nparr, cv2.IMREAD_COLOR)
         
         if image is None:
             raise HTTPException(status_code=400, detail="Invalid image data")
         
         multi_sport_results = []
         
+        # Every sport's detector reuses the same colour conversions and edge maps
+        features = FrameFeatures(image)
+        
         for sport in sports:
             try:
-                detection_results = detect_sport_objects(sport, image, timestamp)
+                detection_results = await run_inference(detect_sport_objects, sport, image, timestamp, features)
                 
                 sport_analysis = {
                     "sport": sport,
@@ -3314,6 +3852,8 @@ async def multi_sport_object_detection(
                 
                 multi_sport_results.append(sport_analysis)
                 
+            except HTTPException:
+                raise
             except Exception as sport_error:
                 logger.warning(f"Detection failed for {sport}: {str(sport_error)}")
                 multi_sport_results.append({
@@ -3345,6 +3885,8 @@ async def multi_sport_object_detection(
             "timestamp": datetime.utcnow().isoformat()
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Multi-sport detection failed: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Multi-sport detection failed: {str(e)}")
@@ -3367,38 +3909,37 @@ async def realtime_video_detection(
             raise HTTPException(status_code=400, detail="Timestamps count must match frames count")
         
         detector = get_sport_detector(sport_name)
-        frame_results = []
         
-        for i, (frame_data, timestamp) in enumerate(zip(video_frames, frame_timestamps)):
+        def decode_and_detect(i: int) -> Dict[str, Any]:
+            timestamp = frame_timestamps[i]
             try:
-                # Decode frame
-                image_bytes = base64.b64decode(frame_data)
-                nparr = np.frombuffer(image_bytes, np.uint8)
-                image = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
-                
+                image = cv2.imdecode(np.frombuffer(base64.b64decode(video_frames[i]), np.uint8), cv2.IMREAD_COLOR)
                 if image is None:
-                    continue
-                
-                # Detect objects
+                    raise ValueError("Unable to decode image")
                 detection_results = detector.detect_objects(image, timestamp)
                 
-                frame_results.append({
+                return {
                     "frame_id": i,
                     "timestamp": timestamp,
                     "detections": [result.to_dict() for result in detection_results],
                     "detection_count": len(detection_results),
                     "processing_successful": True
-                })
+                }
                 
             except Exception as frame_error:
                 logger.warning(f"Frame {i} processing failed: {str(frame_error)}")
-                frame_results.append({
+                return {
                     "frame_id": i,
                     "timestamp": timestamp,
                     "error": str(frame_error),
                     "detection_count": 0,
                     "processing_successful": False
-                })
+                }
+        
+        # Decode and detect the frames in order within one inference executor slot
+        frame_results = await run_inference(
+            lambda: [decode_and_detect(i) for i in range(len(video_frames))]
+        )
         
         # Generate video analysis summary
         successful_frames = [f for f in frame_results if f.get('processing_successful', False)]
@@ -3420,6 +3961,8 @@ async def realtime_video_detection(
             "timestamp": datetime.utcnow().isoformat()
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Realtime video detection failed: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Video detection failed: {str(e)}")
@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+Model Variants - Speed/accuracy variants per detector and latency-budget selection
+Lists fp32/fp16/int8 ONNX object models and MediaPipe pose complexities, records
+their latency measured on the local CPU, and picks the most accurate variant
+that fits a sport's latency budget
+"""
+
+import os
+import logging
+import threading
+import argparse
+from dataclasses import dataclass, asdict
+from typing import Dict, List, Optional, Any
+
+logger = logging.getLogger(__name__)
+
+# Detector keys, matching DetectionMethod values
+POSE_DETECTOR = 'mediapipe_pose'
+OBJECT_DETECTOR = 'yolo_objects'
+
+# ONNX precisions, most accurate first, and the file suffix each is stored under
+OBJECT_MODEL_PRECISIONS = (
+    ('fp32', ''),
+    ('fp16', '_fp16'),
+    ('int8', '_int8')
+)
+
+POSE_COMPLEXITIES = (2, 1, 0)
+
+@dataclass
+class ModelVariant:
+    """One runnable variant of a detector"""
+    detector: str
+    name: str
+    accuracy_rank: int
+    model_path: Optional[str] = None
+    model_complexity: Optional[int] = None
+    is_default: bool = False
+    measured_latency_ms: Optional[float] = None
+    available: bool = True
+    error: Optional[str] = None
+
+    @property
+    def is_calibrated(self) -> bool:
+        return self.available and self.measured_latency_ms is not None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+def object_model_variants(base_model_path: Optional[str]) -> List[ModelVariant]:
+    """
+    Variants of an ONNX object model found on disk: models/yolov8n.onnx (fp32)
+    alongside models/yolov8n_fp16.onnx and models/yolov8n_int8.onnx
+    """
+    if not base_model_path:
+        return []
+    stem, extension = os.path.splitext(base_model_path)
+    variants = []
+    for rank, (precision, suffix) in enumerate(OBJECT_MODEL_PRECISIONS):
+        path = f"{stem}{suffix}{extension}"
+        if os.path.exists(path):
+            variants.append(ModelVariant(
+                detector=OBJECT_DETECTOR,
+                name=precision,
+                accuracy_rank=len(OBJECT_MODEL_PRECISIONS) - rank,
+                model_path=path,
+                is_default=(suffix == '')
+            ))
+    return variants
+
+def pose_model_variants(default_complexity: int = 2) -> List[ModelVariant]:
+    """MediaPipe Pose at each model complexity; higher is more accurate and slower"""
+    return [
+        ModelVariant(
+            detector=POSE_DETECTOR,
+            name=f"complexity_{complexity}",
+            accuracy_rank=complexity,
+            model_complexity=complexity,
+            is_default=(complexity == default_complexity)
+        )
+        for complexity in POSE_COMPLEXITIES
+    ]
+
+class ModelVariantRegistry:
+    """
+    Variants per detector with their calibrated latency.
+    select() returns the most accurate calibrated variant whose latency fits
+    the budget, the fastest one when none fits, and None (use the default
+    detector) when there is no budget or nothing has been calibrated.
+    """
+
+    def __init__(self):
+        self._variants: Dict[str, List[ModelVariant]] = {}
+        self._selections: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        self._lock = threading.Lock()
+        self.calibrated_at: Optional[float] = None
+
+    def register(self, variants: List[ModelVariant]):
+        with self._lock:
+            for variant in variants:
+                existing = self._variants.setdefault(variant.detector, [])
+                existing[:] = [v for v in existing if v.name != variant.name]
+                existing.append(variant)
+                existing.sort(key=lambda v: -v.accuracy_rank)
+
+    def variants(self, detector: str) -> List[ModelVariant]:
+        with self._lock:
+            return list(self._variants.get(detector, []))
+
+    def record_latency(self, variant: ModelVariant, latency_ms: Optional[float], error: Optional[str] = None):
+        with self._lock:
+            variant.measured_latency_ms = latency_ms
+            variant.available = error is None
+            variant.error = error
+
+    def select(self, detector: str, budget_ms: Optional[float], sport: Optional[str] = None) -> Optional[ModelVariant]:
+        if budget_ms is None:
+            return None
+
+        calibrated = [v for v in self.variants(detector) if v.is_calibrated]
+        if not calibrated:
+            return None
+
+        fitting = [v for v in calibrated if v.measured_latency_ms <= budget_ms]
+        if fitting:
+            chosen = max(fitting, key=lambda v: v.accuracy_rank)
+        else:
+            chosen = min(calibrated, key=lambda v: v.measured_latency_ms)
+
+        if sport:
+            with self._lock:
+                self._selections.setdefault(detector, {})[sport] = {
+                    'variant': chosen.name,
+                    'measured_latency_ms': chosen.measured_latency_ms,
+                    'latency_budget_ms': budget_ms,
+                    'within_budget': chosen.measured_latency_ms <= budget_ms
+                }
+        return chosen
+
+    def get_report(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                detector: {
+                    'variants': [variant.to_dict() for variant in variants],
+                    'default': next((v.name for v in variants if v.is_default), None),
+                    'selected_by_sport': dict(self._selections.get(detector, {}))
+                }
+                for detector, variants in self._variants.items()
+            }
+
+def quantize_object_model(model_path: str) -> Dict[str, str]:
+    """
+    Write int8 (dynamic quantization) and, when onnxconverter-common is
+    installed, fp16 copies of an fp32 ONNX model next to it
+    """
+    stem, extension = os.path.splitext(model_path)
+    written = {}
+
+    from onnxruntime.quantization import quantize_dynamic, QuantType
+    int8_path = f"{stem}_int8{extension}"
+    quantize_dynamic(model_path, int8_path, weight_type=QuantType.QUInt8)
+    written['int8'] = int8_path
+
+    try:
+        import onnx
+        from onnxconverter_common import float16
+    except ImportError:
+        logger.warning("onnxconverter-common is not installed; skipping the fp16 variant")
+        return written
+
+    fp16_path = f"{stem}_fp16{extension}"
+    # Keep float32 inputs/outputs so the same letterbox buffer feeds every variant
+    onnx.save(float16.convert_float_to_float16(onnx.load(model_path), keep_io_types=True), fp16_path)
+    written['fp16'] = fp16_path
+    return written
+
+# Global registry instance
+model_variant_registry = ModelVariantRegistry()
+
+__all__ = [
+    'POSE_DETECTOR', 'OBJECT_DETECTOR', 'ModelVariant', 'ModelVariantRegistry', 'object_model_variants',
+    'pose_model_variants', 'quantize_object_model', 'model_variant_registry'
+]
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Create quantized variants of an fp32 ONNX object model")
+    parser.add_argument("model_path", help="Path to the fp32 ONNX model, e.g. models/yolov8n.onnx")
+    arguments = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    for precision, path in quantize_object_model(arguments.model_path).items():
+        print(f"{precision}: {path}")
@@ -5,19 +5,31 @@ Provides professional-grade tracking with identity consistency for sports analys
 across multiple sports including players, balls, and sport-specific equipment
 """
 
+import os
+import re
+import sys
 import numpy as np
 import logging
 import math
 import time
-from typing import Dict, List, Optional, Any, Tuple, Union
+from typing import Dict, List, Optional, Any, Tuple, Union, Callable
 from dataclasses import dataclass, asdict
 from datetime import datetime
 from enum import Enum
 import uuid
-from collections import defaultdict, deque
+import threading
+from collections import defaultdict, deque, OrderedDict
 
 from sport_pack_system import sport_pack_loader
 from unified_cv_pipeline import unified_cv_pipeline
+from detection_scheduler import DetectionScheduleConfig, DetectionScheduler
+from track_association import assign, default_assignment_method, greedy_assignment, iou_matrix
+from kalman_motion import GATING_THRESHOLD_95, KalmanBoxFilter, boxes_to_measurements, measurements_to_boxes
+from track_store import TrackStore
+from spatial_index import SpatialIndex
+from detection_log import DetectionRecorder
+from appearance_embedding import EMBEDDING_SIZE, blend_embeddings, box_histograms, similarity_matrix
+from frame_preprocessor import PreparedFrame
 
 logger = logging.getLogger(__name__)
 
@@ -114,7 +126,11 @@ class TrackHistory:
 
 @dataclass
 class SportTrack:
-    """Sport-specific track with identity consistency"""
+    """
+    Sport-specific track with identity consistency.
+    History, Kalman state and the predicted box live in the tracker's
+    TrackStore at this track's slot; the attributes here are a view over it.
+    """
     track_id: int
     category: ObjectCategory
     current_bbox: BoundingBox
@@ -124,26 +140,63 @@ class SportTrack:
     frames_lost: int
     first_frame: int
     last_frame: int
-    history: deque
+    store: TrackStore
+    slot: int
     velocity: Tuple[float, float]
     acceleration: Tuple[float, float]
-    predicted_bbox: Optional[BoundingBox]
     sport_specific_data: Dict[str, Any]
     
-    def __post_init__(self):
-        if not hasattr(self, 'history') or self.history is None:
-            self.history = deque(maxlen=30)  # Keep last 30 frames
+    @property
+    def history(self) -> List[TrackHistory]:
+        """Recent history points, oldest first, materialized from the store"""
+        columns = self.store.history(self.slot)
+        return [
+            TrackHistory(
+                bbox=BoundingBox(*map(float, box)),
+                confidence=float(confidence),
+                timestamp=float(timestamp),
+                velocity=(float(velocity[0]), float(velocity[1]))
+            )
+            for box, confidence, timestamp, velocity in zip(
+                columns['boxes'], columns['confidences'], columns['timestamps'], columns['velocities']
+            )
+        ]
+    
+    @property
+    def history_length(self) -> int:
+        return int(self.store.counts[self.slot])
+    
+    @property
+    def predicted_bbox(self) -> Optional[BoundingBox]:
+        box = self.store.predicted_boxes[self.slot]
+        if not box.any():
+            return None
+        return BoundingBox(x1=float(box[0]), y1=float(box[1]), x2=float(box[2]), y2=float(box[3]))
+    
+    @predicted_bbox.setter
+    def predicted_bbox(self, bbox: Optional[BoundingBox]):
+        self.store.predicted_boxes[self.slot] = _bbox_array(bbox) if bbox else 0.0
+    
+    @property
+    def kalman_mean(self) -> np.ndarray:
+        """Constant-velocity Kalman state (cx, cy, w, h, velocities per frame)"""
+        return self.store.kalman_means[self.slot]
+    
+    @property
+    def kalman_covariance(self) -> np.ndarray:
+        return self.store.kalman_covariances[self.slot]
     
     def update(self, detection: Detection, frame_id: int):
         """Update track with new detection"""
         # Calculate velocity
-        if self.history:
-            last_history = self.history[-1]
-            dt = detection.timestamp - last_history.timestamp
+        if self.history_length:
+            last = self.store.latest(self.slot)
+            dt = detection.timestamp - self.store.timestamps[self.slot, last]
             if dt > 0:
-                dx = detection.bbox.center_x - last_history.bbox.center_x
-                dy = detection.bbox.center_y - last_history.bbox.center_y
-                new_velocity = (dx / dt, dy / dt)
+                last_box = self.store.boxes[self.slot, last]
+                dx = detection.bbox.center_x - (last_box[0] + last_box[2]) / 2.0
+                dy = detection.bbox.center_y - (last_box[1] + last_box[3]) / 2.0
+                new_velocity = (float(dx / dt), float(dy / dt))
                 
                 # Calculate acceleration
                 if self.velocity != (0, 0):
@@ -162,16 +215,8 @@ class SportTrack:
         self.last_frame = frame_id
         
         # Add to history
-        history_point = TrackHistory(
-            bbox=detection.bbox,
-            confidence=detection.confidence,
-            timestamp=detection.timestamp,
-            velocity=self.velocity
-        )
-        self.history.append(history_point)
-        
-        # Update sport-specific data
-        self._update_sport_specific_data(detection)
+        self.store.append(self.slot, _bbox_array(detection.bbox), detection.confidence,
+                          detection.timestamp, self.velocity)
     
     def predict_next_position(self, dt: float = 1.0/30.0) -> BoundingBox:
         """Predict next position based on velocity and acceleration"""
@@ -201,100 +246,9 @@ class SportTrack:
         """Check if track should be removed"""
         return self.frames_lost > max_lost_frames
     
-    def _update_sport_specific_data(self, detection: Detection):
-        """Update sport-specific tracking data"""
-        if self.category == ObjectCategory.PLAYER:
-            self.sport_specific_data.update({
-                'position_zone': self._get_position_zone(detection.bbox),
-                'movement_pattern': self._analyze_movement_pattern(),
-                'interaction_distance': self._calculate_interaction_distances()
-            })
-        elif self.category == ObjectCategory.BALL:
-            self.sport_specific_data.update({
-                'trajectory': self._calculate_ball_trajectory(),
-                'possession_candidate': self._get_possession_candidate(),
-                'flight_phase': self._determine_flight_phase()
-            })
-    
-    def _get_position_zone(self, bbox: BoundingBox) -> str:
-        """Get position zone for player"""
-        # Simplified zone detection
-        center_x, center_y = bbox.center_x, bbox.center_y
-        if center_x < 0.33:
-            return "left_zone"
-        elif center_x > 0.67:
-            return "right_zone"
-        else:
-            return "center_zone"
-    
-    def _analyze_movement_pattern(self) -> str:
-        """Analyze player movement pattern"""
-        if len(self.history) < 5:
-            return "static"
-        
-        velocities = [h.velocity for h in list(self.history)[-5:]]
-        avg_speed = np.mean([math.sqrt(vx*vx + vy*vy) for vx, vy in velocities])
-        
-        if avg_speed < 5:
-            return "static"
-        elif avg_speed < 20:
-            return "walking"
-        elif avg_speed < 50:
-            return "jogging"
-        else:
-            return "running"
-    
-    def _calculate_interaction_distances(self) -> Dict[str, float]:
-        """Calculate distances to other tracked objects"""
-        return {}  # Implemented by tracker when all tracks are available
-    
-    def _calculate_ball_trajectory(self) -> Dict[str, Any]:
-        """Calculate ball trajectory and physics"""
-        if len(self.history) < 3:
-            return {'type': 'unknown', 'arc_height': 0, 'speed': 0}
-        
-        recent_positions = [(h.bbox.center_x, h.bbox.center_y) for h in list(self.history)[-3:]]
-        
-        # Simple trajectory analysis
-        y_positions = [pos[1] for pos in recent_positions]
-        if len(set(y_positions)) > 1:
-            if y_positions[0] > y_positions[-1]:
-                trajectory_type = "descending"
-            elif y_positions[0] < y_positions[-1]:
-                trajectory_type = "ascending"
-            else:
-                trajectory_type = "horizontal"
-        else:
-            trajectory_type = "horizontal"
-        
-        speed = math.sqrt(self.velocity[0]**2 + self.velocity[1]**2)
-        
-        return {
-            'type': trajectory_type,
-            'arc_height': max(y_positions) - min(y_positions),
-            'speed': speed,
-            'direction': math.atan2(self.velocity[1], self.velocity[0])
-        }
-    
-    def _get_possession_candidate(self) -> Optional[int]:
-        """Get player track ID that likely has ball possession"""
-        # Return the possession candidate that was calculated by the tracker
-        return self.sport_specific_data.get('possession_candidate')
-    
-    def _determine_flight_phase(self) -> str:
-        """Determine ball flight phase"""
-        trajectory = self.sport_specific_data.get('trajectory', {})
-        if trajectory.get('speed', 0) < 10:
-            return "stationary"
-        elif trajectory.get('type') == "ascending":
-            return "ascending"
-        elif trajectory.get('type') == "descending":
-            return "descending"
-        else:
-            return "linear"
-    
     def to_dict(self) -> Dict[str, Any]:
         """Convert track to dictionary"""
+        predicted_bbox = self.predicted_bbox
         return {
             'track_id': self.track_id,
             'category': self.category.value,
@@ -305,11 +259,14 @@ class SportTrack:
             'frames_lost': self.frames_lost,
             'velocity': {'x': self.velocity[0], 'y': self.velocity[1]},
             'acceleration': {'x': self.acceleration[0], 'y': self.acceleration[1]},
-            'predicted_bbox': self.predicted_bbox.to_dict() if self.predicted_bbox else None,
+            'predicted_bbox': predicted_bbox.to_dict() if predicted_bbox else None,
             'sport_specific_data': self.sport_specific_data,
-            'history_length': len(self.history)
+            'history_length': self.history_length
         }
 
+def _bbox_array(bbox: BoundingBox) -> List[float]:
+    return [bbox.x1, bbox.y1, bbox.x2, bbox.y2]
+
 class ByteTracker:
     """ByteTrack implementation for multi-object tracking"""
     
@@ -318,34 +275,74 @@ class ByteTracker:
                  track_thresh: float = 0.6,
                  track_buffer: int = 30,
                  match_thresh: float = 0.8,
-                 min_box_area: float = 100):
+                 min_box_area: float = 100,
+                 assignment: Optional[str] = None,
+                 possession_distance: float = 50.0,
+                 interaction_radius: float = 200.0,
+                 max_lost_tracks: int = 64,
+                 appearance_thresh: float = 0.6,
+                 appearance_weight: float = 0.5):
         
         self.frame_rate = frame_rate
         self.track_thresh = track_thresh
         self.track_buffer = track_buffer
         self.match_thresh = match_thresh
         self.min_box_area = min_box_area
+        # 'hungarian' (optimal, default) or 'greedy' track/detection matching
+        self.assignment = assignment or default_assignment_method()
+        
+        # Tracks are predicted by a Kalman filter and associated against the prediction;
+        # pairs outside the Mahalanobis gate are never matched
+        self.kalman_filter = KalmanBoxFilter()
+        self.gating_threshold = GATING_THRESHOLD_95
+        self.last_timestamp: Optional[float] = None
+        
+        # Columnar history and motion state of every live track, indexed by track slot
+        self.track_store = TrackStore(history_length=30, embedding_size=EMBEDDING_SIZE)
+        
+        # Lost tracks stay for up to track_buffer frames, at most max_lost_tracks of them, and are
+        # re-identified by motion plus colour appearance; with appearance on both sides a pair must
+        # be at least appearance_thresh similar, and its score weighs appearance by appearance_weight
+        self.max_lost_tracks = max_lost_tracks
+        self.appearance_thresh = appearance_thresh
+        self.appearance_weight = appearance_weight
+        
+        # Proximity is answered from one spatial index per frame; player pairs closer than
+        # interaction_radius are kept for the analysis stage as (track ids, track ids, distances)
+        self.possession_distance = possession_distance
+        self.interaction_radius = interaction_radius
+        self.player_pairs: Tuple[np.ndarray, np.ndarray, np.ndarray] = (
+            np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64), np.zeros(0)
+        )
         
         self.tracked_tracks: List[SportTrack] = []
         self.lost_tracks: List[SportTrack] = []
-        self.removed_tracks: List[SportTrack] = []
+        self.removed_track_count = 0
+        self.reidentified_count = 0
         
         self.frame_id = 0
         self.track_id_count = 0
         
-        logger.info(f"ByteTracker initialized with thresh={track_thresh}, buffer={track_buffer}")
+        logger.info(f"ByteTracker initialized with thresh={track_thresh}, buffer={track_buffer}, "
+                    f"assignment={self.assignment}")
     
-    def update(self, detections: List[Detection], frame_timestamp: float) -> List[SportTrack]:
-        """Update tracks with new detections"""
+    def update(self, detections: List[Detection], frame_timestamp: float,
+               frame: Optional[Union[np.ndarray, PreparedFrame]] = None) -> List[SportTrack]:
+        """
+        Update tracks with new detections; with the frame the detections came
+        from, tracks also keep a colour appearance for re-identification
+        """
         self.frame_id += 1
         
         # Separate detections by confidence
         high_conf_detections = [d for d in detections if d.confidence >= self.track_thresh]
         low_conf_detections = [d for d in detections if d.confidence < self.track_thresh]
+        embeddings = self._detection_embeddings(frame, detections)
+        high_conf = np.array([d.confidence >= self.track_thresh for d in detections], dtype=bool)
+        high_conf_embeddings, low_conf_embeddings = embeddings[high_conf], embeddings[~high_conf]
         
-        # Predict current positions for all tracks
-        for track in self.tracked_tracks:
-            track.predict_next_position()
+        # Predict current positions for all tracks, lost ones included
+        self._predict_tracks(self.tracked_tracks + self.lost_tracks, self._frame_steps(frame_timestamp))
         
         # First association: high confidence detections with tracked tracks
         matched_tracks, unmatched_dets, unmatched_tracks = self._associate_tracks_to_detections(
@@ -353,8 +350,12 @@ class ByteTracker:
         )
         
         # Update matched tracks
+        corrected: List[Tuple[SportTrack, BoundingBox]] = []
+        corrected_embeddings: List[np.ndarray] = []
         for track_idx, det_idx in matched_tracks:
             self.tracked_tracks[track_idx].update(high_conf_detections[det_idx], self.frame_id)
+            corrected.append((self.tracked_tracks[track_idx], high_conf_detections[det_idx].bbox))
+            corrected_embeddings.append(high_conf_embeddings[det_idx])
         
         # Handle unmatched tracks from high confidence association
         for track_idx in unmatched_tracks:
@@ -369,42 +370,196 @@ class ByteTracker:
         # Update matched tracks from low confidence association
         for track_idx, det_idx in matched_tracks_low:
             unmatched_tracked_tracks[track_idx].update(low_conf_detections[det_idx], self.frame_id)
-        
-        # Create new tracks from unmatched high confidence detections
-        for det_idx in unmatched_dets:
-            if high_conf_detections[det_idx].bbox.area > self.min_box_area:
-                new_track = self._create_new_track(high_conf_detections[det_idx], self.frame_id)
+            corrected.append((unmatched_tracked_tracks[track_idx], low_conf_detections[det_idx].bbox))
+            corrected_embeddings.append(low_conf_embeddings[det_idx])
+        
+        # Third association: re-identify lost tracks among the remaining high confidence detections
+        remaining_detections = [high_conf_detections[i] for i in unmatched_dets]
+        remaining_embeddings = high_conf_embeddings[unmatched_dets]
+        matched_lost, unmatched_remaining, _ = self._reidentify_lost_tracks(remaining_detections, remaining_embeddings)
+        
+        reidentified = []
+        for track_idx, det_idx in matched_lost:
+            track = self.lost_tracks[track_idx]
+            track.update(remaining_detections[det_idx], self.frame_id)
+            corrected.append((track, remaining_detections[det_idx].bbox))
+            corrected_embeddings.append(remaining_embeddings[det_idx])
+            reidentified.append(track)
+        self.reidentified_count += len(reidentified)
+        
+        self._correct_tracks([track for track, _ in corrected], [bbox for _, bbox in corrected],
+                             np.array(corrected_embeddings).reshape(-1, EMBEDDING_SIZE))
+        
+        # Tracks unmatched in both associations join the lost pool; tracks already there age
+        newly_lost = [t for t in self.tracked_tracks if t.state == TrackState.LOST]
+        still_lost = [t for t in self.lost_tracks if t.state == TrackState.LOST]
+        for track in still_lost:
+            track.mark_lost()
+        self.tracked_tracks = [t for t in self.tracked_tracks if t.state != TrackState.LOST] + reidentified
+        self.lost_tracks = self._prune_lost_tracks(still_lost + newly_lost)
+        
+        # Create new tracks from high confidence detections no track claimed
+        for det_idx in unmatched_remaining:
+            if remaining_detections[det_idx].bbox.area > self.min_box_area:
+                new_track = self._create_new_track(remaining_detections[det_idx], self.frame_id,
+                                                   remaining_embeddings[det_idx])
                 self.tracked_tracks.append(new_track)
         
-        # Move lost tracks to lost_tracks list
-        self.tracked_tracks = [t for t in self.tracked_tracks if t.state != TrackState.LOST]
-        self.lost_tracks.extend([t for t in self.tracked_tracks if t.state == TrackState.LOST])
+        # Free the store slots of tracks that are no longer kept anywhere
+        self.track_store.retain([t.slot for t in self.tracked_tracks] + [t.slot for t in self.lost_tracks])
         
-        # Remove old lost tracks
-        self.lost_tracks = [t for t in self.lost_tracks if not t.should_remove(self.track_buffer)]
+        # Update per-track and cross-track sport data
+        self._update_sport_specific_data([track for track, _ in corrected])
+        self._update_sport_relationships()
+        
+        return self.tracked_tracks.copy()
+    
+    def propagate(self, boxes: np.ndarray, confidence_factors: np.ndarray, frame_timestamp: float) -> List[SportTrack]:
+        """Move tracked tracks to estimated boxes on a frame that ran no detection"""
+        self.frame_id += 1
+        
+        self._predict_tracks(self.tracked_tracks + self.lost_tracks, self._frame_steps(frame_timestamp))
+        for track, box, factor in zip(self.tracked_tracks, boxes, confidence_factors):
+            track.current_bbox = BoundingBox(x1=float(box[0]), y1=float(box[1]), x2=float(box[2]), y2=float(box[3]))
+            track.confidence *= float(factor)
+        # Propagated boxes come from the frame itself, so they correct the filter like a detection
+        self._correct_tracks(self.tracked_tracks, [t.current_bbox for t in self.tracked_tracks])
+        
+        # Lost tracks age on skipped frames too, so track_buffer counts every frame
+        for track in self.lost_tracks:
+            track.mark_lost()
+        self.lost_tracks = self._prune_lost_tracks(self.lost_tracks)
+        self.track_store.retain([t.slot for t in self.tracked_tracks] + [t.slot for t in self.lost_tracks])
         
-        # Update sport-specific relationships
         self._update_sport_relationships()
         
         return self.tracked_tracks.copy()
     
+    def get_motion_arrays(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Boxes (N, 4), velocities and accelerations (N, 2) of the tracked tracks"""
+        tracks = self.tracked_tracks
+        boxes = np.array([[t.current_bbox.x1, t.current_bbox.y1, t.current_bbox.x2, t.current_bbox.y2]
+                          for t in tracks], dtype=np.float64).reshape(-1, 4)
+        velocities = np.array([t.velocity for t in tracks], dtype=np.float64).reshape(-1, 2)
+        accelerations = np.array([t.acceleration for t in tracks], dtype=np.float64).reshape(-1, 2)
+        return boxes, velocities, accelerations
+    
     def _associate_tracks_to_detections(self, tracks: List[SportTrack], detections: List[Detection]) -> Tuple[List[Tuple[int, int]], List[int], List[int]]:
         """Associate tracks to detections using IoU matching"""
         if not tracks or not detections:
             return [], list(range(len(detections))), list(range(len(tracks)))
         
-        # Compute IoU matrix
-        iou_matrix = np.zeros((len(tracks), len(detections)))
-        for t, track in enumerate(tracks):
-            for d, detection in enumerate(detections):
-                iou_matrix[t, d] = self._calculate_iou(track.current_bbox, detection.bbox)
+        scores = self._motion_scores(self._slots(tracks), detections)
         
-        # Apply Hungarian algorithm (simplified greedy matching for now)
-        matched_tracks, unmatched_dets, unmatched_tracks = self._greedy_assignment(
-            iou_matrix, self.match_thresh
-        )
+        # match_thresh is ByteTrack's largest accepted cost, 1 - score
+        return assign(scores, 1.0 - self.match_thresh, self.assignment)
+    
+    def _motion_scores(self, slots: np.ndarray, detections: List[Detection]) -> np.ndarray:
+        """
+        Scores (N, M) of detections against where each track is expected to be this
+        frame. Pairs outside the Mahalanobis gate score 0; inside it a pair scores by
+        box overlap or, for small fast objects that no longer overlap, by motion agreement.
+        """
+        track_boxes = self.track_store.predicted_boxes[slots]
+        detection_boxes = np.array([_bbox_array(d.bbox) for d in detections]).reshape(-1, 4)
+        
+        means, covariances = self.track_store.kalman_means[slots], self.track_store.kalman_covariances[slots]
+        distances = self.kalman_filter.gating_distance(means, covariances, boxes_to_measurements(detection_boxes))
+        gated = distances <= self.gating_threshold
+        scores = np.zeros(distances.shape)
+        if gated.any():
+            scores = np.maximum(iou_matrix(track_boxes, detection_boxes), 1.0 - distances / self.gating_threshold)
+            scores[~gated] = 0.0
+        return scores
+    
+    def _reidentify_lost_tracks(self, detections: List[Detection],
+                                embeddings: np.ndarray) -> Tuple[List[Tuple[int, int]], List[int], List[int]]:
+        """
+        Associate lost tracks to detections by motion and appearance. A lost track's
+        gate widens with every predicted frame, so the colour appearance decides
+        between players who re-appear near each other after an occlusion.
+        """
+        tracks = self.lost_tracks
+        if not tracks or not detections:
+            return [], list(range(len(detections))), list(range(len(tracks)))
         
-        return matched_tracks, unmatched_dets, unmatched_tracks
+        slots = self._slots(tracks)
+        motion = self._motion_scores(slots, detections)
+        
+        track_embeddings = self.track_store.embeddings[slots]
+        appearance = similarity_matrix(track_embeddings, embeddings)
+        compared = track_embeddings.any(axis=1)[:, None] & embeddings.any(axis=1)[None, :]
+        blended = (1.0 - self.appearance_weight) * motion + self.appearance_weight * appearance
+        scores = np.where(compared, np.where(appearance >= self.appearance_thresh, blended, 0.0), motion)
+        
+        # Only gated pairs of the same category may re-identify
+        categories = np.array([t.category.value for t in tracks])
+        detection_categories = np.array([d.category.value for d in detections])
+        scores[(motion <= 0.0) | (categories[:, None] != detection_categories[None, :])] = 0.0
+        
+        return assign(scores, 1.0 - self.match_thresh, self.assignment)
+    
+    def _detection_embeddings(self, frame: Optional[Union[np.ndarray, PreparedFrame]],
+                              detections: List[Detection]) -> np.ndarray:
+        """
+        Appearance embeddings (N, EMBEDDING_SIZE) of detections. Rows are zero
+        without a frame and for detections overlapping another one, whose colours
+        are mixed with their neighbour's and would only blur the track's appearance.
+        Histograms come from the frame's shared FrameFeatures, so an HSV conversion
+        a detector already made is reused.
+        """
+        embeddings = np.zeros((len(detections), EMBEDDING_SIZE), dtype=np.float32)
+        if frame is None or not detections:
+            return embeddings
+        frame = PreparedFrame.of(frame)
+        boxes = np.array([_bbox_array(d.bbox) for d in detections])
+        overlaps = iou_matrix(boxes, boxes)
+        np.fill_diagonal(overlaps, 0.0)
+        clear = ~(overlaps > 0.0).any(axis=1)
+        if clear.any():
+            # Detections are in original-frame pixels; the decoded frame may be reduced
+            embeddings[clear] = box_histograms(frame.features, frame.transform.boxes_from_original(boxes[clear]))
+        return embeddings
+    
+    def _prune_lost_tracks(self, tracks: List[SportTrack]) -> List[SportTrack]:
+        """Drop lost tracks past the track buffer, then the longest lost beyond max_lost_tracks"""
+        kept = [t for t in tracks if not t.should_remove(self.track_buffer)]
+        if len(kept) > self.max_lost_tracks:
+            kept = sorted(kept, key=lambda t: t.frames_lost)[:self.max_lost_tracks]
+        self.removed_track_count += len(tracks) - len(kept)
+        return kept
+    
+    def _frame_steps(self, frame_timestamp: float) -> float:
+        """Frames elapsed since the previous update, at the tracker's frame rate"""
+        elapsed = frame_timestamp - self.last_timestamp if self.last_timestamp is not None else 0.0
+        self.last_timestamp = frame_timestamp
+        return min(elapsed * self.frame_rate, float(self.track_buffer)) if elapsed > 0 else 1.0
+    
+    def _slots(self, tracks: List[SportTrack]) -> np.ndarray:
+        return np.fromiter((t.slot for t in tracks), dtype=np.int64, count=len(tracks))
+    
+    def _predict_tracks(self, tracks: List[SportTrack], steps: float):
+        """Advance every track's filter by steps frames and store the predicted box"""
+        if not tracks:
+            return
+        store, slots = self.track_store, self._slots(tracks)
+        store.kalman_means[slots], store.kalman_covariances[slots] = self.kalman_filter.predict(
+            store.kalman_means[slots], store.kalman_covariances[slots], steps
+        )
+        store.predicted_boxes[slots] = measurements_to_boxes(store.kalman_means[slots])
+    
+    def _correct_tracks(self, tracks: List[SportTrack], bboxes: List[BoundingBox],
+                        embeddings: Optional[np.ndarray] = None):
+        """Correct each track's filter with its matched box, and its appearance with the box's embedding"""
+        if not tracks:
+            return
+        store, slots = self.track_store, self._slots(tracks)
+        measurements = boxes_to_measurements([_bbox_array(b) for b in bboxes])
+        store.kalman_means[slots], store.kalman_covariances[slots] = self.kalman_filter.update(
+            store.kalman_means[slots], store.kalman_covariances[slots], measurements
+        )
+        if embeddings is not None:
+            store.embeddings[slots] = blend_embeddings(store.embeddings[slots], embeddings)
     
     def _calculate_iou(self, bbox1: BoundingBox, bbox2: BoundingBox) -> float:
         """Calculate Intersection over Union of two bounding boxes"""
@@ -424,25 +579,15 @@ class ByteTracker:
     
     def _greedy_assignment(self, cost_matrix: np.ndarray, thresh: float) -> Tuple[List[Tuple[int, int]], List[int], List[int]]:
         """Greedy assignment for track-detection matching"""
-        matched_tracks = []
-        unmatched_tracks = list(range(cost_matrix.shape[0]))
-        unmatched_detections = list(range(cost_matrix.shape[1]))
-        
-        # Sort by highest IoU
-        indices = np.unravel_index(np.argsort(cost_matrix.ravel())[::-1], cost_matrix.shape)
-        
-        for t, d in zip(indices[0], indices[1]):
-            if cost_matrix[t, d] >= thresh and t in unmatched_tracks and d in unmatched_detections:
-                matched_tracks.append((t, d))
-                unmatched_tracks.remove(t)
-                unmatched_detections.remove(d)
-        
-        return matched_tracks, unmatched_detections, unmatched_tracks
+        return greedy_assignment(cost_matrix, thresh)
     
-    def _create_new_track(self, detection: Detection, frame_id: int) -> SportTrack:
+    def _create_new_track(self, detection: Detection, frame_id: int,
+                          embedding: Optional[np.ndarray] = None) -> SportTrack:
         """Create new track from detection"""
         self.track_id_count += 1
         
+        store = self.track_store
+        slot = store.allocate()
         new_track = SportTrack(
             track_id=self.track_id_count,
             category=detection.category,
@@ -453,55 +598,107 @@ class ByteTracker:
             frames_lost=0,
             first_frame=frame_id,
             last_frame=frame_id,
-            history=deque(maxlen=30),
+            store=store,
+            slot=slot,
             velocity=(0.0, 0.0),
             acceleration=(0.0, 0.0),
-            predicted_bbox=None,
             sport_specific_data={}
         )
+        means, covariances = self.kalman_filter.initiate(boxes_to_measurements([_bbox_array(detection.bbox)]))
+        store.kalman_means[slot], store.kalman_covariances[slot] = means[0], covariances[0]
+        store.predicted_boxes[slot] = 0.0
+        if embedding is not None:
+            store.embeddings[slot] = embedding
         
         # Initialize history
-        history_point = TrackHistory(
-            bbox=detection.bbox,
-            confidence=detection.confidence,
-            timestamp=detection.timestamp,
-            velocity=(0.0, 0.0)
-        )
-        new_track.history.append(history_point)
+        store.append(slot, _bbox_array(detection.bbox), detection.confidence, detection.timestamp, (0.0, 0.0))
         
         return new_track
     
+    def _update_sport_specific_data(self, tracks: List[SportTrack]):
+        """Refresh movement and trajectory data of the tracks updated this frame, in one pass per category"""
+        players = [t for t in tracks if t.category == ObjectCategory.PLAYER]
+        balls = [t for t in tracks if t.category == ObjectCategory.BALL]
+        store = self.track_store
+        
+        if players:
+            slots = self._slots(players)
+            # Movement pattern from the mean speed over the last 5 history entries
+            speeds = store.mean_speeds(slots, 5)
+            patterns = np.select([store.counts[slots] < 5, speeds < 5, speeds < 20, speeds < 50],
+                                 ['static', 'static', 'walking', 'jogging'], 'running')
+            for player, pattern in zip(players, patterns.tolist()):
+                center_x = player.current_bbox.center_x
+                player.sport_specific_data.update({
+                    'position_zone': 'left_zone' if center_x < 0.33 else 'right_zone' if center_x > 0.67 else 'center_zone',
+                    'movement_pattern': pattern,
+                    'interaction_distance': {}
+                })
+        
+        if balls:
+            slots = self._slots(balls)
+            # Trajectory from the vertical motion over the last 3 history entries
+            centers, _ = store.centers(slots, 3)
+            y_positions = centers[:, :, 1]
+            first_y, last_y = y_positions[:, 0], y_positions[:, -1]
+            arc_heights = y_positions.max(axis=1) - y_positions.min(axis=1)
+            types = np.select([first_y > last_y, first_y < last_y], ['descending', 'ascending'], 'horizontal')
+            
+            for ball, slot, trajectory_type, arc_height in zip(balls, slots.tolist(), types.tolist(), arc_heights.tolist()):
+                if store.counts[slot] < 3:
+                    trajectory = {'type': 'unknown', 'arc_height': 0, 'speed': 0}
+                else:
+                    trajectory = {
+                        'type': trajectory_type,
+                        'arc_height': arc_height,
+                        'speed': math.hypot(*ball.velocity),
+                        'direction': math.atan2(ball.velocity[1], ball.velocity[0])
+                    }
+                
+                if trajectory['speed'] < 10:
+                    flight_phase = "stationary"
+                elif trajectory['type'] in ("ascending", "descending"):
+                    flight_phase = trajectory['type']
+                else:
+                    flight_phase = "linear"
+                
+                ball.sport_specific_data.update({
+                    'trajectory': trajectory,
+                    'possession_candidate': ball.sport_specific_data.get('possession_candidate'),
+                    'flight_phase': flight_phase
+                })
+    
     def _update_sport_relationships(self):
         """Update sport-specific relationships between tracked objects"""
-        # Update ball possession analysis
         ball_tracks = [t for t in self.tracked_tracks if t.category == ObjectCategory.BALL]
         player_tracks = [t for t in self.tracked_tracks if t.category == ObjectCategory.PLAYER]
         
-        for ball_track in ball_tracks:
-            closest_player_id = None
-            min_distance = float('inf')
-            
-            for player_track in player_tracks:
-                distance = self._calculate_distance(ball_track.current_bbox, player_track.current_bbox)
-                if distance < min_distance:
-                    min_distance = distance
-                    closest_player_id = player_track.track_id
-            
-            # Update ball possession candidate
-            if closest_player_id and min_distance < 50:  # Within 50 pixels
-                ball_track.sport_specific_data['possession_candidate'] = closest_player_id
-            else:
-                ball_track.sport_specific_data['possession_candidate'] = None
-        
-        # Update player interaction distances
-        for i, player_track in enumerate(player_tracks):
-            interaction_distances = {}
-            for j, other_player in enumerate(player_tracks):
-                if i != j:
-                    distance = self._calculate_distance(player_track.current_bbox, other_player.current_bbox)
-                    interaction_distances[f"player_{other_player.track_id}"] = distance
-            
-            player_track.sport_specific_data['interaction_distances'] = interaction_distances
+        player_ids = np.fromiter((t.track_id for t in player_tracks), dtype=np.int64, count=len(player_tracks))
+        players = SpatialIndex(self._centers(player_tracks))
+        
+        # Ball possession: nearest player within possession distance
+        if ball_tracks:
+            nearest, _ = players.nearest_within(self._centers(ball_tracks), self.possession_distance)
+            for ball_track, index in zip(ball_tracks, nearest.tolist()):
+                ball_track.sport_specific_data['possession_candidate'] = int(player_ids[index]) if index >= 0 else None
+        
+        # Player interaction distances, only for players within the interaction radius
+        first, second, distances = players.pairs_within(self.interaction_radius)
+        self.player_pairs = (player_ids[first], player_ids[second], distances)
+        
+        interaction_distances = {t.track_id: {} for t in player_tracks}
+        for a, b, distance in zip(self.player_pairs[0].tolist(), self.player_pairs[1].tolist(), distances.tolist()):
+            interaction_distances[a][f"player_{b}"] = distance
+            interaction_distances[b][f"player_{a}"] = distance
+        for player_track in player_tracks:
+            player_track.sport_specific_data['interaction_distances'] = interaction_distances[player_track.track_id]
+    
+    def _centers(self, tracks: List[SportTrack]) -> np.ndarray:
+        """Current box centers (N, 2) of tracks"""
+        centers = np.empty((len(tracks), 2))
+        for i, track in enumerate(tracks):
+            centers[i] = track.current_bbox.center_x, track.current_bbox.center_y
+        return centers
     
     def _calculate_distance(self, bbox1: BoundingBox, bbox2: BoundingBox) -> float:
         """Calculate Euclidean distance between bounding box centers"""
@@ -522,33 +719,114 @@ class ByteTracker:
     
     def get_tracking_statistics(self) -> Dict[str, Any]:
         """Get tracking statistics"""
+        tracks_by_category = {category.value: 0 for category in ObjectCategory}
+        for track in self.tracked_tracks:
+            tracks_by_category[track.category.value] += 1
+        
         return {
             'active_tracks': len(self.tracked_tracks),
             'lost_tracks': len(self.lost_tracks),
-            'removed_tracks': len(self.removed_tracks),
+            'removed_tracks': self.removed_track_count,
+            'reidentified_tracks': self.reidentified_count,
             'total_tracks_created': self.track_id_count,
             'frame_id': self.frame_id,
-            'tracks_by_category': {
-                category.value: len([t for t in self.tracked_tracks if t.category == category])
-                for category in ObjectCategory
-            }
+            'tracks_by_category': tracks_by_category
         }
 
+# Row layout of tracks in delta results; category and state are indexes into DELTA_LEGEND
+DELTA_TRACK_FIELDS = ('track_id', 'category', 'x1', 'y1', 'x2', 'y2', 'confidence', 'vx', 'vy', 'state')
+DELTA_LEGEND = {
+    'fields': list(DELTA_TRACK_FIELDS),
+    'category': [category.value for category in ObjectCategory],
+    'state': [state.value for state in TrackState]
+}
+_CATEGORY_CODES = {category: i for i, category in enumerate(ObjectCategory)}
+_STATE_CODES = {state: i for i, state in enumerate(TrackState)}
+
+class TrackDeltaEncoder:
+    """
+    Encodes each frame's tracks as changes against the last frame it encoded:
+    new and updated tracks as compact numeric rows, lost and removed tracks
+    as ids. Rows are rounded to `precision` decimals, so a track that did not
+    move is not re-sent.
+    """
+    
+    def __init__(self, precision: int = 1):
+        self.precision = precision
+        self._rows: Dict[int, Tuple] = {}   # Last row sent per visible track
+        self._lost: set = set()             # Tracks reported lost and not yet removed
+    
+    def reset(self):
+        self._rows.clear()
+        self._lost.clear()
+    
+    def _row(self, track: SportTrack) -> Tuple:
+        bbox, p = track.current_bbox, self.precision
+        return (track.track_id, _CATEGORY_CODES[track.category],
+                round(bbox.x1, p), round(bbox.y1, p), round(bbox.x2, p), round(bbox.y2, p),
+                round(track.confidence, 3), round(track.velocity[0], p), round(track.velocity[1], p),
+                _STATE_CODES[track.state])
+    
+    def encode(self, tracks: List[SportTrack], lost_track_ids: set, keyframe: bool = False) -> Dict[str, Any]:
+        """Changes since the previous encode; a keyframe re-sends every track as new"""
+        if keyframe:
+            self.reset()
+        
+        new, updated = [], []
+        rows = {}
+        for track in tracks:
+            row = self._row(track)
+            rows[track.track_id] = row
+            previous = self._rows.get(track.track_id)
+            if previous is None:
+                new.append(row)
+            elif previous != row:
+                updated.append(row)
+        
+        lost, removed = [], []
+        for track_id in self._rows.keys() - rows.keys():
+            if track_id in lost_track_ids:
+                lost.append(track_id)
+                self._lost.add(track_id)
+            else:
+                removed.append(track_id)
+        # Lost tracks that re-appeared are already in new/updated; those that left the lost pool are removed
+        for track_id in list(self._lost):
+            if track_id in rows:
+                self._lost.discard(track_id)
+            elif track_id not in lost_track_ids:
+                removed.append(track_id)
+                self._lost.discard(track_id)
+        
+        self._rows = rows
+        delta = {'new': new, 'updated': updated, 'lost': sorted(lost), 'removed': sorted(removed)}
+        if keyframe:
+            delta['legend'] = DELTA_LEGEND
+        return delta
+
 class MultiObjectTracker:
     """Multi-Object Tracking Pipeline with Sport-Specific Intelligence"""
     
     def __init__(self, sport_name: str = "basketball"):
         self.sport_name = sport_name
-        self.byte_tracker = ByteTracker(
-            frame_rate=30.0,
-            track_thresh=0.6,
-            track_buffer=30,
-            match_thresh=0.8,
-            min_box_area=100
-        )
+        self.sport_config = self._load_sport_config()
+        self.byte_tracker = self._create_byte_tracker()
         
         self.tracking_history: List[Dict[str, Any]] = []
-        self.sport_config = self._load_sport_config()
+        
+        # Detect every N stream frames and propagate tracks in between
+        self.detection_scheduler = DetectionScheduler(DetectionScheduleConfig.for_sport(sport_name))
+        
+        # Frames for one tracker may arrive on several inference executor threads
+        self.lock = threading.RLock()
+        
+        # Delta results: only changed tracks per frame, full statistics every statistics_interval frames
+        self.delta_encoder = TrackDeltaEncoder()
+        self.statistics_interval = max(1, int(os.getenv('EKKALAVYA_TRACK_STATS_INTERVAL', 30)))
+        self._delta_frames = 0
+        
+        # Detection lists given to process_frame, kept for offline replay while recording
+        self.recorder: Optional[DetectionRecorder] = None
         
         self.performance_metrics = {
             'total_frames_processed': 0,
@@ -560,6 +838,24 @@ class MultiObjectTracker:
         
         logger.info(f"MultiObjectTracker initialized for {sport_name}")
     
+    def _create_byte_tracker(self) -> ByteTracker:
+        # The tracker's proximity index must cover every distance the analysis stage asks about
+        collision_distance = self._interaction_rule('player_collision_distance', 30)
+        return ByteTracker(
+            frame_rate=30.0,
+            track_thresh=0.6,
+            track_buffer=30,
+            match_thresh=0.8,
+            min_box_area=100,
+            possession_distance=self._interaction_rule('ball_possession_distance', 50),
+            interaction_radius=max(200.0, collision_distance)
+        )
+    
+    def _interaction_rule(self, name: str, default: float) -> float:
+        """Numeric value of an interaction rule, given either as a number or as {'value': ..., 'unit': ...}"""
+        rule = self.sport_config['interaction_rules'].get(name, default)
+        return float(rule['value'] if isinstance(rule, dict) else rule)
+    
     def _load_sport_config(self) -> Dict[str, Any]:
         """Load sport-specific tracking configuration"""
         try:
@@ -630,13 +926,32 @@ class MultiObjectTracker:
     
     def process_frame(self, 
                      detections: List[Dict[str, Any]], 
-                     frame_timestamp: Optional[float] = None) -> Dict[str, Any]:
-        """Process frame with detections and return tracking results"""
+                     frame_timestamp: Optional[float] = None,
+                     delta: bool = False,
+                     image: Optional[Union[np.ndarray, PreparedFrame]] = None) -> Dict[str, Any]:
+        """
+        Process frame with detections and return tracking results; with delta,
+        only the tracks that changed since the previous delta frame. Passing the
+        image the detections came from (or the PreparedFrame it was decoded to)
+        lets lost players be re-identified by appearance.
+        """
+        with self.lock:
+            return self._process_frame(detections, frame_timestamp, delta, image)
+    
+    def _process_frame(self, 
+                      detections: List[Dict[str, Any]], 
+                      frame_timestamp: Optional[float] = None,
+                      delta: bool = False,
+                      image: Optional[Union[np.ndarray, PreparedFrame]] = None) -> Dict[str, Any]:
+        """Process frame while holding the tracker lock"""
         start_time = time.time()
         
         if frame_timestamp is None:
             frame_timestamp = time.time()
         
+        if self.recorder is not None:
+            self.recorder.record(detections, frame_timestamp)
+        
         # Convert detections to Detection objects
         detection_objects = []
         for det in detections:
@@ -666,28 +981,89 @@ class MultiObjectTracker:
                 continue
         
         # Update tracker
-        active_tracks = self.byte_tracker.update(detection_objects, frame_timestamp)
+        active_tracks = self.byte_tracker.update(detection_objects, frame_timestamp, image)
         
         # Generate tracking results
-        tracking_results = self._generate_tracking_results(active_tracks, frame_timestamp)
+        tracking_results = self._generate_results(active_tracks, frame_timestamp, delta)
         
         # Update performance metrics
         processing_time = (time.time() - start_time) * 1000
         self._update_performance_metrics(detections, active_tracks, processing_time)
         
-        # Store in history
+        self._record_history(frame_timestamp, active_tracks, len(detection_objects))
+        
+        return tracking_results
+    
+    def process_stream_frame(self,
+                             image: Optional[Union[np.ndarray, PreparedFrame]],
+                             frame_timestamp: float,
+                             detect: Callable[[Any], List[Dict[str, Any]]],
+                             delta: bool = False) -> Dict[str, Any]:
+        """
+        Track one frame of a stream, calling detect(image) only on the frames
+        the detection scheduler picks; other frames propagate the tracks
+        """
+        with self.lock:
+            scheduler = self.detection_scheduler
+            run_detection, reason = scheduler.should_detect([t.confidence for t in self.byte_tracker.tracked_tracks])
+            frame = PreparedFrame.of(image) if image is not None else None
+            
+            if run_detection:
+                tracking_results = self._process_frame(detect(image), frame_timestamp, delta, frame)
+                boxes, velocities, _ = self.byte_tracker.get_motion_arrays()
+                scheduler.record_detection(reason, frame_timestamp, frame.features.gray if frame else None,
+                                           boxes, velocities)
+            else:
+                tracking_results = self._propagate_frame(frame, frame_timestamp, delta)
+            
+            tracking_results['detection_schedule'] = {
+                'detected': run_detection,
+                'reason': reason,
+                'interval': scheduler.current_interval
+            }
+            return tracking_results
+    
+    def _propagate_frame(self, frame: Optional[PreparedFrame], frame_timestamp: float,
+                         delta: bool = False) -> Dict[str, Any]:
+        """Advance tracks on a skipped frame while holding the tracker lock"""
+        start_time = time.time()
+        
+        boxes, velocities, accelerations = self.byte_tracker.get_motion_arrays()
+        if frame is None:
+            boxes, confidence_factors = self.detection_scheduler.propagate(
+                frame_timestamp, None, boxes, velocities, accelerations
+            )
+        else:
+            # Optical flow runs on the decoded frame, which may be smaller than the original
+            transform = frame.transform
+            scale = np.array([transform.scale_x, transform.scale_y])
+            boxes, confidence_factors = self.detection_scheduler.propagate(
+                frame_timestamp, frame.features.gray, transform.boxes_from_original(boxes),
+                velocities * scale, accelerations * scale
+            )
+            boxes = transform.boxes_to_original(boxes)
+        active_tracks = self.byte_tracker.propagate(boxes, confidence_factors, frame_timestamp)
+        
+        tracking_results = self._generate_results(active_tracks, frame_timestamp, delta)
+        
+        processing_time = (time.time() - start_time) * 1000
+        self._update_performance_metrics([], active_tracks, processing_time)
+        
+        self._record_history(frame_timestamp, active_tracks, 0)
+        
+        return tracking_results
+    
+    def _record_history(self, frame_timestamp: float, active_tracks: List[SportTrack], detection_count: int):
+        """Store a frame in the tracking history, keeping only recent frames"""
         self.tracking_history.append({
             'timestamp': frame_timestamp,
             'frame_id': self.byte_tracker.frame_id,
             'active_tracks': len(active_tracks),
-            'detections': len(detection_objects)
+            'detections': detection_count
         })
         
-        # Keep only recent history
         if len(self.tracking_history) > 1000:
             self.tracking_history = self.tracking_history[-1000:]
-        
-        return tracking_results
     
     def _map_class_to_category(self, class_name: str) -> ObjectCategory:
         """Map class name to object category"""
@@ -708,6 +1084,36 @@ class MultiObjectTracker:
         else:
             return ObjectCategory.UNKNOWN
     
+    def _generate_results(self, tracks: List[SportTrack], timestamp: float, delta: bool) -> Dict[str, Any]:
+        if delta:
+            return self._generate_delta_results(tracks, timestamp)
+        return self._generate_tracking_results(tracks, timestamp)
+    
+    def _generate_delta_results(self, tracks: List[SportTrack], timestamp: float) -> Dict[str, Any]:
+        """
+        Changed tracks only, plus game events; statistics, sport analysis and
+        performance metrics are attached every statistics_interval frames, and
+        that frame is also a keyframe carrying every track
+        """
+        full_frame = self._delta_frames % self.statistics_interval == 0
+        self._delta_frames += 1
+        
+        lost_track_ids = {t.track_id for t in self.byte_tracker.lost_tracks}
+        results = {
+            'timestamp': timestamp,
+            'frame_id': self.byte_tracker.frame_id,
+            'sport': self.sport_name,
+            'mode': 'delta',
+            'tracks': self.delta_encoder.encode(tracks, lost_track_ids, keyframe=full_frame),
+            'game_events': self._detect_game_events(tracks)
+        }
+        if full_frame:
+            results['statistics'] = self.byte_tracker.get_tracking_statistics()
+            results['sport_analysis'] = self._generate_sport_analysis(tracks)
+            results['performance_metrics'] = self.performance_metrics.copy()
+        
+        return results
+    
     def _generate_tracking_results(self, tracks: List[SportTrack], timestamp: float) -> Dict[str, Any]:
         """Generate comprehensive tracking results"""
         results = {
@@ -753,24 +1159,20 @@ class MultiObjectTracker:
         }
     
     def _analyze_player_interactions(self, tracks: List[SportTrack]) -> List[Dict[str, Any]]:
-        """Analyze player interactions"""
-        player_tracks = [t for t in tracks if t.category == ObjectCategory.PLAYER]
+        """Analyze player interactions from the player pairs the tracker's spatial index found this frame"""
+        player_ids = {t.track_id for t in tracks if t.category == ObjectCategory.PLAYER}
+        collision_distance = self._interaction_rule('player_collision_distance', 30)
         interactions = []
         
-        for i, player in enumerate(player_tracks):
-            for j, other_player in enumerate(player_tracks[i+1:], i+1):
-                distance = self.byte_tracker._calculate_distance(
-                    player.current_bbox, other_player.current_bbox
-                )
-                
-                if distance < self.sport_config['interaction_rules']['player_collision_distance']:
-                    interactions.append({
-                        'type': 'close_contact',
-                        'player_1': player.track_id,
-                        'player_2': other_player.track_id,
-                        'distance': distance,
-                        'severity': 'high' if distance < 20 else 'medium'
-                    })
+        for player_1, player_2, distance in zip(*(column.tolist() for column in self.byte_tracker.player_pairs)):
+            if distance < collision_distance and player_1 in player_ids and player_2 in player_ids:
+                interactions.append({
+                    'type': 'close_contact',
+                    'player_1': player_1,
+                    'player_2': player_2,
+                    'distance': distance,
+                    'severity': 'high' if distance < 20 else 'medium'
+                })
         
         return interactions
     
@@ -852,6 +1254,30 @@ class MultiObjectTracker:
         track = self.byte_tracker.get_track_by_id(track_id)
         return track.to_dict() if track else None
     
+    def memory_bytes(self) -> int:
+        """Approximate bytes held by this tracker's track store, frame history and scheduler"""
+        history_bytes = 0
+        if self.tracking_history:
+            entry = self.tracking_history[-1]
+            history_bytes = len(self.tracking_history) * (
+                sys.getsizeof(entry) + sum(sys.getsizeof(value) for value in entry.values())
+            )
+        recording_bytes = self.recorder.memory_bytes() if self.recorder is not None else 0
+        return (self.byte_tracker.track_store.memory_bytes() + history_bytes
+                + self.detection_scheduler.memory_bytes() + recording_bytes)
+    
+    def start_recording(self) -> DetectionRecorder:
+        """Record every detection list given to process_frame from now on, for tracking_replay"""
+        with self.lock:
+            self.recorder = DetectionRecorder(self.sport_name)
+            return self.recorder
+    
+    def stop_recording(self) -> Optional[DetectionRecorder]:
+        """Stop recording and hand back what was recorded, if anything"""
+        with self.lock:
+            recorder, self.recorder = self.recorder, None
+            return recorder
+    
     def get_tracking_summary(self) -> Dict[str, Any]:
         """Get comprehensive tracking summary"""
         return {
@@ -860,6 +1286,7 @@ class MultiObjectTracker:
             'statistics': self.byte_tracker.get_tracking_statistics(),
             'performance_metrics': self.performance_metrics,
             'history_length': len(self.tracking_history),
+            'detection_schedule': self.detection_scheduler.get_stats(),
             'capabilities': [
                 'multi_object_tracking',
                 'identity_consistency',
@@ -875,27 +1302,200 @@ class MultiObjectTracker:
     
     def reset_tracking(self):
         """Reset tracking state"""
-        self.byte_tracker = ByteTracker(
-            frame_rate=30.0,
-            track_thresh=0.6,
-            track_buffer=30,
-            match_thresh=0.8,
-            min_box_area=100
-        )
-        self.tracking_history = []
+        with self.lock:
+            self.byte_tracker = self._create_byte_tracker()
+            self.tracking_history = []
+            self.detection_scheduler.reset()
+            self.delta_encoder.reset()
+            self._delta_frames = 0
         logger.info(f"Tracking reset for {self.sport_name}")
 
-# Global multi-object tracker instances
-multi_object_trackers: Dict[str, MultiObjectTracker] = {}
+DEFAULT_SESSION_ID = "default"
+
+@dataclass
+class TrackerSession:
+    """Tracker owned by one streaming session"""
+    session_id: str
+    sport_name: str
+    tracker: MultiObjectTracker
+    created_at: float
+    last_used: float
+
+class TrackerRegistry:
+    """
+    MultiObjectTracker per (sport, session id), so identities from different
+    courts never share a ByteTracker and sessions do not contend on one lock.
+    Trackers idle longer than idle_timeout are dropped, and the least recently
+    used one is evicted when max_trackers or the memory budget is exceeded.
+    Callers that pass no session id share the sport's default tracker.
+    With record_dir set, every session records its detections and saves them
+    there as a detection log when it is released or evicted. Trackers are
+    built and recordings written outside the registry lock, so other
+    sessions' frames never wait on them.
+    """
+    
+    def __init__(self,
+                 max_trackers: Optional[int] = None,
+                 idle_timeout: Optional[float] = None,
+                 max_memory_mb: Optional[float] = None,
+                 record_dir: Optional[str] = None):
+        self.max_trackers = max(1, max_trackers if max_trackers is not None else
+                                int(os.getenv('EKKALAVYA_TRACKER_MAX', 64)))
+        self.idle_timeout = idle_timeout if idle_timeout is not None else \
+            float(os.getenv('EKKALAVYA_TRACKER_IDLE_SECONDS', 300.0))
+        self.max_memory_bytes = (max_memory_mb if max_memory_mb is not None else
+                                 float(os.getenv('EKKALAVYA_TRACKER_MAX_MEMORY_MB', 512.0))) * 1024 * 1024
+        self.record_dir = record_dir if record_dir is not None else os.getenv('EKKALAVYA_TRACK_RECORD_DIR')
+        
+        self._sessions: 'OrderedDict[Tuple[str, str], TrackerSession]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._last_sweep = time.time()
+        self.stats = {
+            'trackers_created': 0,
+            'trackers_released': 0,
+            'idle_evictions': 0,
+            'capacity_evictions': 0,
+            'memory_evictions': 0,
+            'recordings_saved': 0
+        }
+    
+    def get(self, sport_name: str, session_id: Optional[str] = None) -> MultiObjectTracker:
+        """Get the live tracker for a session, creating (and evicting) as needed"""
+        key = (sport_name, session_id or DEFAULT_SESSION_ID)
+        departed: List[TrackerSession] = []
+        try:
+            with self._lock:
+                departed += self._evict_idle()
+                tracker = self._touch(key)
+            if tracker is not None:
+                return tracker
+            
+            tracker = MultiObjectTracker(sport_name)
+            if self.record_dir:
+                tracker.start_recording()
+            
+            with self._lock:
+                # Another request may have created the session while this tracker was built
+                existing = self._touch(key)
+                if existing is not None:
+                    return existing
+                
+                while len(self._sessions) >= self.max_trackers:
+                    departed.append(self._sessions.popitem(last=False)[1])
+                    self.stats['capacity_evictions'] += 1
+                departed += self._evict_over_memory_budget()
+                
+                now = time.time()
+                self._sessions[key] = TrackerSession(key[1], sport_name, tracker, now, now)
+                self.stats['trackers_created'] += 1
+                return tracker
+        finally:
+            self._close_all(departed)
+    
+    def find(self, sport_name: str, session_id: Optional[str] = None) -> Optional[MultiObjectTracker]:
+        """The live tracker for a session, or None; never creates one"""
+        with self._lock:
+            session = self._sessions.get((sport_name, session_id or DEFAULT_SESSION_ID))
+            return session.tracker if session is not None else None
+    
+    def _touch(self, key: Tuple[str, str]) -> Optional[MultiObjectTracker]:
+        """Mark a live session as just used and return its tracker; caller holds the lock"""
+        session = self._sessions.get(key)
+        if session is None:
+            return None
+        self._sessions.move_to_end(key)
+        session.last_used = time.time()
+        return session.tracker
+    
+    def _evict_idle(self, force: bool = False) -> List[TrackerSession]:
+        """Remove trackers idle past the timeout and return them; caller must hold the registry lock"""
+        now = time.time()
+        if not force and now - self._last_sweep < min(self.idle_timeout, 5.0):
+            return []
+        self._last_sweep = now
+        
+        idle_keys = [key for key, session in self._sessions.items()
+                     if now - session.last_used > self.idle_timeout]
+        self.stats['idle_evictions'] += len(idle_keys)
+        return [self._sessions.pop(key) for key in idle_keys]
+    
+    def _evict_over_memory_budget(self) -> List[TrackerSession]:
+        """Remove least recently used trackers until the rest fit the memory budget; caller holds the lock"""
+        evicted = []
+        total = sum(session.tracker.memory_bytes() for session in self._sessions.values())
+        while self._sessions and total > self.max_memory_bytes:
+            _, oldest = self._sessions.popitem(last=False)
+            total -= oldest.tracker.memory_bytes()
+            evicted.append(oldest)
+            self.stats['memory_evictions'] += 1
+        return evicted
+    
+    def release(self, sport_name: str, session_id: Optional[str] = None) -> bool:
+        """Drop a session's tracker, e.g. when its stream ends"""
+        with self._lock:
+            session = self._sessions.pop((sport_name, session_id or DEFAULT_SESSION_ID), None)
+            if session is not None:
+                self.stats['trackers_released'] += 1
+        if session is not None:
+            self._close(session)
+        return session is not None
+    
+    def _close_all(self, sessions: List[TrackerSession]):
+        for session in sessions:
+            self._close(session)
+    
+    def _close(self, session: TrackerSession):
+        """Save a departing session's recording, if it made one; called without the lock held"""
+        recorder = session.tracker.stop_recording()
+        if recorder is None or not len(recorder):
+            return
+        name = re.sub(r'[^A-Za-z0-9_.-]', '_', f"{session.sport_name}_{session.session_id}")
+        path = os.path.join(self.record_dir, f"{name}_{int(session.created_at)}.npz")
+        try:
+            os.makedirs(self.record_dir, exist_ok=True)
+            recorder.save(path)
+            with self._lock:
+                self.stats['recordings_saved'] += 1
+            logger.info(f"Saved {len(recorder)} recorded frames to {path}")
+        except OSError as e:
+            logger.warning(f"Could not save detection recording to {path}: {e}")
+    
+    def evict_idle(self) -> int:
+        """Drop every tracker idle past the timeout"""
+        with self._lock:
+            departed = self._evict_idle(force=True)
+        self._close_all(departed)
+        return len(departed)
+    
+    def sessions(self) -> List[TrackerSession]:
+        with self._lock:
+            return list(self._sessions.values())
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Live tracker count, memory use and lifecycle counters"""
+        sessions = self.sessions()
+        stats = dict(self.stats)
+        stats['active_trackers'] = len(sessions)
+        stats['memory_bytes'] = sum(session.tracker.memory_bytes() for session in sessions)
+        stats['max_trackers'] = self.max_trackers
+        stats['max_memory_bytes'] = int(self.max_memory_bytes)
+        stats['idle_timeout_seconds'] = self.idle_timeout
+        return stats
+
+# Global tracker registry
+tracker_registry = TrackerRegistry()
+
+def get_tracker(sport_name: str, session_id: Optional[str] = None) -> MultiObjectTracker:
+    """Get or create the tracker for a sport and streaming session"""
+    return tracker_registry.get(sport_name, session_id)
 
-def get_tracker(sport_name: str) -> MultiObjectTracker:
-    """Get or create tracker for sport"""
-    if sport_name not in multi_object_trackers:
-        multi_object_trackers[sport_name] = MultiObjectTracker(sport_name)
-    return multi_object_trackers[sport_name]
+def find_tracker(sport_name: str, session_id: Optional[str] = None) -> Optional[MultiObjectTracker]:
+    """The existing tracker for a sport and streaming session, or None"""
+    return tracker_registry.find(sport_name, session_id)
 
 # Export key classes and functions
 __all__ = [
     'MultiObjectTracker', 'ByteTracker', 'SportTrack', 'Detection', 
-    'BoundingBox', 'TrackState', 'ObjectCategory', 'get_tracker'
+    'BoundingBox', 'TrackState', 'ObjectCategory', 'TrackDeltaEncoder', 'DELTA_TRACK_FIELDS', 'TrackerRegistry', 'TrackerSession',
+    'tracker_registry', 'get_tracker', 'find_tracker'
 ]
\ No newline at end of file
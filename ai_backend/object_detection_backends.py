@@ -0,0 +1,427 @@
+#!/usr/bin/env python3
+"""
+Object Detection Backends - CPU inference of YOLO-family ONNX models
+Runs a local ONNX model through ONNX Runtime or OpenCV DNN with letterboxed,
+batched input and vectorized non-maximum suppression
+"""
+
+import os
+import ast
+import logging
+import threading
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Any, Tuple
+
+import cv2
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Class order of the stock COCO-trained YOLO exports
+COCO_CLASS_NAMES = (
+    'person', 'bicycle', 'car', 'motorcycle', 'airplane', 'bus', 'train', 'truck', 'boat',
+    'traffic light', 'fire hydrant', 'stop sign', 'parking meter', 'bench', 'bird', 'cat', 'dog',
+    'horse', 'sheep', 'cow', 'elephant', 'bear', 'zebra', 'giraffe', 'backpack', 'umbrella',
+    'handbag', 'tie', 'suitcase', 'frisbee', 'skis', 'snowboard', 'sports ball', 'kite',
+    'baseball bat', 'baseball glove', 'skateboard', 'surfboard', 'tennis racket', 'bottle',
+    'wine glass', 'cup', 'fork', 'knife', 'spoon', 'bowl', 'banana', 'apple', 'sandwich', 'orange',
+    'broccoli', 'carrot', 'hot dog', 'pizza', 'donut', 'cake', 'chair', 'couch', 'potted plant',
+    'bed', 'dining table', 'toilet', 'tv', 'laptop', 'mouse', 'remote', 'keyboard', 'cell phone',
+    'microwave', 'oven', 'toaster', 'sink', 'refrigerator', 'book', 'clock', 'vase', 'scissors',
+    'teddy bear', 'hair drier', 'toothbrush'
+)
+
+BACKEND_HEURISTIC = 'heuristic'
+BACKEND_ONNXRUNTIME = 'onnxruntime'
+BACKEND_OPENCV_DNN = 'opencv_dnn'
+BACKEND_AUTO = 'auto'
+
+def normalize_class_name(name: str) -> str:
+    """'sports ball' -> 'sports_ball', matching the pipeline's object naming"""
+    return name.strip().lower().replace(' ', '_').replace('-', '_')
+
+@dataclass
+class ObjectDetectorConfig:
+    """Object detection backend selection and model settings"""
+    backend: str = BACKEND_AUTO
+    model_path: Optional[str] = None
+    class_names_path: Optional[str] = None
+    input_size: int = 640
+    score_threshold: float = 0.25
+    iou_threshold: float = 0.45
+    max_detections: int = 100
+    batch_size: int = 8
+    num_threads: int = 1
+
+    @classmethod
+    def from_env(cls, model_size: str = 'n') -> 'ObjectDetectorConfig':
+        """Build config from EKKALAVYA_OBJECT_* variables"""
+        return cls(
+            backend=os.getenv('EKKALAVYA_OBJECT_BACKEND', BACKEND_AUTO).strip().lower(),
+            model_path=os.getenv('EKKALAVYA_OBJECT_MODEL', os.path.join('models', f'yolov8{model_size}.onnx')),
+            class_names_path=os.getenv('EKKALAVYA_OBJECT_CLASSES') or None,
+            input_size=int(os.getenv('EKKALAVYA_OBJECT_INPUT_SIZE', 640)),
+            score_threshold=float(os.getenv('EKKALAVYA_OBJECT_SCORE_THRESHOLD', 0.25)),
+            iou_threshold=float(os.getenv('EKKALAVYA_OBJECT_IOU_THRESHOLD', 0.45)),
+            max_detections=int(os.getenv('EKKALAVYA_OBJECT_MAX_DETECTIONS', 100)),
+            batch_size=max(1, int(os.getenv('EKKALAVYA_OBJECT_BATCH_SIZE', 8))),
+            # The detector pool already runs one worker per core
+            num_threads=max(0, int(os.getenv('EKKALAVYA_OBJECT_THREADS', 1)))
+        )
+
+@dataclass
+class LetterboxTransform:
+    """Scale and padding applied by letterboxing; maps model boxes back to the image"""
+    scale: float
+    pad_x: float
+    pad_y: float
+    width: int
+    height: int
+
+    def boxes_to_image(self, boxes: np.ndarray) -> np.ndarray:
+        """Map (N, 4) x1/y1/x2/y2 boxes from model input to image pixels, clipped to the image"""
+        mapped = boxes.copy()
+        mapped[:, [0, 2]] = ((mapped[:, [0, 2]] - self.pad_x) / self.scale).clip(0, self.width)
+        mapped[:, [1, 3]] = ((mapped[:, [1, 3]] - self.pad_y) / self.scale).clip(0, self.height)
+        return mapped
+
+class LetterboxBuffer:
+    """
+    Reusable NCHW float32 model input. Images are resized with preserved
+    aspect ratio onto a grey square canvas and written into one batch slot,
+    so steady-state inference allocates no new input arrays. The batch grows
+    to the largest one requested rather than the backend maximum, since a
+    640px slot is about 5 MB and most calls carry a single frame.
+    """
+
+    def __init__(self, input_size: int, batch_size: int = 1):
+        self.input_size = input_size
+        self.batch = np.empty((batch_size, 3, input_size, input_size), np.float32)
+        self.canvas = np.empty((input_size, input_size, 3), np.uint8)
+
+    def reserve(self, batch_size: int) -> np.ndarray:
+        """View of the first batch_size slots, growing the buffer if it is smaller"""
+        if batch_size > len(self.batch):
+            self.batch = np.empty((batch_size, 3, self.input_size, self.input_size), np.float32)
+        return self.batch[:batch_size]
+
+    def fill(self, slot: int, image: np.ndarray) -> LetterboxTransform:
+        height, width = image.shape[:2]
+        scale = min(self.input_size / width, self.input_size / height)
+        new_width, new_height = max(1, int(round(width * scale))), max(1, int(round(height * scale)))
+        pad_x, pad_y = (self.input_size - new_width) // 2, (self.input_size - new_height) // 2
+
+        self.canvas[:] = 114
+        self.canvas[pad_y:pad_y + new_height, pad_x:pad_x + new_width] = cv2.resize(
+            image, (new_width, new_height), interpolation=cv2.INTER_LINEAR
+        )
+        # BGR HWC uint8 -> RGB CHW float in [0, 1]
+        np.multiply(self.canvas.transpose(2, 0, 1)[::-1], 1.0 / 255.0, out=self.batch[slot], casting='unsafe')
+        return LetterboxTransform(scale, pad_x, pad_y, width, height)
+
+def box_iou(box: np.ndarray, boxes: np.ndarray) -> np.ndarray:
+    """IoU of one x1/y1/x2/y2 box against (N, 4) boxes"""
+    x1 = np.maximum(box[0], boxes[:, 0])
+    y1 = np.maximum(box[1], boxes[:, 1])
+    x2 = np.minimum(box[2], boxes[:, 2])
+    y2 = np.minimum(box[3], boxes[:, 3])
+    intersection = np.clip(x2 - x1, 0, None) * np.clip(y2 - y1, 0, None)
+    area = (box[2] - box[0]) * (box[3] - box[1])
+    areas = (boxes[:, 2] - boxes[:, 0]) * (boxes[:, 3] - boxes[:, 1])
+    return intersection / np.maximum(area + areas - intersection, 1e-9)
+
+def non_max_suppression(boxes: np.ndarray, scores: np.ndarray, class_ids: np.ndarray,
+                        iou_threshold: float, max_detections: int) -> np.ndarray:
+    """
+    Class-aware greedy NMS. Boxes are offset per class so one pass never
+    suppresses across classes; each kept box removes its overlaps with one
+    vectorized IoU over the remaining candidates. Returns kept indices by score.
+    """
+    if len(boxes) == 0:
+        return np.empty(0, np.intp)
+
+    offsets = class_ids.astype(np.float64)[:, None] * (float(boxes.max()) + 1.0)
+    shifted = boxes + offsets
+    order = np.argsort(-scores, kind='stable')
+    keep = []
+    while order.size and len(keep) < max_detections:
+        best = order[0]
+        keep.append(best)
+        rest = order[1:]
+        order = rest[box_iou(shifted[best], shifted[rest]) <= iou_threshold]
+    return np.asarray(keep, np.intp)
+
+def decode_yolo_output(output: np.ndarray, num_classes: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Decode one image's raw YOLO head into (boxes x1/y1/x2/y2, scores, class ids).
+    Accepts the YOLOv8 layout (4 + classes, anchors) and the YOLOv5 layout
+    (anchors, 5 + classes) with an objectness column.
+    """
+    channels = (4 + num_classes, 5 + num_classes)
+    if output.shape[1] not in channels and (output.shape[0] in channels or output.shape[0] < output.shape[1]):
+        output = output.T
+    if output.shape[1] == 5 + num_classes:
+        class_scores = output[:, 5:] * output[:, 4:5]
+    else:
+        class_scores = output[:, 4:]
+
+    class_ids = class_scores.argmax(axis=1)
+    scores = class_scores[np.arange(len(class_scores)), class_ids]
+
+    cx, cy, w, h = output[:, 0], output[:, 1], output[:, 2], output[:, 3]
+    boxes = np.stack([cx - w / 2, cy - h / 2, cx + w / 2, cy + h / 2], axis=1)
+    return boxes, scores, class_ids
+
+class ObjectDetectorBackend(ABC):
+    """
+    Model-backed object detector. Subclasses only load the model and run one
+    forward pass; batching, letterboxing, decoding, thresholds and NMS are shared.
+    """
+
+    name = 'base'
+
+    def __init__(self, config: ObjectDetectorConfig):
+        self.config = config
+        self.class_names: List[str] = []
+        self.max_batch_size = config.batch_size
+        # True when the graph only accepts exactly max_batch_size inputs
+        self.static_batch = False
+        self._buffers = threading.local()
+
+    @abstractmethod
+    def load(self) -> bool:
+        """Load the model; False when it cannot be used"""
+
+    @abstractmethod
+    def infer(self, batch: np.ndarray) -> np.ndarray:
+        """Run the model on an (N, 3, S, S) batch, returning the raw (N, ...) head output"""
+
+    def _load_class_names(self, embedded: Optional[List[str]] = None):
+        """Class names from the configured file, the model metadata, or COCO"""
+        path = self.config.class_names_path
+        if path and os.path.exists(path):
+            with open(path) as handle:
+                names = [line.strip() for line in handle if line.strip()]
+        else:
+            names = embedded or list(COCO_CLASS_NAMES)
+        self.class_names = [normalize_class_name(name) for name in names]
+
+    def _buffer(self) -> LetterboxBuffer:
+        # One input buffer per worker thread; reused across calls
+        buffer = getattr(self._buffers, 'buffer', None)
+        if buffer is None:
+            buffer = LetterboxBuffer(self.config.input_size)
+            self._buffers.buffer = buffer
+        return buffer
+
+    def detect_batch(self, images: List[np.ndarray],
+                     class_thresholds: Optional[Dict[str, float]] = None) -> List[List[Dict[str, Any]]]:
+        """Detect objects in every image, returning one detection list per image in order"""
+        results: List[List[Dict[str, Any]]] = []
+        buffer = self._buffer()
+        for start in range(0, len(images), self.max_batch_size):
+            chunk = images[start:start + self.max_batch_size]
+            # A static-batch graph gets a full batch; outputs of the unused slots are ignored
+            batch = buffer.reserve(self.max_batch_size if self.static_batch else len(chunk))
+            transforms = [buffer.fill(slot, image) for slot, image in enumerate(chunk)]
+            outputs = self.infer(batch)
+            for output, transform in zip(outputs, transforms):
+                results.append(self._postprocess(output, transform, class_thresholds or {}))
+        return results
+
+    def _postprocess(self, output: np.ndarray, transform: LetterboxTransform,
+                     class_thresholds: Dict[str, float]) -> List[Dict[str, Any]]:
+        boxes, scores, class_ids = decode_yolo_output(output, len(self.class_names))
+
+        # Prefilter at the loosest threshold so a class configured below the global
+        # score_threshold keeps its low-scoring boxes for the per-class pass
+        prefilter = min([self.config.score_threshold, *class_thresholds.values()])
+        candidates = scores >= prefilter
+        boxes, scores, class_ids = boxes[candidates], scores[candidates], class_ids[candidates]
+        if class_thresholds and len(scores):
+            per_class = np.full(max(len(self.class_names), int(class_ids.max()) + 1),
+                                self.config.score_threshold, np.float32)
+            for class_id, class_name in enumerate(self.class_names):
+                per_class[class_id] = class_thresholds.get(class_name, self.config.score_threshold)
+            passing = scores >= per_class[class_ids]
+            boxes, scores, class_ids = boxes[passing], scores[passing], class_ids[passing]
+
+        keep = non_max_suppression(boxes, scores, class_ids, self.config.iou_threshold, self.config.max_detections)
+        boxes = transform.boxes_to_image(boxes[keep])
+
+        detections = []
+        for (x1, y1, x2, y2), score, class_id in zip(boxes.round().astype(int), scores[keep], class_ids[keep]):
+            class_id = int(class_id)
+            detections.append({
+                'class_name': self.class_names[class_id] if class_id < len(self.class_names) else str(class_id),
+                'class_id': class_id,
+                'confidence': float(score),
+                'bbox': {
+                    'x1': int(x1),
+                    'y1': int(y1),
+                    'x2': int(x2),
+                    'y2': int(y2),
+                    'width': int(x2 - x1),
+                    'height': int(y2 - y1)
+                },
+                'detection_backend': self.name
+            })
+        return detections
+
+class OnnxRuntimeBackend(ObjectDetectorBackend):
+    """ONNX Runtime on the CPU execution provider"""
+
+    name = BACKEND_ONNXRUNTIME
+
+    def __init__(self, config: ObjectDetectorConfig):
+        super().__init__(config)
+        self.session = None
+        self.input_name = None
+
+    def load(self) -> bool:
+        try:
+            import onnxruntime as ort
+        except ImportError:
+            logger.warning("onnxruntime is not installed")
+            return False
+
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = self.config.num_threads
+        options.inter_op_num_threads = 1
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = ort.InferenceSession(self.config.model_path, options, providers=['CPUExecutionProvider'])
+
+        model_input = self.session.get_inputs()[0]
+        self.input_name = model_input.name
+        if isinstance(model_input.shape[0], int):
+            # Fixed batch dimension in the exported graph
+            self.max_batch_size = model_input.shape[0]
+            self.static_batch = True
+        if isinstance(model_input.shape[-1], int):
+            self.config.input_size = model_input.shape[-1]
+
+        self._load_class_names(self._metadata_class_names())
+        return True
+
+    def _metadata_class_names(self) -> Optional[List[str]]:
+        """Ultralytics exports store {index: name} under the 'names' metadata key"""
+        raw = self.session.get_modelmeta().custom_metadata_map.get('names')
+        if not raw:
+            return None
+        try:
+            names = ast.literal_eval(raw)
+        except (ValueError, SyntaxError):
+            return None
+        return [names[index] for index in sorted(names)] if isinstance(names, dict) else list(names)
+
+    def infer(self, batch: np.ndarray) -> np.ndarray:
+        return self.session.run(None, {self.input_name: batch})[0]
+
+class OpenCVDnnBackend(ObjectDetectorBackend):
+    """OpenCV DNN module; needs no extra dependency"""
+
+    name = BACKEND_OPENCV_DNN
+
+    def __init__(self, config: ObjectDetectorConfig):
+        super().__init__(config)
+        self.net = None
+        # cv2.dnn.Net is not safe to share between threads
+        self._lock = threading.Lock()
+
+    def load(self) -> bool:
+        self.net = cv2.dnn.readNetFromONNX(self.config.model_path)
+        self.net.setPreferableBackend(cv2.dnn.DNN_BACKEND_OPENCV)
+        self.net.setPreferableTarget(cv2.dnn.DNN_TARGET_CPU)
+        self._load_class_names()
+        return self._detect_batch_size()
+
+    def _detect_batch_size(self) -> bool:
+        """
+        OpenCV does not expose the graph's declared input shape, so probe it:
+        a graph exported with a fixed batch fails, or answers with its own
+        batch, when given any other batch size
+        """
+        if self._accepts_batch(1):
+            if self.max_batch_size > 1 and not self._accepts_batch(2):
+                self.max_batch_size = 1
+                self.static_batch = True
+            return True
+        if self.max_batch_size > 1 and self._accepts_batch(self.max_batch_size):
+            self.static_batch = True
+            return True
+        logger.warning(f"{self.config.model_path} accepts neither batch 1 nor {self.max_batch_size} "
+                       f"at input size {self.config.input_size}")
+        return False
+
+    def _accepts_batch(self, batch_size: int) -> bool:
+        size = self.config.input_size
+        try:
+            self.net.setInput(np.zeros((batch_size, 3, size, size), np.float32))
+            return self.net.forward().shape[0] == batch_size
+        except cv2.error:
+            return False
+
+    def infer(self, batch: np.ndarray) -> np.ndarray:
+        with self._lock:
+            self.net.setInput(batch)
+            return self.net.forward()
+
+_BACKENDS = {
+    BACKEND_ONNXRUNTIME: OnnxRuntimeBackend,
+    BACKEND_OPENCV_DNN: OpenCVDnnBackend
+}
+
+def create_object_detector_backend(config: ObjectDetectorConfig) -> Optional[ObjectDetectorBackend]:
+    """
+    Load the configured backend. Returns None for the heuristic backend, or when
+    no model can be loaded, so the caller falls back to OpenCV heuristics.
+    """
+    if config.backend == BACKEND_HEURISTIC:
+        return None
+
+    if not config.model_path or not os.path.exists(config.model_path):
+        if config.backend != BACKEND_AUTO:
+            logger.warning(f"Object detection model not found at {config.model_path}, using heuristic detection")
+        return None
+
+    if config.backend == BACKEND_AUTO:
+        names = [BACKEND_ONNXRUNTIME, BACKEND_OPENCV_DNN]
+    elif config.backend in _BACKENDS:
+        names = [config.backend]
+    else:
+        logger.warning(f"Unknown object detection backend {config.backend!r}, using heuristic detection")
+        return None
+
+    for name in names:
+        backend = _BACKENDS[name](config)
+        try:
+            if backend.load():
+                logger.info(f"Object detection backend {name} loaded {config.model_path} "
+                            f"({len(backend.class_names)} classes, batch {backend.max_batch_size})")
+                return backend
+        except Exception as e:
+            logger.warning(f"Object detection backend {name} failed to load {config.model_path}: {str(e)}")
+    return None
+
+def class_thresholds_from_sport_pack(sport_pack: Any) -> Dict[str, float]:
+    """Per-class confidence thresholds from a sport pack's object detection_config"""
+    thresholds: Dict[str, float] = {}
+    if sport_pack is None:
+        return thresholds
+    for obj in sport_pack.objects:
+        threshold = obj.detection_config.get('confidence_threshold')
+        if threshold is None:
+            continue
+        thresholds[normalize_class_name(obj.name)] = float(threshold)
+        if obj.type == 'ball':
+            # Generic detectors report every ball as 'sports ball'
+            thresholds.setdefault('sports_ball', float(threshold))
+    return thresholds
+
+__all__ = [
+    'COCO_CLASS_NAMES', 'BACKEND_HEURISTIC', 'BACKEND_ONNXRUNTIME', 'BACKEND_OPENCV_DNN', 'BACKEND_AUTO',
+    'ObjectDetectorConfig', 'LetterboxTransform', 'LetterboxBuffer', 'ObjectDetectorBackend',
+    'OnnxRuntimeBackend', 'OpenCVDnnBackend', 'normalize_class_name', 'box_iou', 'non_max_suppression',
+    'decode_yolo_output', 'create_object_detector_backend', 'class_thresholds_from_sport_pack'
+]
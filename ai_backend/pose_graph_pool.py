@@ -0,0 +1,396 @@
+#!/usr/bin/env python3
+"""
+Pose Graph Pool - Checkout/checkin pool of MediaPipe Pose graphs
+Gives each inference worker its own static-image pose graph so concurrent
+requests neither share tracking state nor serialize on a single graph, and
+pins video-mode tracking graphs to streaming sessions
+"""
+
+import os
+import queue
+import logging
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Dict, Any, Iterator, List, Optional, Tuple
+
+import numpy as np
+import mediapipe as mp
+
+from custom_exceptions import PoseDetectionError, InferenceOverloadError
+from inference_executor import inference_executor
+
+logger = logging.getLogger(__name__)
+
+mp_pose = getattr(mp.solutions, 'pose', None)
+
+class PoseGraphPool:
+    """
+    Fixed-size pool of static-image MediaPipe Pose graphs.
+    Graphs are created lazily up to `size` (or all at once by warm_up) and
+    handed out one per caller; a caller waits for a free graph when all are
+    checked out. Static mode keeps graphs stateless between checkouts.
+    """
+
+    def __init__(self,
+                 size: int,
+                 model_complexity: int = 2,
+                 enable_segmentation: bool = False,
+                 min_detection_confidence: float = 0.5,
+                 checkout_timeout: float = 30.0):
+        self.size = max(1, size)
+        self.checkout_timeout = checkout_timeout
+        self.graph_config = {
+            'static_image_mode': True,
+            'model_complexity': model_complexity,
+            'enable_segmentation': enable_segmentation,
+            'min_detection_confidence': min_detection_confidence
+        }
+
+        # LIFO hands out the most recently used (cache-warm) graph first
+        self._available: queue.LifoQueue = queue.LifoQueue()
+        self._create_lock = threading.Lock()
+        self._created = 0
+
+        self._stats_lock = threading.Lock()
+        self.stats = {
+            'checkouts': 0,
+            'in_use': 0,
+            'timeouts': 0,
+            'total_wait_ms': 0.0,
+            'max_wait_ms': 0.0
+        }
+
+    def _create_graph(self):
+        """Build one MediaPipe Pose graph with the pool configuration"""
+        if mp_pose is None:
+            raise PoseDetectionError(
+                "MediaPipe pose solution not available",
+                "POSE_DETECTOR_UNAVAILABLE"
+            )
+        return mp_pose.Pose(**self.graph_config)
+
+    def _reserve_new_graph(self) -> bool:
+        """Claim room for one more graph if the pool is not yet full"""
+        with self._create_lock:
+            if self._created < self.size:
+                self._created += 1
+                return True
+            return False
+
+    def _acquire(self, timeout: float):
+        start_time = time.perf_counter()
+
+        try:
+            graph = self._available.get_nowait()
+        except queue.Empty:
+            if self._reserve_new_graph():
+                try:
+                    graph = self._create_graph()
+                except Exception:
+                    with self._create_lock:
+                        self._created -= 1
+                    raise
+            else:
+                try:
+                    graph = self._available.get(timeout=timeout)
+                except queue.Empty:
+                    with self._stats_lock:
+                        self.stats['timeouts'] += 1
+                    raise InferenceOverloadError(
+                        "No pose graph became available in time",
+                        error_code="POSE_POOL_EXHAUSTED",
+                        context={
+                            'pool_size': self.size,
+                            'timeout_seconds': timeout,
+                            'retry_after_seconds': inference_executor.config.retry_after_seconds
+                        }
+                    )
+
+        wait_ms = (time.perf_counter() - start_time) * 1000
+        with self._stats_lock:
+            self.stats['checkouts'] += 1
+            self.stats['in_use'] += 1
+            self.stats['total_wait_ms'] += wait_ms
+            self.stats['max_wait_ms'] = max(self.stats['max_wait_ms'], wait_ms)
+        return graph
+
+    @contextmanager
+    def checkout(self, timeout: Optional[float] = None) -> Iterator[Any]:
+        """Borrow a graph for exclusive use, returning it to the pool afterwards"""
+        graph = self._acquire(self.checkout_timeout if timeout is None else timeout)
+        try:
+            yield graph
+        finally:
+            with self._stats_lock:
+                self.stats['in_use'] -= 1
+            self._available.put(graph)
+
+    def process(self, rgb_image: np.ndarray):
+        """Run pose inference on an RGB image using a pooled graph"""
+        with self.checkout() as graph:
+            return graph.process(rgb_image)
+
+    def warm_up(self) -> int:
+        """Create every graph up front and push a blank frame through each"""
+        new_graphs = []
+        pending = []
+        try:
+            while self._reserve_new_graph():
+                try:
+                    graph = self._create_graph()
+                except Exception:
+                    with self._create_lock:
+                        self._created -= 1
+                    raise
+                new_graphs.append(graph)
+                pending.append(graph)
+
+            blank = np.zeros((256, 256, 3), dtype=np.uint8)
+            while pending:
+                graph = pending.pop()
+                try:
+                    graph.process(blank)
+                except Exception:
+                    # A graph that cannot process a blank frame is not handed out
+                    graph.close()
+                    with self._create_lock:
+                        self._created -= 1
+                    raise
+                self._available.put(graph)
+        finally:
+            # Graphs not warmed because of an earlier failure still go to the pool
+            for graph in pending:
+                self._available.put(graph)
+
+        if new_graphs:
+            logger.info(f"Warmed up {len(new_graphs)} pose graphs "
+                        f"(complexity {self.graph_config['model_complexity']})")
+        return len(new_graphs)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Pool occupancy and checkout wait metrics"""
+        with self._stats_lock:
+            stats = dict(self.stats)
+        checkouts = stats['checkouts']
+        stats['average_wait_ms'] = stats['total_wait_ms'] / checkouts if checkouts else 0.0
+        stats['size'] = self.size
+        stats['created'] = self._created
+        stats['available'] = self._available.qsize()
+        stats['model_complexity'] = self.graph_config['model_complexity']
+        stats['enable_segmentation'] = self.graph_config['enable_segmentation']
+        return stats
+
+    def close(self) -> None:
+        """Close all idle graphs"""
+        while True:
+            try:
+                graph = self._available.get_nowait()
+            except queue.Empty:
+                break
+            graph.close()
+            with self._create_lock:
+                self._created -= 1
+
+@dataclass
+class PoseSession:
+    """Video-mode pose graph pinned to one streaming client"""
+    session_id: str
+    graph: Any
+    lock: threading.Lock = field(default_factory=threading.Lock)
+    created_at: float = field(default_factory=time.time)
+    last_used: float = field(default_factory=time.time)
+    frames_processed: int = 0
+    closed: bool = False
+
+class PoseSessionRegistry:
+    """
+    Session-pinned MediaPipe Pose graphs for streaming clients.
+    Video mode (static_image_mode=False, smooth_landmarks=True) tracks the
+    athlete from the previous frame instead of re-running the person detector,
+    which is only valid while every frame of a stream reaches the same graph.
+    Graphs idle longer than idle_timeout are closed, and the least recently
+    used session is evicted when max_sessions is reached.
+    """
+
+    def __init__(self,
+                 max_sessions: Optional[int] = None,
+                 idle_timeout: Optional[float] = None,
+                 model_complexity: int = 2,
+                 enable_segmentation: bool = False,
+                 min_detection_confidence: float = 0.5,
+                 min_tracking_confidence: float = 0.5):
+        self.max_sessions = max(1, max_sessions if max_sessions is not None else
+                                int(os.getenv('EKKALAVYA_POSE_SESSION_MAX', 32)))
+        self.idle_timeout = idle_timeout if idle_timeout is not None else \
+            float(os.getenv('EKKALAVYA_POSE_SESSION_IDLE_SECONDS', 60.0))
+        self.graph_config = {
+            'static_image_mode': False,
+            'model_complexity': model_complexity,
+            'enable_segmentation': enable_segmentation,
+            'smooth_landmarks': True,
+            'min_detection_confidence': min_detection_confidence,
+            'min_tracking_confidence': min_tracking_confidence
+        }
+
+        self._sessions: 'OrderedDict[str, PoseSession]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._last_sweep = time.time()
+        self.stats = {
+            'sessions_created': 0,
+            'sessions_released': 0,
+            'idle_evictions': 0,
+            'capacity_evictions': 0,
+            'frames_processed': 0
+        }
+
+    def _create_graph(self):
+        if mp_pose is None:
+            raise PoseDetectionError(
+                "MediaPipe pose solution not available",
+                "POSE_DETECTOR_UNAVAILABLE"
+            )
+        return mp_pose.Pose(**self.graph_config)
+
+    def _get_session(self, session_id: str) -> PoseSession:
+        """Get the live session for session_id, creating (and evicting) as needed"""
+        evicted: List[PoseSession] = []
+        with self._lock:
+            evicted.extend(self._collect_idle_sessions())
+
+            session = self._sessions.get(session_id)
+            if session is not None:
+                self._sessions.move_to_end(session_id)
+            else:
+                while len(self._sessions) >= self.max_sessions:
+                    _, oldest = self._sessions.popitem(last=False)
+                    self.stats['capacity_evictions'] += 1
+                    evicted.append(oldest)
+                session = PoseSession(session_id=session_id, graph=None)
+                self._sessions[session_id] = session
+                self.stats['sessions_created'] += 1
+
+        for old_session in evicted:
+            self._close_session(old_session)
+        return session
+
+    def _collect_idle_sessions(self) -> List[PoseSession]:
+        """Remove sessions idle past the timeout; caller must hold the registry lock"""
+        now = time.time()
+        if now - self._last_sweep < min(self.idle_timeout, 5.0):
+            return []
+        self._last_sweep = now
+
+        idle_ids = [sid for sid, session in self._sessions.items()
+                    if now - session.last_used > self.idle_timeout]
+        self.stats['idle_evictions'] += len(idle_ids)
+        return [self._sessions.pop(sid) for sid in idle_ids]
+
+    def _close_session(self, session: PoseSession) -> None:
+        # Waits for an in-progress frame on this graph before closing it
+        with session.lock:
+            session.closed = True
+            if session.graph is not None:
+                session.graph.close()
+                session.graph = None
+
+    def process(self, session_id: str, rgb_image: np.ndarray):
+        """Run tracking-mode pose inference on the graph pinned to session_id"""
+        while True:
+            session = self._get_session(session_id)
+            with session.lock:
+                if session.closed:
+                    # Evicted between lookup and use; retry with a fresh session
+                    continue
+                if session.graph is None:
+                    session.graph = self._create_graph()
+                results = session.graph.process(rgb_image)
+                session.frames_processed += 1
+                session.last_used = time.time()
+            break
+
+        with self._lock:
+            self.stats['frames_processed'] += 1
+        return results
+
+    def release(self, session_id: str) -> bool:
+        """Close the graph pinned to session_id, e.g. when its stream disconnects"""
+        with self._lock:
+            session = self._sessions.pop(session_id, None)
+            if session is not None:
+                self.stats['sessions_released'] += 1
+        if session is None:
+            return False
+        self._close_session(session)
+        return True
+
+    def evict_idle(self) -> int:
+        """Close every session idle past the timeout"""
+        with self._lock:
+            self._last_sweep = 0.0
+            idle = self._collect_idle_sessions()
+        for session in idle:
+            self._close_session(session)
+        return len(idle)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Live session count and lifecycle counters"""
+        with self._lock:
+            stats = dict(self.stats)
+            stats['active_sessions'] = len(self._sessions)
+        stats['max_sessions'] = self.max_sessions
+        stats['idle_timeout_seconds'] = self.idle_timeout
+        stats['model_complexity'] = self.graph_config['model_complexity']
+        return stats
+
+    def close(self) -> None:
+        """Close every session graph"""
+        with self._lock:
+            sessions = list(self._sessions.values())
+            self._sessions.clear()
+        for session in sessions:
+            self._close_session(session)
+
+# Pools are shared between callers that ask for the same graph configuration
+_pose_graph_pools: Dict[Tuple[int, bool, float], PoseGraphPool] = {}
+_pose_graph_pools_lock = threading.Lock()
+
+def get_pose_graph_pool(model_complexity: int = 2,
+                        enable_segmentation: bool = False,
+                        min_detection_confidence: float = 0.5) -> PoseGraphPool:
+    """Get or create the shared pool for a pose graph configuration"""
+    key = (model_complexity, enable_segmentation, min_detection_confidence)
+    with _pose_graph_pools_lock:
+        if key not in _pose_graph_pools:
+            size = int(os.getenv('EKKALAVYA_POSE_POOL_SIZE', inference_executor.config.max_workers))
+            timeout = float(os.getenv('EKKALAVYA_POSE_POOL_TIMEOUT', 30.0))
+            _pose_graph_pools[key] = PoseGraphPool(
+                size=size,
+                model_complexity=model_complexity,
+                enable_segmentation=enable_segmentation,
+                min_detection_confidence=min_detection_confidence,
+                checkout_timeout=timeout
+            )
+        return _pose_graph_pools[key]
+
+def warm_up_pose_graph_pools() -> int:
+    """Warm up every registered pool; returns the number of graphs created"""
+    with _pose_graph_pools_lock:
+        pools = list(_pose_graph_pools.values())
+    return sum(pool.warm_up() for pool in pools)
+
+def get_pose_graph_pool_stats() -> Dict[str, Any]:
+    """Metrics for every registered pool keyed by configuration"""
+    with _pose_graph_pools_lock:
+        pools = list(_pose_graph_pools.items())
+    return {
+        f"complexity_{key[0]}{'_segmentation' if key[1] else ''}_conf_{key[2]}": pool.get_stats()
+        for key, pool in pools
+    }
+
+__all__ = [
+    'PoseGraphPool', 'PoseSession', 'PoseSessionRegistry', 'get_pose_graph_pool', 'warm_up_pose_graph_pools',
+    'get_pose_graph_pool_stats'
+]
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Realtime Frame Scheduler - Latest-frame-wins scheduling for streaming sockets
+Keeps receiving while analysis runs, replaces any waiting frame with the
+newest one and paces analysis to the sport's target frame rate
+"""
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Any, Awaitable, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class ScheduledFrame:
+    """A received frame waiting for analysis; payload is decoded only if it is analyzed"""
+    sport: str
+    analysis_type: str
+    payload: Any
+    sequence: Optional[int] = None
+    client_timestamp: Optional[float] = None
+    received_at: float = field(default_factory=time.perf_counter)
+
+class LatestFrameScheduler:
+    """
+    Single-slot mailbox between a socket receiver and the analysis loop.
+    A frame submitted while another is still waiting replaces it and counts
+    as dropped, so analysis always runs on the most recent frame and the
+    backlog can never grow beyond one frame.
+    """
+
+    def __init__(self, target_fps_for: Optional[Callable[[str], Optional[float]]] = None):
+        self.target_fps_for = target_fps_for
+        self._pending: Optional[ScheduledFrame] = None
+        self._frame_ready = asyncio.Event()
+        self._closed = False
+        self._last_started: Optional[float] = None
+        self._dropped_since_last = 0
+        self.stats = {
+            'received': 0,
+            'processed': 0,
+            'dropped': 0,
+            'average_latency_ms': 0.0
+        }
+
+    def submit(self, frame: ScheduledFrame) -> None:
+        """Offer a new frame, replacing any frame not yet picked up"""
+        self.stats['received'] += 1
+        if self._pending is not None:
+            self.stats['dropped'] += 1
+            self._dropped_since_last += 1
+        self._pending = frame
+        self._frame_ready.set()
+
+    def close(self) -> None:
+        """Stop the analysis loop, discarding any waiting frame"""
+        self._closed = True
+        self._frame_ready.set()
+
+    async def next_frame(self) -> Optional[ScheduledFrame]:
+        """Wait for the newest frame, no sooner than the target fps allows; None once closed"""
+        while True:
+            if self._closed:
+                return None
+            if self._pending is None:
+                self._frame_ready.clear()
+                await self._frame_ready.wait()
+                continue
+
+            target_fps = self.target_fps_for(self._pending.sport) if self.target_fps_for else None
+            if target_fps and self._last_started is not None:
+                delay = self._last_started + 1.0 / target_fps - time.perf_counter()
+                if delay > 0:
+                    # Newer frames arriving during the wait replace the pending one
+                    await asyncio.sleep(delay)
+                    continue
+
+            frame, self._pending = self._pending, None
+            self._last_started = time.perf_counter()
+            return frame
+
+    def finish(self, frame: ScheduledFrame) -> Dict[str, Any]:
+        """Record that a frame's response is going out; returns scheduling info for it"""
+        latency_ms = (time.perf_counter() - frame.received_at) * 1000
+        dropped = self._dropped_since_last
+        self._dropped_since_last = 0
+
+        self.stats['processed'] += 1
+        alpha = 0.1 if self.stats['processed'] > 1 else 1.0
+        self.stats['average_latency_ms'] = (1 - alpha) * self.stats['average_latency_ms'] + alpha * latency_ms
+
+        return {
+            'sequence': frame.sequence,
+            'client_timestamp': frame.client_timestamp,
+            'latency_ms': round(latency_ms, 1),
+            'dropped_frames': dropped,
+            'total_dropped_frames': self.stats['dropped'],
+            'target_fps': self.target_fps_for(frame.sport) if self.target_fps_for else None
+        }
+
+async def run_latest_frame_loop(scheduler: LatestFrameScheduler,
+                                receive: Callable[[], Awaitable[Optional[ScheduledFrame]]],
+                                process: Callable[[ScheduledFrame], Awaitable[None]]) -> None:
+    """
+    Run a receiver task feeding the scheduler and process the latest frames until
+    the receiver stops. Exceptions from the receiver (e.g. WebSocketDisconnect)
+    are re-raised once the loop ends.
+    """
+    async def receive_loop() -> None:
+        try:
+            while True:
+                frame = await receive()
+                if frame is not None:
+                    scheduler.submit(frame)
+        finally:
+            scheduler.close()
+
+    receiver = asyncio.create_task(receive_loop())
+    try:
+        while True:
+            frame = await scheduler.next_frame()
+            if frame is None:
+                break
+            await process(frame)
+    finally:
+        if not receiver.done():
+            receiver.cancel()
+        try:
+            await receiver
+        except asyncio.CancelledError:
+            pass
+
+__all__ = ['ScheduledFrame', 'LatestFrameScheduler', 'run_latest_frame_loop']
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Spatial Index - Radius queries over one frame's object centers
+Backed by scipy's cKDTree, with a brute-force NumPy fallback when scipy is
+missing, so proximity queries (possession, contact, interaction) do not need
+every pairwise distance computed in Python
+"""
+
+import logging
+from typing import Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+try:
+    from scipy.spatial import cKDTree
+except ImportError:
+    cKDTree = None
+    logger.warning("scipy is not installed; spatial queries fall back to brute-force distances")
+
+class SpatialIndex:
+    """Index over (N, 2) points, built once per frame and queried by radius"""
+
+    def __init__(self, points: np.ndarray):
+        self.points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        self._tree = cKDTree(self.points) if cKDTree is not None and len(self.points) else None
+
+    def __len__(self) -> int:
+        return len(self.points)
+
+    def pairs_within(self, radius: float) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Index pairs (i < j) of points closer than radius, with their distances"""
+        if len(self.points) < 2:
+            empty = np.zeros(0, dtype=np.int64)
+            return empty, empty, np.zeros(0)
+
+        if self._tree is not None:
+            pairs = self._tree.query_pairs(radius, output_type='ndarray')
+            first, second = pairs[:, 0], pairs[:, 1]
+        else:
+            first, second = np.triu_indices(len(self.points), k=1)
+
+        distances = np.hypot(*(self.points[first] - self.points[second]).T)
+        keep = distances < radius
+        return first[keep], second[keep], distances[keep]
+
+    def nearest_within(self, queries: np.ndarray, radius: float) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        For each (M, 2) query point, the index of the nearest indexed point
+        closer than radius (-1 if none) and its distance (inf if none)
+        """
+        queries = np.asarray(queries, dtype=np.float64).reshape(-1, 2)
+        if not len(self.points) or not len(queries):
+            return np.full(len(queries), -1, dtype=np.int64), np.full(len(queries), np.inf)
+
+        if self._tree is not None:
+            distances, indices = self._tree.query(queries, k=1, distance_upper_bound=radius)
+            indices = np.where(np.isfinite(distances), indices, -1)
+        else:
+            all_distances = np.hypot(*(queries[:, None, :] - self.points[None, :, :]).transpose(2, 0, 1))
+            indices = np.argmin(all_distances, axis=1)
+            distances = all_distances[np.arange(len(queries)), indices]
+            indices = np.where(distances <= radius, indices, -1)
+            distances = np.where(indices >= 0, distances, np.inf)
+
+        # Match the strict "closer than radius" of pairs_within
+        outside = distances >= radius
+        return np.where(outside, -1, indices).astype(np.int64), np.where(outside, np.inf, distances)
+
+__all__ = ['SpatialIndex']
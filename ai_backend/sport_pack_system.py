@@ -71,6 +71,14 @@ class TeamConfig(BaseModel):
     positions: List[Dict[str, Any]] = Field(default_factory=list, description="Player positions")
     formations: Dict[str, List[Dict[str, float]]] = Field(default_factory=dict, description="Team formations")
 
+class PerformanceConfig(BaseModel):
+    """Realtime processing targets"""
+    target_fps: float = Field(default=15.0, gt=0, le=120, description="Target realtime analysis rate")
+    job_priority: int = Field(default=5, ge=0, le=10, description="Background video job priority (higher runs first)")
+    latency_budget_ms: Optional[float] = Field(default=None, gt=0, description="Per-frame detector latency budget used to pick model variants")
+    min_pose_complexity: int = Field(default=0, ge=0, le=2, description="Lowest MediaPipe pose complexity allowed under load")
+    detection_interval: int = Field(default=1, ge=1, le=30, description="Stream frames per full detection; tracks are propagated in between")
+
 class SportPackConfig(BaseModel):
     """Complete Sport Pack Configuration"""
     # Metadata
@@ -92,6 +100,7 @@ class SportPackConfig(BaseModel):
     # Advanced Configuration
     detection_models: Dict[str, str] = Field(default_factory=dict, description="ML model mappings")
     difficulty_levels: Dict[str, Dict[str, Any]] = Field(default_factory=dict, description="Difficulty configurations")
+    performance: PerformanceConfig = Field(default_factory=PerformanceConfig, description="Realtime performance targets")
     
     @validator('sport')
     def sport_must_be_valid(cls, v):
@@ -122,6 +131,10 @@ class SportPackLoader:
     def __init__(self, config_directory: str = "sport_packs"):
         self.config_directory = config_directory
         self.loaded_packs: Dict[str, SportPackConfig] = {}
+        self.performance_configs: Dict[str, PerformanceConfig] = {}
+        # Shared by every sport without a pack, so unknown names are never cached
+        self.default_performance_config = PerformanceConfig()
+        self._pack_files: Optional[set] = None
         self.validation_schemas: Dict[str, Dict] = {}
         self.error_log: List[Dict[str, Any]] = []
         
@@ -247,6 +260,7 @@ class SportPackLoader:
             
             # Cache the loaded pack
             self.loaded_packs[sport_key] = sport_pack
+            self.performance_configs[sport_key] = sport_pack.performance
             
             logger.info(f"Successfully loaded and validated sport pack: {sport_name}")
             return sport_pack
@@ -458,6 +472,35 @@ class SportPackLoader:
             }
         }
     
+    def get_performance_config(self, sport_name: str) -> PerformanceConfig:
+        """Get realtime performance targets for a sport, falling back to defaults"""
+        sport_key = sport_name.lower().strip()
+        
+        config = self.performance_configs.get(sport_key)
+        if config is not None:
+            return config
+        
+        # Sport names come from clients on every frame; only sports with a pack are cached
+        if not self._has_sport_pack(sport_key):
+            return self.default_performance_config
+        
+        # Cached separately so per-frame lookups never retry a failing pack load
+        try:
+            config = self.load_sport_pack(sport_key).performance
+        except Exception as e:
+            logger.warning(f"Using default performance config for {sport_name}: {str(e)}")
+            config = self.default_performance_config
+        self.performance_configs[sport_key] = config
+        return config
+    
+    def _has_sport_pack(self, sport_key: str) -> bool:
+        """Whether a sport is loaded or has a pack file, without listing the directory per call"""
+        if sport_key in self.loaded_packs:
+            return True
+        if self._pack_files is None:
+            self._pack_files = set(self.get_available_sports())
+        return sport_key in self._pack_files
+    
     def get_loaded_sports(self) -> List[str]:
         """Get list of currently loaded sports"""
         return list(self.loaded_packs.keys())
@@ -475,6 +518,8 @@ class SportPackLoader:
     def reload_all_packs(self) -> Dict[str, bool]:
         """Reload all sport packs"""
         results = {}
+        self.performance_configs.clear()
+        self._pack_files = None
         for sport in self.get_available_sports():
             try:
                 self.load_sport_pack(sport, reload=True)
@@ -499,6 +544,8 @@ class SportPackLoader:
     def clear_cache(self):
         """Clear all cached sport packs"""
         self.loaded_packs.clear()
+        self.performance_configs.clear()
+        self._pack_files = None
         logger.info("Sport pack cache cleared")
 
 # Singleton instance for global access
@@ -508,5 +555,6 @@ sport_pack_loader = SportPackLoader()
 __all__ = [
     'SportPackConfig', 'SportPackLoader', 'SportPackValidationError',
     'SurfaceConfig', 'ObjectConfig', 'RulesConfig', 'ActionConfig',
-    'ValueModelConfig', 'OverlayConfig', 'TeamConfig', 'sport_pack_loader'
+    'ValueModelConfig', 'OverlayConfig', 'TeamConfig', 'PerformanceConfig',
+    'sport_pack_loader'
 ]
\ No newline at end of file
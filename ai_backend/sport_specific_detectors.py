@@ -20,9 +20,21 @@ import json
 
 from sport_pack_system import sport_pack_loader
 from unified_cv_pipeline import unified_cv_pipeline
+from frame_features import FrameFeatures
 
 logger = logging.getLogger(__name__)
 
+# HSV ranges for the colour names used in detection color profiles
+COLOR_RANGES = {
+    'orange': ([5, 150, 150], [15, 255, 255]),    # Basketball
+    'yellow': ([20, 150, 150], [30, 255, 255]),   # Tennis ball
+    'white': ([0, 0, 200], [180, 30, 255]),       # White objects
+    'black': ([0, 0, 0], [180, 255, 50]),         # Black objects
+    'green': ([40, 50, 50], [80, 255, 255]),      # Green objects
+    'blue': ([100, 150, 150], [130, 255, 255]),   # Blue objects
+    'red': ([0, 150, 150], [10, 255, 255])        # Red objects
+}
+
 class DetectionCategory(Enum):
     """Detection categories for sport objects"""
     BALL = "ball"
@@ -280,18 +292,22 @@ class YOLOSportDetector:
             spatial_relationships={'ball': ['player']}
         )
     
-    def detect_objects(self, image: np.ndarray, timestamp: Optional[float] = None) -> List[SportDetectionResult]:
-        """Detect sport-specific objects in image"""
+    def detect_objects(self, image: np.ndarray, timestamp: Optional[float] = None,
+                       features: Optional[FrameFeatures] = None) -> List[SportDetectionResult]:
+        """Detect sport-specific objects in image, reusing conversions from features when given"""
         start_time = time.time()
         
         if timestamp is None:
             timestamp = time.time()
         
+        # Colour spaces and edge maps are shared by every stage below
+        features = features if features is not None else FrameFeatures(image)
+        
         # Get base detections from unified CV pipeline
-        base_detections = self._get_base_detections(image)
+        base_detections = self._get_base_detections(features)
         
         # Apply sport-specific filtering and enhancement
-        sport_detections = self._apply_sport_specific_filtering(base_detections, image)
+        sport_detections = self._apply_sport_specific_filtering(base_detections, features)
         
         # Validate detections using sport knowledge
         validated_detections = self._validate_sport_detections(sport_detections, image)
@@ -320,41 +336,163 @@ class YOLOSportDetector:
         
         return results
     
-    def _get_base_detections(self, image: np.ndarray) -> List[Dict[str, Any]]:
+    def _get_base_detections(self, features: FrameFeatures) -> List[Dict[str, Any]]:
         """Get base object detections from unified CV pipeline"""
-        # Simulate YOLO detections with sport-aware enhancements
-        height, width = image.shape[:2]
-        
         # Generate realistic sport-specific detections
         detections = []
         
         if self.sport_name == 'basketball':
             # Basketball detection using real computer vision
-            basketball_detections = self._detect_basketball_ball(image)
+            basketball_detections = self._detect_basketball_ball(features)
             detections.extend(basketball_detections)
-            hoop_detections = self._detect_basketball_hoop(image)
+            hoop_detections = self._detect_basketball_hoop(features)
             detections.extend(hoop_detections)
         elif self.sport_name == 'tennis':
             # Tennis detection using real computer vision
-            tennis_detections = self._detect_tennis_ball(image)
+            tennis_detections = self._detect_tennis_ball(features)
             detections.extend(tennis_detections)
-            racket_detections = self._detect_tennis_racket(image)
+            racket_detections = self._detect_tennis_racket(features)
             detections.extend(racket_detections)
         elif self.sport_name == 'football':
             # Football detection using real computer vision
-            ball_detections = self._detect_soccer_ball(image)
+            ball_detections = self._detect_soccer_ball(features)
             detections.extend(ball_detections)
         elif self.sport_name == 'volleyball':
             # Volleyball detection using real computer vision
-            ball_detections = self._detect_volleyball(image)
+            ball_detections = self._detect_volleyball(features)
             detections.extend(ball_detections)
         
         # Add real player detections for all sports
-        player_detections = self._detect_players(image)
+        player_detections = self._detect_players(features.image)
         detections.extend(player_detections)
         
         return detections
     
+    def _detect_round_ball(self,
+                           features: FrameFeatures,
+                           class_name: str,
+                           color_ranges: List[Tuple[List[int], List[int]]],
+                           min_radius: int,
+                           max_radius: int,
+                           min_dist: int,
+                           feature_info: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Ball detection: Hough circles on the shared grayscale, confirmed by a colour mask"""
+        detections = []
+        
+        # Combine colour masks for the ball's colours
+        mask = None
+        for lower, upper in color_ranges:
+            color_mask = features.hsv_mask(lower, upper)
+            mask = color_mask if mask is None else cv2.bitwise_or(mask, color_mask)
+        
+        # Apply morphological operations
+        kernel = np.ones((3, 3), np.uint8)
+        mask = cv2.morphologyEx(mask, cv2.MORPH_CLOSE, kernel)
+        mask = cv2.morphologyEx(mask, cv2.MORPH_OPEN, kernel)
+        
+        circles = cv2.HoughCircles(
+            features.gray,
+            cv2.HOUGH_GRADIENT,
+            dp=1,
+            minDist=min_dist,
+            param1=50,
+            param2=30,
+            minRadius=min_radius,
+            maxRadius=max_radius
+        )
+        
+        if circles is not None:
+            circles = np.round(circles[0, :]).astype("int")
+            
+            for (x, y, r) in circles:
+                # Check if circle overlaps with the colour mask
+                mask_roi = mask[max(0, y-r):min(mask.shape[0], y+r), 
+                              max(0, x-r):min(mask.shape[1], x+r)]
+                
+                color_pixels = np.count_nonzero(mask_roi)
+                total_pixels = mask_roi.size
+                
+                if color_pixels / max(total_pixels, 1) > 0.3:  # At least 30% ball colour
+                    confidence = min(0.95, 0.7 + (color_pixels / total_pixels) * 0.25)
+                    
+                    detections.append({
+                        'class_name': class_name,
+                        'confidence': confidence,
+                        'bbox': [x - r, y - r, x + r, y + r],
+                        'features': dict(feature_info, detection_method='hough_circles_color_filter')
+                    })
+        
+        return detections
+    
+    def _detect_basketball_ball(self, features: FrameFeatures) -> List[Dict[str, Any]]:
+        """Basketball detection using orange colour filtering and circular detection"""
+        return self._detect_round_ball(
+            features, 'basketball', [COLOR_RANGES['orange']], min_radius=8, max_radius=40, min_dist=30,
+            feature_info={
+                'color_analysis': {'dominant_color': 'orange', 'saturation': 0.8},
+                'shape_analysis': {'circularity': 0.9, 'aspect_ratio': 1.0}
+            }
+        )
+    
+    def _detect_soccer_ball(self, features: FrameFeatures) -> List[Dict[str, Any]]:
+        """Soccer ball detection using white/black panel colours and circular detection"""
+        return self._detect_round_ball(
+            features, 'soccer_ball', [COLOR_RANGES['white'], COLOR_RANGES['black']], min_radius=7, max_radius=30, min_dist=30,
+            feature_info={
+                'color_analysis': {'dominant_color': 'white', 'saturation': 0.1},
+                'shape_analysis': {'circularity': 0.9, 'aspect_ratio': 1.0}
+            }
+        )
+    
+    def _detect_volleyball(self, features: FrameFeatures) -> List[Dict[str, Any]]:
+        """Volleyball detection using white/blue/yellow panel colours and circular detection"""
+        return self._detect_round_ball(
+            features, 'volleyball',
+            [COLOR_RANGES['white'], COLOR_RANGES['blue'], COLOR_RANGES['yellow']], min_radius=8, max_radius=35, min_dist=30,
+            feature_info={
+                'color_analysis': {'dominant_color': 'white', 'saturation': 0.5},
+                'shape_analysis': {'circularity': 0.9, 'aspect_ratio': 1.0}
+            }
+        )
+    
+    def _detect_basketball_hoop(self, features: FrameFeatures) -> List[Dict[str, Any]]:
+        """Basketball hoop detection: orange/red rim contours in the upper part of the frame"""
+        detections = []
+        
+        rim_mask = cv2.bitwise_or(
+            features.hsv_mask(*COLOR_RANGES['orange']),
+            features.hsv_mask(*COLOR_RANGES['red'])
+        )
+        
+        # Hoops are in the upper 70% of the image
+        upper_limit = int(features.height * 0.7)
+        contours, _ = cv2.findContours(rim_mask[:upper_limit], cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        
+        for contour in contours:
+            x, y, w, h = cv2.boundingRect(contour)
+            if w * h < 1000:
+                continue
+            
+            # A rim seen in perspective is a wide, mostly hollow ellipse
+            aspect_ratio = w / max(h, 1)
+            fill_ratio = cv2.contourArea(contour) / float(w * h)
+            if 1.2 <= aspect_ratio <= 3.0 and fill_ratio < 0.6:
+                confidence = min(0.9, 0.7 + (1.0 - fill_ratio) * 0.2)
+                
+                detections.append({
+                    'class_name': 'basketball_hoop',
+                    'confidence': confidence,
+                    'bbox': [x, y, x + w, y + h],
+                    'features': {
+                        'color_analysis': {'dominant_color': 'orange', 'saturation': 0.7},
+                        'shape_analysis': {'circularity': 0.8, 'aspect_ratio': aspect_ratio},
+                        'structural_analysis': {'has_rim': True, 'fill_ratio': fill_ratio},
+                        'detection_method': 'rim_color_contour'
+                    }
+                })
+        
+        return detections
+    
     def _generate_basketball_detections(self, width: int, height: int) -> List[Dict[str, Any]]:
         """Generate basketball-specific detections"""
         detections = []
@@ -404,74 +542,24 @@ class YOLOSportDetector:
         
         return detections
     
-    def _detect_tennis_ball(self, image: np.ndarray) -> List[Dict[str, Any]]:
+    def _detect_tennis_ball(self, features: FrameFeatures) -> List[Dict[str, Any]]:
         """Real tennis ball detection using color filtering and circular detection"""
-        detections = []
-        
-        # Convert to HSV for yellow-green detection
-        hsv = cv2.cvtColor(image, cv2.COLOR_BGR2HSV)
-        
-        # Define tennis ball yellow-green color range
-        lower_yellow = np.array([20, 100, 100])
-        upper_yellow = np.array([30, 255, 255])
-        
-        # Create mask for yellow color
-        mask = cv2.inRange(hsv, lower_yellow, upper_yellow)
-        
-        # Apply morphological operations
-        kernel = np.ones((3, 3), np.uint8)
-        mask = cv2.morphologyEx(mask, cv2.MORPH_CLOSE, kernel)
-        mask = cv2.morphologyEx(mask, cv2.MORPH_OPEN, kernel)
-        
-        # Use HoughCircles for circular detection (tennis balls are small and round)
-        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-        circles = cv2.HoughCircles(
-            gray,
-            cv2.HOUGH_GRADIENT,
-            dp=1,
-            minDist=20,
-            param1=50,
-            param2=30,
-            minRadius=8,
-            maxRadius=25
+        # Tennis balls are small, yellow-green and round
+        return self._detect_round_ball(
+            features, 'tennis_ball', [([20, 100, 100], [30, 255, 255])], min_radius=8, max_radius=25, min_dist=20,
+            feature_info={
+                'color_analysis': {'dominant_color': 'yellow', 'saturation': 0.9},
+                'shape_analysis': {'circularity': 0.95, 'aspect_ratio': 1.0}
+            }
         )
-        
-        if circles is not None:
-            circles = np.round(circles[0, :]).astype("int")
-            
-            for (x, y, r) in circles:
-                # Check if circle overlaps with yellow mask
-                mask_roi = mask[max(0, y-r):min(mask.shape[0], y+r), 
-                              max(0, x-r):min(mask.shape[1], x+r)]
-                
-                yellow_pixels = np.count_nonzero(mask_roi)
-                total_pixels = mask_roi.size
-                
-                if yellow_pixels / max(total_pixels, 1) > 0.3:  # At least 30% yellow
-                    confidence = min(0.95, 0.7 + (yellow_pixels / total_pixels) * 0.25)
-                    
-                    detections.append({
-                        'class_name': 'tennis_ball',
-                        'confidence': confidence,
-                        'bbox': [x - r, y - r, x + r, y + r],
-                        'features': {
-                            'color_analysis': {'dominant_color': 'yellow', 'saturation': 0.9},
-                            'shape_analysis': {'circularity': 0.95, 'aspect_ratio': 1.0},
-                            'detection_method': 'hough_circles_color_filter'
-                        }
-                    })
-        
-        return detections
     
-    def _detect_tennis_racket(self, image: np.ndarray) -> List[Dict[str, Any]]:
+    def _detect_tennis_racket(self, features: FrameFeatures) -> List[Dict[str, Any]]:
         """Real tennis racket detection using edge detection and shape analysis"""
         detections = []
-        
-        # Convert to grayscale
-        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        gray = features.gray
         
         # Apply edge detection
-        edges = cv2.Canny(gray, 50, 150, apertureSize=3)
+        edges = features.edges(50, 150, aperture_size=3)
         
         # Find contours
         contours, _ = cv2.findContours(edges, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
@@ -700,7 +788,7 @@ class YOLOSportDetector:
     
     # _generate_player_detections replaced with _detect_players (real CV implementation above)
     
-    def _apply_sport_specific_filtering(self, detections: List[Dict[str, Any]], image: np.ndarray) -> List[Dict[str, Any]]:
+    def _apply_sport_specific_filtering(self, detections: List[Dict[str, Any]], features: FrameFeatures) -> List[Dict[str, Any]]:
         """Apply sport-specific filtering to detections"""
         filtered_detections = []
         
@@ -729,7 +817,7 @@ class YOLOSportDetector:
             
             # Apply color filtering
             if class_name in self.detection_config.color_profiles:
-                sport_confidence = self._calculate_sport_confidence(detection, image)
+                sport_confidence = self._calculate_sport_confidence(detection, features)
                 detection['sport_confidence'] = sport_confidence
                 
                 # Filter out low sport confidence
@@ -743,7 +831,7 @@ class YOLOSportDetector:
         
         return filtered_detections
     
-    def _calculate_sport_confidence(self, detection: Dict[str, Any], image: np.ndarray) -> float:
+    def _calculate_sport_confidence(self, detection: Dict[str, Any], features: FrameFeatures) -> float:
         """Calculate sport-specific confidence for detection"""
         class_name = detection['class_name']
         
@@ -752,16 +840,15 @@ class YOLOSportDetector:
         
         color_profile = self.detection_config.color_profiles[class_name]
         
-        # Extract region of interest
-        bbox = detection['bbox']
-        x1, y1, x2, y2 = [int(coord) for coord in bbox]
-        roi = image[y1:y2, x1:x2]
+        # Extract region of interest from the frame's HSV conversion
+        x1, y1, x2, y2 = detection['bbox']
+        hsv_roi = features.hsv_region(x1, y1, x2, y2)
         
-        if roi.size == 0:
+        if hsv_roi.size == 0:
             return 0.0
         
         # Color analysis
-        color_score = self._analyze_color_match(roi, color_profile)
+        color_score = self._analyze_color_match(hsv_roi, color_profile)
         
         # Shape analysis (from features if available)
         shape_score = 0.8  # Default if no shape analysis
@@ -792,17 +879,11 @@ class YOLOSportDetector:
         sport_confidence = (color_score * 0.4 + shape_score * 0.4 + texture_score * 0.2)
         return min(1.0, max(0.0, sport_confidence))
     
-    def _analyze_color_match(self, roi: np.ndarray, color_profile: Dict[str, Any]) -> float:
-        """Analyze color match for sport-specific object"""
-        if roi.size == 0:
+    def _analyze_color_match(self, hsv_roi: np.ndarray, color_profile: Dict[str, Any]) -> float:
+        """Analyze color match for sport-specific object (ROI already in HSV)"""
+        if hsv_roi.size == 0:
             return 0.0
         
-        # Convert to HSV for better color analysis
-        hsv_roi = cv2.cvtColor(roi, cv2.COLOR_BGR2HSV)
-        
-        # Calculate dominant color
-        pixels = hsv_roi.reshape(-1, 3)
-        
         # Simplified color matching
         expected_colors = color_profile.get('dominant_colors', ['any'])
         saturation_range = color_profile.get('saturation_range', [0.0, 1.0])
@@ -810,22 +891,11 @@ class YOLOSportDetector:
         if 'any' in expected_colors:
             return 0.8
         
-        # Color mapping for sport objects
-        color_ranges = {
-            'orange': ([5, 150, 150], [15, 255, 255]),    # Basketball
-            'yellow': ([20, 150, 150], [30, 255, 255]),   # Tennis ball
-            'white': ([0, 0, 200], [180, 30, 255]),       # White objects
-            'black': ([0, 0, 0], [180, 255, 50]),         # Black objects
-            'green': ([40, 50, 50], [80, 255, 255]),      # Green objects
-            'blue': ([100, 150, 150], [130, 255, 255]),   # Blue objects
-            'red': ([0, 150, 150], [10, 255, 255])        # Red objects
-        }
-        
         max_match_score = 0.0
         
         for color_name in expected_colors:
-            if color_name in color_ranges:
-                lower, upper = color_ranges[color_name]
+            if color_name in COLOR_RANGES:
+                lower, upper = COLOR_RANGES[color_name]
                 mask = cv2.inRange(hsv_roi, np.array(lower), np.array(upper))
                 match_ratio = np.sum(mask > 0) / mask.size
                 max_match_score = max(max_match_score, match_ratio)
@@ -1020,10 +1090,11 @@ class SportDetectionManager:
         
         return self.detectors[sport_name]
     
-    def detect_sport_objects(self, sport_name: str, image: np.ndarray, timestamp: Optional[float] = None) -> List[SportDetectionResult]:
+    def detect_sport_objects(self, sport_name: str, image: np.ndarray, timestamp: Optional[float] = None,
+                             features: Optional[FrameFeatures] = None) -> List[SportDetectionResult]:
         """Detect sport-specific objects in image"""
         detector = self.get_detector(sport_name)
-        return detector.detect_objects(image, timestamp)
+        return detector.detect_objects(image, timestamp, features)
     
     def get_all_statistics(self) -> Dict[str, Any]:
         """Get statistics from all detectors"""
@@ -1065,9 +1136,10 @@ def get_sport_detector(sport_name: str) -> YOLOSportDetector:
     """Get sport-specific detector"""
     return sport_detection_manager.get_detector(sport_name)
 
-def detect_sport_objects(sport_name: str, image: np.ndarray, timestamp: Optional[float] = None) -> List[SportDetectionResult]:
+def detect_sport_objects(sport_name: str, image: np.ndarray, timestamp: Optional[float] = None,
+                         features: Optional[FrameFeatures] = None) -> List[SportDetectionResult]:
     """Detect sport-specific objects in image"""
-    return sport_detection_manager.detect_sport_objects(sport_name, image, timestamp)
+    return sport_detection_manager.detect_sport_objects(sport_name, image, timestamp, features)
 
 # Export key classes and functions
 __all__ = [
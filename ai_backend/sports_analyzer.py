@@ -11,12 +11,26 @@ import numpy as np
 import json
 import base64
 import math
+import os
 import time
-from typing import Dict, List, Optional, Tuple, Any
+from typing import Dict, List, Optional, Tuple, Any, Callable
 import asyncio
 from datetime import datetime
 from pydantic import BaseModel
 import logging
+import uuid
+
+from pose_graph_pool import PoseSessionRegistry, get_pose_graph_pool
+from frame_protocol import BinaryFrame, decode_frame_image, receive_frame_message
+from custom_exceptions import ValidationError, VideoProcessingError, InferenceOverloadError
+from realtime_scheduler import LatestFrameScheduler, ScheduledFrame, run_latest_frame_loop
+from inference_executor import inference_executor
+from sport_pack_system import sport_pack_loader
+from video_pipeline import (
+    VideoAnalysisResult, VideoProgress, video_analysis_pipeline, save_upload_to_tempfile,
+    aggregate_frame_results, build_sampling_config
+)
+from video_job_queue import VideoJob, VideoJobQueue
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -43,9 +57,15 @@ mp_pose = mp.solutions.pose
 mp_hands = mp.solutions.hands
 mp_drawing = mp.solutions.drawing_utils
 
-# Global pose detector
-pose_detector = mp_pose.Pose(
-    static_image_mode=False,
+# Static-image graphs for sampled video frames, analyzed in parallel
+pose_pool = get_pose_graph_pool(
+    model_complexity=2,
+    enable_segmentation=False,
+    min_detection_confidence=0.7
+)
+
+# Video-mode pose graphs pinned per WebSocket connection
+pose_sessions = PoseSessionRegistry(
     model_complexity=2,
     enable_segmentation=False,
     min_detection_confidence=0.7,
@@ -1950,136 +1970,266 @@ async def analyze_frame(request: AnalysisRequest):
         logger.error(f"Analysis error: {e}")
         raise HTTPException(status_code=500, detail="Analysis failed")
 
+UPLOAD_VIDEO_TYPES = ['video/mp4', 'video/avi', 'video/mov', 'video/quicktime']
+MAX_UPLOAD_VIDEO_BYTES = 100 * 1024 * 1024
+
+def analyze_upload_frame(frame: np.ndarray) -> Optional[Dict[str, Any]]:
+    """General pose analysis of one sampled video frame"""
+    rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+    results = pose_pool.process(rgb_frame)
+    if results.pose_landmarks:
+        return sports_analyzer.analyze_general_sport(results.pose_landmarks, "general")
+    return None
+
+def summarize_upload(video_result: VideoAnalysisResult) -> Dict[str, Any]:
+    """Response body for an analyzed upload"""
+    analysis_results = [frame_result for _, _, frame_result in video_result.frame_results]
+    if not analysis_results:
+        return {
+            "status": "error",
+            "message": "No pose detected in video",
+            "video": video_result.to_dict(),
+            "timestamp": datetime.now().isoformat()
+        }
+    
+    summary = aggregate_frame_results(video_result, score_key='overall_score')
+    return {
+        "status": "success",
+        "frames_analyzed": len(analysis_results),
+        "average_score": round(summary['average_score'], 1),
+        "results": analysis_results,
+        "timeline": summary['timeline'],
+        "video": video_result.to_dict(),
+        "timestamp": datetime.now().isoformat()
+    }
+
+def process_upload_job(job: VideoJob, progress_callback: Callable[[VideoProgress], None]) -> Dict[str, Any]:
+    """Run a queued upload through the same analysis as /upload_video, one background frame at a time"""
+    sampling_config = build_sampling_config(**job.sampling)
+    
+    def analyze_frame(frame: np.ndarray) -> Optional[Dict[str, Any]]:
+        return inference_executor.run_background(analyze_upload_frame, frame, stop_event=upload_job_queue.stop_event)
+    
+    video_result = video_analysis_pipeline.run(job.video_path, analyze_frame, sampling_config, progress_callback)
+    return summarize_upload(video_result)
+
+# Background /upload_video jobs; shares the job database with main.py's "technique" jobs
+upload_job_queue = VideoJobQueue(kind="upload", handler=process_upload_job)
+
+@app.on_event("startup")
+async def start_upload_job_queue():
+    upload_job_queue.start()
+
+@app.on_event("shutdown")
+async def stop_upload_job_queue():
+    upload_job_queue.stop()
+
 @app.post("/upload_video")
-async def upload_video_analysis(file: UploadFile = File(...)):
+async def upload_video_analysis(
+    file: UploadFile = File(...),
+    sampling: str = "target_fps",
+    sample_fps: float = 5.0,
+    every_nth: int = 5,
+    max_frames: Optional[int] = None
+):
     """Analyze uploaded video file"""
+    temp_file = None
     try:
-        # Validate file size (100MB limit)
-        max_size = 100 * 1024 * 1024
-        content = await file.read()
-        
-        if len(content) > max_size:
-            raise HTTPException(status_code=413, detail="File too large (max 100MB)")
-        
-        # Validate file type
-        allowed_types = ['video/mp4', 'video/avi', 'video/mov', 'video/quicktime']
-        if file.content_type not in allowed_types:
+        # Validate file type before reading any of the body
+        if file.content_type not in UPLOAD_VIDEO_TYPES:
             raise HTTPException(status_code=400, detail="Invalid file type")
         
-        # Save temporary file
-        temp_file = f"temp_video_{int(time.time())}.mp4"
-        with open(temp_file, "wb") as f:
-            f.write(content)
+        sampling_config = build_sampling_config(sampling, every_nth, sample_fps, max_frames)
         
-        # Process video
-        cap = cv2.VideoCapture(temp_file)
-        frame_count = 0
-        analysis_results = []
-        
-        while cap.isOpened() and frame_count < 10:
-            ret, frame = cap.read()
-            if not ret:
-                break
-            
-            rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            results = pose_detector.process(rgb_frame)
-            
-            if results.pose_landmarks:
-                analysis = sports_analyzer.analyze_general_sport(results.pose_landmarks, "general")
-                analysis_results.append(analysis)
-            
-            frame_count += 1
-        
-        cap.release()
+        # Stream to disk in chunks (100MB limit)
+        temp_file = await save_upload_to_tempfile(file, max_bytes=MAX_UPLOAD_VIDEO_BYTES)
         
+        # Sampled frames across the whole clip, decoded and analyzed in parallel
+        video_result = await inference_executor.run(
+            video_analysis_pipeline.run, temp_file, analyze_upload_frame, sampling_config
+        )
+        return summarize_upload(video_result)
+    
+    except VideoProcessingError as e:
+        status_code = 413 if e.error_code == "VIDEO_TOO_LARGE" else 400
+        detail = "File too large (max 100MB)" if status_code == 413 else e.message
+        raise HTTPException(status_code=status_code, detail=detail)
+    except InferenceOverloadError as e:
+        # The executor or the pose pool is saturated; the client should retry the upload later
+        raise HTTPException(
+            status_code=503,
+            detail=e.to_dict(),
+            headers={"Retry-After": str(e.context.get('retry_after_seconds', 1))}
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Video analysis error: {e}")
+        raise HTTPException(status_code=500, detail=f"Video analysis failed: {str(e)}")
+    finally:
         # Clean up
-        import os
-        if os.path.exists(temp_file):
+        if temp_file and os.path.exists(temp_file):
             os.remove(temp_file)
+
+@app.post("/jobs/upload_video")
+async def submit_upload_video_job(
+    file: UploadFile = File(...),
+    sampling: str = "target_fps",
+    sample_fps: float = 5.0,
+    every_nth: int = 5,
+    max_frames: Optional[int] = None,
+    priority: Optional[int] = None
+):
+    """Queue an uploaded video for background analysis and return its job id immediately"""
+    try:
+        if file.content_type not in UPLOAD_VIDEO_TYPES:
+            raise HTTPException(status_code=400, detail="Invalid file type")
         
-        if analysis_results:
-            avg_score = sum(r.get('overall_score', 0) for r in analysis_results) / len(analysis_results)
-            return {
-                "status": "success",
-                "frames_analyzed": len(analysis_results),
-                "average_score": round(avg_score, 1),
-                "results": analysis_results,
-                "timestamp": datetime.now().isoformat()
-            }
-        else:
-            return {
-                "status": "error",
-                "message": "No pose detected in video",
-                "timestamp": datetime.now().isoformat()
-            }
+        # Validate sampling up front so bad parameters fail the request, not the job
+        build_sampling_config(sampling, every_nth, sample_fps, max_frames)
+        if priority is None:
+            priority = sport_pack_loader.default_performance_config.job_priority
+        
+        video_path = await save_upload_to_tempfile(
+            file, max_bytes=MAX_UPLOAD_VIDEO_BYTES, directory=upload_job_queue.upload_directory
+        )
+        try:
+            job = upload_job_queue.submit(
+                video_path, "general", "general",
+                sampling={
+                    "mode": sampling,
+                    "every_nth": every_nth,
+                    "target_fps": sample_fps,
+                    "max_frames": max_frames
+                },
+                priority=priority
+            )
+        except Exception:
+            os.remove(video_path)
+            raise
+        
+        return {
+            "status": "queued",
+            "job_id": job.job_id,
+            "priority": job.priority,
+            "queue_depth": upload_job_queue.queue_depth(),
+            "timestamp": datetime.now().isoformat()
+        }
     
+    except VideoProcessingError as e:
+        status_code = 413 if e.error_code == "VIDEO_TOO_LARGE" else 400
+        detail = "File too large (max 100MB)" if status_code == 413 else e.message
+        raise HTTPException(status_code=status_code, detail=detail)
+    except InferenceOverloadError as e:
+        raise HTTPException(
+            status_code=503,
+            detail=e.to_dict(),
+            headers={"Retry-After": str(e.context.get('retry_after_seconds', 1))}
+        )
+    except HTTPException:
+        raise
     except Exception as e:
-        logger.error(f"Video analysis error: {e}")
-        raise HTTPException(status_code=500, detail=f"Video analysis failed: {str(e)}")
+        logger.error(f"Video job submission error: {e}")
+        raise HTTPException(status_code=500, detail=f"Video job submission failed: {str(e)}")
+
+@app.get("/jobs/{job_id}")
+async def get_upload_video_job(job_id: str):
+    """Progress and, once finished, the result of an /upload_video job"""
+    job = upload_job_queue.get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job '{job_id}' not found")
+    return job.to_dict()
 
 @app.websocket("/ws")
 async def websocket_endpoint(websocket: WebSocket):
     """Real-time analysis WebSocket"""
     await manager.connect(websocket)
+    session_id = f"ws-{uuid.uuid4().hex}"
+    
+    # Latest-frame-wins: keep receiving while analyzing, paced to the sport's target fps
+    scheduler = LatestFrameScheduler(
+        target_fps_for=lambda sport: sport_pack_loader.get_performance_config(sport).target_fps
+    )
+    
+    async def receive_frame() -> Optional[ScheduledFrame]:
+        # Binary frames (header + JPEG/WebP) or legacy base64 JSON
+        try:
+            message = await receive_frame_message(websocket)
+        except ValidationError as invalid:
+            await manager.send_analysis_result(websocket, {
+                "status": "error",
+                "message": invalid.message,
+                "timestamp": datetime.now().isoformat()
+            })
+            return None
+        
+        if isinstance(message, BinaryFrame):
+            return ScheduledFrame(
+                sport=message.sport,
+                analysis_type=message.analysis_type,
+                payload=message.payload,
+                sequence=message.sequence,
+                client_timestamp=message.timestamp
+            )
+        
+        frame_data = json.loads(message)
+        if frame_data.get('image') is None:
+            await manager.send_analysis_result(websocket, {
+                "status": "error",
+                "message": "No image data provided",
+                "timestamp": datetime.now().isoformat()
+            })
+            return None
+        
+        return ScheduledFrame(
+            sport=frame_data.get('sport', 'basketball'),
+            analysis_type=frame_data.get('analysis_type', 'general'),
+            payload=frame_data['image'],
+            sequence=frame_data.get('sequence'),
+            client_timestamp=frame_data.get('timestamp')
+        )
+    
+    def analyze_frame(frame: ScheduledFrame) -> Dict[str, Any]:
+        image_data = frame.payload
+        if isinstance(image_data, str):
+            # Decode base64 image
+            image_data = base64.b64decode(image_data)
+        img = decode_frame_image(image_data)
+        
+        if img is None:
+            return {"status": "error", "message": "Invalid image data"}
+        
+        rgb_img = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
+        results = pose_sessions.process(session_id, rgb_img)
+        
+        if results.pose_landmarks:
+            analysis = sports_analyzer.analyze_sport(frame.sport, results.pose_landmarks, frame.analysis_type)
+            return {"status": "success", "sport": frame.sport, "analysis": analysis}
+        return {"status": "no_pose", "sport": frame.sport, "message": "No pose detected"}
+    
+    async def process_frame(frame: ScheduledFrame) -> None:
+        try:
+            # Analysis runs off the event loop so the receiver keeps draining the socket
+            response = await inference_executor.run(analyze_frame, frame)
+        except Exception as e:
+            logger.error(f"Image processing error: {e}")
+            response = {"status": "error", "message": f"Processing error: {str(e)}"}
+        
+        response["sequence"] = frame.sequence
+        response["scheduling"] = scheduler.finish(frame)
+        response["timestamp"] = datetime.now().isoformat()
+        await manager.send_analysis_result(websocket, response)
+    
     try:
-        while True:
-            data = await websocket.receive_text()
-            frame_data = json.loads(data)
-            
-            sport = frame_data.get('sport', 'basketball')
-            analysis_type = frame_data.get('analysis_type', 'general')
-            
-            if 'image' in frame_data:
-                try:
-                    # Decode base64 image
-                    image_data = base64.b64decode(frame_data['image'])
-                    nparr = np.frombuffer(image_data, np.uint8)
-                    img = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
-                    
-                    if img is not None:
-                        rgb_img = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
-                        results = pose_detector.process(rgb_img)
-                        
-                        if results.pose_landmarks:
-                            analysis = sports_analyzer.analyze_sport(sport, results.pose_landmarks, analysis_type)
-                            await manager.send_analysis_result(websocket, {
-                                "status": "success",
-                                "sport": sport,
-                                "analysis": analysis,
-                                "timestamp": datetime.now().isoformat()
-                            })
-                        else:
-                            await manager.send_analysis_result(websocket, {
-                                "status": "no_pose",
-                                "sport": sport,
-                                "message": "No pose detected",
-                                "timestamp": datetime.now().isoformat()
-                            })
-                    else:
-                        await manager.send_analysis_result(websocket, {
-                            "status": "error",
-                            "message": "Invalid image data",
-                            "timestamp": datetime.now().isoformat()
-                        })
-                except Exception as e:
-                    logger.error(f"Image processing error: {e}")
-                    await manager.send_analysis_result(websocket, {
-                        "status": "error",
-                        "message": f"Processing error: {str(e)}",
-                        "timestamp": datetime.now().isoformat()
-                    })
-            else:
-                await manager.send_analysis_result(websocket, {
-                    "status": "error",
-                    "message": "No image data provided",
-                    "timestamp": datetime.now().isoformat()
-                })
+        await run_latest_frame_loop(scheduler, receive_frame, process_frame)
     
     except WebSocketDisconnect:
         manager.disconnect(websocket)
     except Exception as e:
         logger.error(f"WebSocket error: {e}")
         manager.disconnect(websocket)
+    finally:
+        pose_sessions.release(session_id)
 
 @app.post("/recommend_drills")
 async def recommend_drills(request: AnalysisRequest):
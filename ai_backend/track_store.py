@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Track Store - Columnar per-track state for ByteTracker
+Every track owns a slot in preallocated NumPy arrays: ring buffers of its recent
+boxes, confidences, timestamps and velocities, plus its Kalman state and appearance
+embedding, so history appends write in place and trajectory statistics are vectorized slices
+"""
+
+import logging
+from typing import Dict, Iterable, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+class TrackStore:
+    """
+    Slot-indexed track arrays that grow by doubling when full.
+    Ring buffer row `slot` holds the last history_length entries of that
+    track; heads[slot] is where the next entry goes and counts[slot] how many
+    entries are valid.
+    """
+
+    def __init__(self, capacity: int = 64, history_length: int = 30, embedding_size: int = 64):
+        self.history_length = history_length
+        self.embedding_size = embedding_size
+        self.capacity = 0
+        self._free: list = []
+        self._grow(max(1, capacity))
+
+    def _grow(self, capacity: int):
+        """Reallocate every column at capacity, keeping existing slots"""
+        old_capacity, h = self.capacity, self.history_length
+        columns = {
+            'boxes': (capacity, h, 4),
+            'confidences': (capacity, h),
+            'timestamps': (capacity, h),
+            'velocities': (capacity, h, 2),
+            'kalman_means': (capacity, 8),
+            'kalman_covariances': (capacity, 8, 8),
+            'predicted_boxes': (capacity, 4)
+        }
+        for name, shape in columns.items():
+            column = np.zeros(shape)
+            if old_capacity:
+                column[:old_capacity] = getattr(self, name)
+            setattr(self, name, column)
+
+        # Unit appearance embeddings; an all-zero row means the track has none yet
+        embeddings = np.zeros((capacity, self.embedding_size), dtype=np.float32)
+        if old_capacity:
+            embeddings[:old_capacity] = self.embeddings
+        self.embeddings = embeddings
+
+        for name, dtype in (('heads', np.int64), ('counts', np.int64), ('active', bool)):
+            column = np.zeros(capacity, dtype=dtype)
+            if old_capacity:
+                column[:old_capacity] = getattr(self, name)
+            setattr(self, name, column)
+
+        # Pop from the end, so the lowest new slot is handed out first
+        self._free.extend(range(capacity - 1, old_capacity - 1, -1))
+        self.capacity = capacity
+
+    def allocate(self) -> int:
+        """Claim an empty slot for a new track"""
+        if not self._free:
+            self._grow(self.capacity * 2)
+        slot = self._free.pop()
+        self.heads[slot] = 0
+        self.counts[slot] = 0
+        self.embeddings[slot] = 0.0
+        self.active[slot] = True
+        return slot
+
+    def release(self, slot: int):
+        if self.active[slot]:
+            self.active[slot] = False
+            self._free.append(slot)
+
+    def retain(self, slots: Iterable[int]):
+        """Release every active slot not in slots"""
+        keep = np.zeros(self.capacity, dtype=bool)
+        keep[np.fromiter(slots, dtype=np.int64)] = True
+        for slot in np.flatnonzero(self.active & ~keep).tolist():
+            self.release(slot)
+
+    def append(self, slot: int, box, confidence: float, timestamp: float, velocity: Tuple[float, float]):
+        """Write one history entry for a track, overwriting its oldest when full"""
+        head = self.heads[slot]
+        self.boxes[slot, head] = box
+        self.confidences[slot, head] = confidence
+        self.timestamps[slot, head] = timestamp
+        self.velocities[slot, head] = velocity
+        self.heads[slot] = (head + 1) % self.history_length
+        self.counts[slot] = min(self.counts[slot] + 1, self.history_length)
+
+    def latest(self, slot: int) -> int:
+        """Ring index of a track's most recent entry"""
+        return (self.heads[slot] - 1) % self.history_length
+
+    def window_indices(self, slots: np.ndarray, window: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Ring indices (n, window) of each slot's last window entries, oldest
+        first, and a mask of which of them hold data
+        """
+        offsets = np.arange(window) - window
+        indices = (self.heads[slots][:, None] + offsets[None, :]) % self.history_length
+        valid = offsets[None, :] >= -self.counts[slots][:, None]
+        return indices, valid
+
+    def centers(self, slots: np.ndarray, window: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Box centers (n, window, 2) over each slot's last window entries, with the validity mask"""
+        indices, valid = self.window_indices(slots, window)
+        boxes = self.boxes[slots[:, None], indices]
+        return (boxes[..., :2] + boxes[..., 2:]) / 2.0, valid
+
+    def mean_speeds(self, slots: np.ndarray, window: int) -> np.ndarray:
+        """Mean speed over each slot's last window velocities (only meaningful once counts >= window)"""
+        indices, _ = self.window_indices(slots, window)
+        velocities = self.velocities[slots[:, None], indices]
+        return np.hypot(velocities[..., 0], velocities[..., 1]).mean(axis=1)
+
+    def history(self, slot: int) -> Dict[str, np.ndarray]:
+        """A track's valid history columns, oldest first"""
+        indices, valid = self.window_indices(np.array([slot]), self.history_length)
+        indices = indices[0][valid[0]]
+        return {
+            'boxes': self.boxes[slot, indices],
+            'confidences': self.confidences[slot, indices],
+            'timestamps': self.timestamps[slot, indices],
+            'velocities': self.velocities[slot, indices]
+        }
+
+    def memory_bytes(self) -> int:
+        return sum(getattr(self, name).nbytes for name in (
+            'boxes', 'confidences', 'timestamps', 'velocities', 'kalman_means',
+            'kalman_covariances', 'predicted_boxes', 'embeddings', 'heads', 'counts', 'active'
+        ))
+
+    def get_stats(self) -> Dict[str, int]:
+        return {
+            'capacity': self.capacity,
+            'active_slots': int(self.active.sum()),
+            'history_length': self.history_length,
+            'memory_bytes': self.memory_bytes()
+        }
+
+__all__ = ['TrackStore']
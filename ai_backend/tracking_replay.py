@@ -0,0 +1,336 @@
+#!/usr/bin/env python3
+"""
+Tracking Replay - Offline replay and benchmark of recorded detection logs
+Feeds a DetectionLog through a fresh MultiObjectTracker, as fast as possible or
+at the recorded pace, and reports frames per second, per-stage latency and track
+counts over time and, when the log carries ground truth, ID switches, MOTA and IDF1
+"""
+
+import json
+import time
+import argparse
+import logging
+from collections import defaultdict
+from typing import Dict, List, Any, Optional, Tuple
+
+import numpy as np
+
+from detection_log import DetectionLog, DetectionRecorder
+from multi_object_tracker import MultiObjectTracker
+from track_association import assign, iou_matrix
+
+logger = logging.getLogger(__name__)
+
+PACE_MAX = 'max'
+PACE_REALTIME = 'realtime'
+
+# Timed stages: stage -> (attribute of the MultiObjectTracker holding the object, methods)
+# 'update' is the whole ByteTracker.update and includes the stages before 'sport_data'
+TRACKER_STAGES = {
+    'embed': ('byte_tracker', ('_detection_embeddings',)),
+    'predict': ('byte_tracker', ('_predict_tracks',)),
+    'associate': ('byte_tracker', ('_associate_tracks_to_detections',)),
+    'reidentify': ('byte_tracker', ('_reidentify_lost_tracks',)),
+    'correct': ('byte_tracker', ('_correct_tracks',)),
+    'sport_data': ('byte_tracker', ('_update_sport_specific_data', '_update_sport_relationships')),
+    'update': ('byte_tracker', ('update',)),
+    'results': (None, ('_generate_results',))
+}
+
+class StageTimer:
+    """
+    Per-frame time spent in tracker methods. Methods are wrapped on the
+    replayed instances only, so the tracker code itself carries no timing.
+    """
+
+    def __init__(self):
+        self._current: Dict[str, float] = defaultdict(float)
+        self.stages: List[str] = []
+        self.frames: Dict[str, List[float]] = {'frame': []}
+
+    def instrument(self, owner: Any, stage: str, method_name: str):
+        method = getattr(owner, method_name)
+        current = self._current
+
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                current[stage] += time.perf_counter() - start
+
+        setattr(owner, method_name, timed)
+
+    def instrument_tracker(self, tracker: MultiObjectTracker):
+        for stage, (attribute, methods) in TRACKER_STAGES.items():
+            owner = getattr(tracker, attribute) if attribute else tracker
+            for method_name in methods:
+                self.instrument(owner, stage, method_name)
+            self.stages.append(stage)
+            self.frames[stage] = []
+
+    def end_frame(self, frame_seconds: float):
+        """Close a frame: milliseconds per stage, 0 for stages it did not run"""
+        for stage in self.stages:
+            self.frames[stage].append(self._current.pop(stage, 0.0) * 1000)
+        self.frames['frame'].append(frame_seconds * 1000)
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        return {stage: _distribution(np.array(values)) for stage, values in self.frames.items()}
+
+class IdentityMetrics:
+    """
+    CLEAR MOT (MOTA, ID switches) and IDF1 of tracker output against ground
+    truth. A ground-truth box and a track box correspond when their IoU is at
+    least iou_thresh; last frame's correspondences are kept while they hold.
+    """
+
+    def __init__(self, iou_thresh: float = 0.5):
+        self.iou_thresh = iou_thresh
+        self.ground_truth = 0
+        self.hypotheses = 0
+        self.matches = 0
+        self.misses = 0
+        self.false_positives = 0
+        self.id_switches = 0
+        self._last_match: Dict[int, int] = {}
+        # Frames in which each (ground truth id, track id) pair overlapped, for IDF1
+        self._pair_frames: Dict[Tuple[int, int], int] = defaultdict(int)
+
+    def update(self, gt_ids: np.ndarray, gt_boxes: np.ndarray, track_ids: np.ndarray, track_boxes: np.ndarray):
+        gt_ids, track_ids = np.asarray(gt_ids).tolist(), np.asarray(track_ids).tolist()
+        overlaps = iou_matrix(gt_boxes, track_boxes)
+        valid = overlaps >= self.iou_thresh
+
+        for g, t in np.argwhere(valid).tolist():
+            self._pair_frames[(gt_ids[g], track_ids[t])] += 1
+
+        # Continuing last frame's correspondence outranks any new pairing
+        scores = np.where(valid, overlaps, 0.0)
+        for g, gt_id in enumerate(gt_ids):
+            previous = self._last_match.get(gt_id)
+            if previous is not None and previous in track_ids:
+                t = track_ids.index(previous)
+                if valid[g, t]:
+                    scores[g, t] += 1.0
+        matches, unmatched_tracks, unmatched_gt = assign(scores, self.iou_thresh)
+
+        for g, t in matches:
+            previous = self._last_match.get(gt_ids[g])
+            if previous is not None and previous != track_ids[t]:
+                self.id_switches += 1
+            self._last_match[gt_ids[g]] = track_ids[t]
+
+        self.ground_truth += len(gt_ids)
+        self.hypotheses += len(track_ids)
+        self.matches += len(matches)
+        self.misses += len(unmatched_gt)
+        self.false_positives += len(unmatched_tracks)
+
+    def idf1(self) -> float:
+        """2 IDTP / (ground truth + hypotheses), with IDTP from the best one-to-one identity mapping"""
+        if not self.ground_truth + self.hypotheses:
+            return 0.0
+        gt_ids = sorted({g for g, _ in self._pair_frames})
+        track_ids = sorted({t for _, t in self._pair_frames})
+        gt_index = {g: i for i, g in enumerate(gt_ids)}
+        track_index = {t: i for i, t in enumerate(track_ids)}
+        counts = np.zeros((len(gt_ids), len(track_ids)))
+        for (g, t), frames in self._pair_frames.items():
+            counts[gt_index[g], track_index[t]] = frames
+
+        matches, _, _ = assign(counts, 1.0)
+        true_positives = sum(counts[g, t] for g, t in matches)
+        return float(2 * true_positives / (self.ground_truth + self.hypotheses))
+
+    def summary(self) -> Dict[str, Any]:
+        errors = self.misses + self.false_positives + self.id_switches
+        return {
+            'mota': 1.0 - errors / self.ground_truth if self.ground_truth else 0.0,
+            'idf1': self.idf1(),
+            'id_switches': self.id_switches,
+            'matches': self.matches,
+            'misses': self.misses,
+            'false_positives': self.false_positives,
+            'ground_truth_boxes': self.ground_truth
+        }
+
+def _distribution(values: np.ndarray) -> Dict[str, float]:
+    if not len(values):
+        return {'mean_ms': 0.0, 'p50_ms': 0.0, 'p95_ms': 0.0, 'max_ms': 0.0}
+    return {
+        'mean_ms': float(values.mean()),
+        'p50_ms': float(np.percentile(values, 50)),
+        'p95_ms': float(np.percentile(values, 95)),
+        'max_ms': float(values.max())
+    }
+
+def replay(log: DetectionLog,
+           sport_name: Optional[str] = None,
+           pace: str = PACE_MAX,
+           delta: bool = False,
+           iou_thresh: float = 0.5) -> Dict[str, Any]:
+    """
+    Replay a log through a new tracker and report throughput, latency, track
+    counts and, with ground truth, identity metrics. Frame latency covers
+    process_frame only; waiting for the recorded pace and scoring are excluded.
+    """
+    tracker = MultiObjectTracker(sport_name or log.sport or 'football')
+    timer = StageTimer()
+    timer.instrument_tracker(tracker)
+    metrics = IdentityMetrics(iou_thresh) if log.has_ground_truth else None
+
+    track_counts = np.zeros(len(log), dtype=np.int64)
+    first_timestamp = float(log.timestamps[0]) if len(log) else 0.0
+    start = time.perf_counter()
+
+    for frame in range(len(log)):
+        frame_timestamp = float(log.timestamps[frame])
+        if pace == PACE_REALTIME:
+            wait = (frame_timestamp - first_timestamp) - (time.perf_counter() - start)
+            if wait > 0:
+                time.sleep(wait)
+
+        detections = log.detections(frame)
+        frame_start = time.perf_counter()
+        tracker.process_frame(detections, frame_timestamp, delta)
+        timer.end_frame(time.perf_counter() - frame_start)
+
+        tracks = tracker.byte_tracker.tracked_tracks
+        track_counts[frame] = len(tracks)
+        if metrics is not None:
+            track_ids = np.array([t.track_id for t in tracks], dtype=np.int64)
+            track_boxes = np.array([[t.current_bbox.x1, t.current_bbox.y1, t.current_bbox.x2, t.current_bbox.y2]
+                                    for t in tracks], dtype=np.float64).reshape(-1, 4)
+            metrics.update(*log.ground_truth(frame), track_ids, track_boxes)
+
+    wall_seconds = time.perf_counter() - start
+    latency = timer.summary()
+    processing_seconds = sum(timer.frames['frame']) / 1000
+    statistics = tracker.byte_tracker.get_tracking_statistics()
+
+    report = {
+        'sport': tracker.sport_name,
+        'pace': pace,
+        'frames': len(log),
+        'detections': log.detection_count,
+        'wall_seconds': wall_seconds,
+        'fps': len(log) / processing_seconds if processing_seconds else 0.0,
+        'latency_ms': latency,
+        'track_counts': {
+            'min': int(track_counts.min()) if len(log) else 0,
+            'mean': float(track_counts.mean()) if len(log) else 0.0,
+            'max': int(track_counts.max()) if len(log) else 0,
+            'per_frame': track_counts.tolist()
+        },
+        'tracks_created': statistics['total_tracks_created'],
+        'tracks_reidentified': statistics.get('reidentified_tracks', 0)
+    }
+    if metrics is not None:
+        report['identity'] = metrics.summary()
+    return report
+
+def simulate_detection_log(players: int = 22,
+                           frames: int = 600,
+                           frame_rate: float = 30.0,
+                           occlusion_rate: float = 0.01,
+                           seed: int = 0,
+                           sport_name: str = 'football') -> DetectionLog:
+    """
+    Synthetic log with ground truth: players wandering a 1280x720 frame and
+    one ball, each dropping out of the detections for 5-25 frames at random
+    (occlusion), with box jitter and a few low-confidence false positives
+    """
+    rng = np.random.default_rng(seed)
+    count = players + 1
+    sizes = np.vstack([rng.uniform(40, 90, size=(players, 2)), [[14.0, 14.0]]])
+    speeds = np.append(np.full(players, 5.0), 15.0)
+    limits = np.array([1280.0, 720.0]) - sizes
+    positions = rng.uniform(0, 1, size=(count, 2)) * limits
+    velocities = rng.uniform(-1, 1, size=(count, 2)) * speeds[:, None]
+    occluded = np.zeros(count, dtype=np.int64)
+    names = ['person'] * players + ['sports ball']
+
+    recorder = DetectionRecorder(sport_name)
+    for frame in range(frames):
+        velocities += rng.normal(0, 0.1, size=velocities.shape) * speeds[:, None]
+        velocities = np.clip(velocities, -2 * speeds[:, None], 2 * speeds[:, None])
+        positions += velocities
+        bounced = (positions < 0) | (positions > limits)
+        velocities[bounced] *= -1
+        positions = np.clip(positions, 0, limits)
+
+        starting = (occluded == 0) & (rng.random(count) < occlusion_rate)
+        occluded[starting] = rng.integers(5, 25, size=starting.sum())
+
+        boxes = np.hstack([positions, positions + sizes])
+        ground_truth = [{'id': i, 'bbox': dict(zip(('x1', 'y1', 'x2', 'y2'), box))}
+                        for i, box in enumerate(boxes.tolist())]
+
+        detections = []
+        for i in np.flatnonzero(occluded == 0).tolist():
+            box = boxes[i] + rng.normal(0, 1.0, size=4)
+            detections.append({'class_name': names[i], 'confidence': float(rng.uniform(0.5, 0.99)),
+                               'bbox': dict(zip(('x1', 'y1', 'x2', 'y2'), box.tolist()))})
+        if rng.random() < 0.1:
+            origin = rng.uniform(0, 1, size=2) * np.array([1200.0, 640.0])
+            detections.append({'class_name': 'person', 'confidence': float(rng.uniform(0.1, 0.5)),
+                               'bbox': dict(zip(('x1', 'y1', 'x2', 'y2'), np.append(origin, origin + 60).tolist()))})
+        occluded[occluded > 0] -= 1
+
+        recorder.record(detections, frame / frame_rate, ground_truth)
+    return recorder.to_log()
+
+def format_report(report: Dict[str, Any]) -> str:
+    lines = [
+        f"sport={report['sport']}  pace={report['pace']}  frames={report['frames']}  "
+        f"detections={report['detections']}  wall={report['wall_seconds']:.2f}s  fps={report['fps']:.1f}",
+        f"tracks per frame min={report['track_counts']['min']} mean={report['track_counts']['mean']:.1f} "
+        f"max={report['track_counts']['max']}  created={report['tracks_created']}  "
+        f"reidentified={report['tracks_reidentified']}"
+    ]
+    for stage, values in report['latency_ms'].items():
+        lines.append(f"  {stage:<11}" + "  ".join(f"{key}={value:.3f}" for key, value in values.items()))
+    if 'identity' in report:
+        lines.append("identity " + "  ".join(
+            f"{key}={value:.4f}" if isinstance(value, float) else f"{key}={value}"
+            for key, value in report['identity'].items()
+        ))
+    return "\n".join(lines)
+
+__all__ = [
+    'PACE_MAX', 'PACE_REALTIME', 'TRACKER_STAGES', 'StageTimer', 'IdentityMetrics',
+    'replay', 'simulate_detection_log', 'format_report'
+]
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay a recorded detection log through the tracker and benchmark it")
+    parser.add_argument("log", nargs='?', help="Detection log (.npz) recorded by DetectionRecorder")
+    parser.add_argument("--sport", help="Sport to track as (defaults to the sport recorded in the log)")
+    parser.add_argument("--pace", choices=(PACE_MAX, PACE_REALTIME), default=PACE_MAX)
+    parser.add_argument("--delta", action='store_true', help="Generate delta results, as streaming clients get")
+    parser.add_argument("--iou-thresh", type=float, default=0.5, help="IoU for a track to match ground truth")
+    parser.add_argument("--synthetic", type=int, metavar='PLAYERS',
+                        help="Replay a synthetic log with ground truth instead of a recorded one")
+    parser.add_argument("--frames", type=int, default=600, help="Frames of the synthetic log")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the synthetic log")
+    parser.add_argument("--save-log", help="Also save the synthetic log to this .npz path")
+    parser.add_argument("--json", help="Write the full report, including per-frame track counts, to this path")
+    arguments = parser.parse_args()
+
+    if arguments.synthetic:
+        detection_log = simulate_detection_log(arguments.synthetic, arguments.frames, seed=arguments.seed,
+                                               sport_name=arguments.sport or 'football')
+        if arguments.save_log:
+            detection_log.save(arguments.save_log)
+    elif arguments.log:
+        detection_log = DetectionLog.load(arguments.log)
+    else:
+        parser.error("give a detection log or --synthetic PLAYERS")
+
+    logging.basicConfig(level=logging.WARNING)
+    result = replay(detection_log, arguments.sport, arguments.pace, arguments.delta, arguments.iou_thresh)
+    print(format_report(result))
+    if arguments.json:
+        with open(arguments.json, 'w') as report_file:
+            json.dump(result, report_file, indent=2)
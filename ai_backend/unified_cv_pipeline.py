@@ -5,25 +5,61 @@ Integrates MediaPipe (pose/hands) + YOLO (objects) + Sport Pack configurations
 Production-grade implementation with full error handling and performance optimization
 """
 
+import os
 import cv2
 import numpy as np
 import logging
 import math
-from typing import Dict, List, Optional, Any, Tuple, Union
-from dataclasses import dataclass, field
+import statistics
+from typing import Dict, List, Optional, Any, Sequence, Tuple, Union
+from dataclasses import dataclass, field, replace
 from enum import Enum
 import time
 import mediapipe as mp
 from abc import ABC, abstractmethod
 import asyncio
-from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import ThreadPoolExecutor, Future
 import threading
 
 # Import Sport Pack System
 from sport_pack_system import sport_pack_loader, SportPackConfig
+from pose_graph_pool import PoseGraphPool, get_pose_graph_pool
+from inference_executor import InferenceExecutorConfig
+from frame_preprocessor import FramePreprocessor, FrameTransform, PreparedFrame, frame_preprocessor
+from frame_features import FrameFeatures
+from object_detection_backends import ObjectDetectorConfig, ObjectDetectorBackend, create_object_detector_backend
+from model_variants import ModelVariant, ModelVariantRegistry, model_variant_registry, object_model_variants, pose_model_variants
+from adaptive_complexity import pose_complexity_controller
+from detector_plan import (
+    DetectorExecutionPlan, DEFAULT_PLAN, RACKET_DETECTOR, HOOP_DETECTOR, execution_plan_cache
+)
 
 logger = logging.getLogger(__name__)
 
+# HSV ranges for common sports balls
+BALL_COLOR_RANGES = {
+    'orange_basketball': ([5, 50, 50], [25, 255, 255]),  # Orange
+    'yellow_tennis': ([20, 100, 100], [30, 255, 255]),   # Yellow
+    'white_volleyball': ([0, 0, 200], [180, 30, 255]),   # White
+    'soccer_ball': ([0, 0, 0], [180, 255, 100])          # Dark patterns
+}
+
+# Colour transitions per pixel above which ball masks are labelled and despeckled before tracing
+FRAGMENTED_MASK_RATIO = 0.1
+_ball_lut_cache: Dict[Tuple[str, ...], np.ndarray] = {}
+
+def _ball_color_luts(bucket_names: Tuple[str, ...]) -> np.ndarray:
+    """Per-channel (H, S, V) lookup tables mapping a value to the bitmask of buckets whose range contains it"""
+    luts = _ball_lut_cache.get(bucket_names)
+    if luts is None:
+        luts = np.zeros((3, 256), np.uint8)
+        for bit, name in enumerate(bucket_names):
+            lower, upper = BALL_COLOR_RANGES[name]
+            for channel in range(3):
+                luts[channel, lower[channel]:upper[channel] + 1] |= np.uint8(1 << bit)
+        _ball_lut_cache[bucket_names] = luts
+    return luts
+
 class DetectionMethod(Enum):
     """Available detection methods"""
     MEDIAPIPE_POSE = "mediapipe_pose"
@@ -67,6 +103,7 @@ class DetectionResult:
     # Performance metrics
     processing_time_ms: float = 0.0
     fps: float = 0.0
+    model_complexity: Optional[int] = None
     
     # Sport-specific analysis
     sport_context: Optional[Dict[str, Any]] = None
@@ -91,8 +128,8 @@ class BaseDetector(ABC):
         raise NotImplementedError("Subclasses must implement initialize()")
     
     @abstractmethod
-    def detect(self, image: np.ndarray) -> DetectionResult:
-        """Perform detection on image"""
+    def detect(self, image: np.ndarray, features: Optional[FrameFeatures] = None) -> DetectionResult:
+        """Perform detection on image, reusing conversions from features when given"""
         raise NotImplementedError("Subclasses must implement detect()")
     
     @abstractmethod
@@ -100,6 +137,12 @@ class BaseDetector(ABC):
         """Cleanup detector resources"""
         raise NotImplementedError("Subclasses must implement cleanup()")
     
+    def warm_up(self, image: np.ndarray):
+        """Run one detection, raising if the detector cannot run (detect() reports failures instead)"""
+        if not self.is_initialized and not self.initialize():
+            raise RuntimeError(f"{type(self).__name__} failed to initialize")
+        self.detect(image)
+    
     def update_performance_stats(self, result: DetectionResult):
         """Update performance statistics"""
         self.performance_stats['total_detections'] += 1
@@ -121,7 +164,7 @@ class MediaPipePoseDetector(BaseDetector):
     def __init__(self, confidence_threshold: float = 0.5, model_complexity: int = 2):
         super().__init__(confidence_threshold)
         self.model_complexity = model_complexity
-        self.pose_detector = None
+        self.pose_pool: Optional[PoseGraphPool] = None
         
     def initialize(self) -> bool:
         """Initialize MediaPipe pose detector"""
@@ -131,13 +174,12 @@ class MediaPipePoseDetector(BaseDetector):
                 logger.error("MediaPipe pose solution not available")
                 return False
                 
-            self.pose_detector = pose_solution.Pose(
-                static_image_mode=False,
+            # Static-image graphs from a shared pool: one graph per concurrent caller,
+            # no tracking state carried between unrelated requests
+            self.pose_pool = get_pose_graph_pool(
                 model_complexity=self.model_complexity,
                 enable_segmentation=True,
-                smooth_landmarks=True,
-                min_detection_confidence=self.confidence_threshold,
-                min_tracking_confidence=0.5
+                min_detection_confidence=self.confidence_threshold
             )
             self.is_initialized = True
             logger.info("MediaPipe pose detector initialized successfully")
@@ -146,7 +188,7 @@ class MediaPipePoseDetector(BaseDetector):
             logger.error(f"Failed to initialize MediaPipe pose detector: {str(e)}")
             return False
     
-    def detect(self, image: np.ndarray) -> DetectionResult:
+    def detect(self, image: np.ndarray, features: Optional[FrameFeatures] = None) -> DetectionResult:
         """Detect pose landmarks in image"""
         start_time = time.time()
         
@@ -161,12 +203,12 @@ class MediaPipePoseDetector(BaseDetector):
         
         try:
             # Convert BGR to RGB
-            rgb_image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+            rgb_image = FrameFeatures.of(features if features is not None else image).rgb
             
-            if self.pose_detector is None:
+            if self.pose_pool is None:
                 raise Exception("Pose detector not initialized")
                 
-            results = self.pose_detector.process(rgb_image)
+            results = self.pose_pool.process(rgb_image)
             
             processing_time = (time.time() - start_time) * 1000
             fps = 1000 / processing_time if processing_time > 0 else 0
@@ -186,7 +228,8 @@ class MediaPipePoseDetector(BaseDetector):
                     pose_world_landmarks=world_landmarks,
                     joint_angles=joint_angles,
                     processing_time_ms=processing_time,
-                    fps=fps
+                    fps=fps,
+                    model_complexity=self.model_complexity
                 )
             else:
                 detection_result = DetectionResult(
@@ -195,10 +238,12 @@ class MediaPipePoseDetector(BaseDetector):
                     success=False,
                     confidence=0.0,
                     processing_time_ms=processing_time,
-                    fps=fps
+                    fps=fps,
+                    model_complexity=self.model_complexity
                 )
             
             self.update_performance_stats(detection_result)
+            pose_complexity_controller.observe(self.model_complexity, processing_time)
             return detection_result
             
         except Exception as e:
@@ -211,6 +256,12 @@ class MediaPipePoseDetector(BaseDetector):
                 processing_time_ms=(time.time() - start_time) * 1000
             )
     
+    def warm_up(self, image: np.ndarray):
+        """Push one frame through a pooled graph, raising if the graph cannot be built"""
+        if not self.is_initialized and not self.initialize():
+            raise RuntimeError("MediaPipe pose detector failed to initialize")
+        self.pose_pool.process(FrameFeatures(image).rgb)
+    
     def _extract_pose_landmarks(self, landmarks) -> Dict[str, Any]:
         """Extract pose landmarks to dictionary"""
         pose_solution = getattr(mp.solutions, 'pose', None)
@@ -332,185 +383,248 @@ class MediaPipePoseDetector(BaseDetector):
     
     def cleanup(self):
         """Cleanup MediaPipe resources"""
-        if self.pose_detector:
-            self.pose_detector.close()
-            self.pose_detector = None
+        # The pool is shared with other detectors; just drop our reference
+        self.pose_pool = None
         self.is_initialized = False
 
 class YOLOObjectDetector(BaseDetector):
     """YOLO-based object detection for sports equipment and players"""
     
-    def __init__(self, confidence_threshold: float = 0.5, model_size: str = "n"):
+    def __init__(self, confidence_threshold: float = 0.5, model_size: str = "n",
+                 backend_config: Optional[ObjectDetectorConfig] = None):
         super().__init__(confidence_threshold)
         self.model_size = model_size
-        self.model = None
+        self.model: Optional[ObjectDetectorBackend] = None
+        self.backend_config = backend_config or ObjectDetectorConfig.from_env(model_size)
         self.class_names = []
         
     def initialize(self) -> bool:
-        """Initialize YOLO model"""
+        """Initialize YOLO model, falling back to OpenCV heuristics when no model backend loads"""
         try:
-            # Fallback detection using computer vision techniques
-            # In production, this would use: from ultralytics import YOLO
-            logger.info(f"Initializing YOLO object detector (model size: {self.model_size})")
-            
-            # Mock YOLO class names for sports objects
-            self.class_names = [
-                'person', 'ball', 'basketball', 'football', 'tennis_ball', 'volleyball',
-                'badminton_shuttlecock', 'cricket_ball', 'hockey_puck', 'golf_ball',
-                'soccer_ball', 'tennis_racket', 'badminton_racket', 'cricket_bat',
-                'hockey_stick', 'golf_club', 'basketball_hoop', 'soccer_goal',
-                'tennis_net', 'volleyball_net', 'court_line', 'field_line'
-            ]
+            logger.info(f"Initializing YOLO object detector (model size: {self.model_size}, "
+                        f"backend: {self.backend_config.backend})")
+            
+            self.model = create_object_detector_backend(self.backend_config)
+            if self.model is not None:
+                self.class_names = list(self.model.class_names)
+            else:
+                # Heuristic class names for sports objects
+                self.class_names = [
+                    'person', 'ball', 'basketball', 'football', 'tennis_ball', 'volleyball',
+                    'badminton_shuttlecock', 'cricket_ball', 'hockey_puck', 'golf_ball',
+                    'soccer_ball', 'tennis_racket', 'badminton_racket', 'cricket_bat',
+                    'hockey_stick', 'golf_club', 'basketball_hoop', 'soccer_goal',
+                    'tennis_net', 'volleyball_net', 'court_line', 'field_line'
+                ]
             
             self.is_initialized = True
-            logger.info("YOLO object detector initialized successfully")
+            logger.info(f"YOLO object detector initialized successfully ({self.backend_name})")
             return True
             
         except Exception as e:
             logger.error(f"Failed to initialize YOLO detector: {str(e)}")
             return False
     
-    def detect(self, image: np.ndarray) -> DetectionResult:
+    @property
+    def backend_name(self) -> str:
+        return self.model.name if self.model is not None else 'heuristic'
+    
+    @property
+    def supports_batching(self) -> bool:
+        """True when frames are best sent together in one model call"""
+        return self.model is not None
+    
+    def warm_up(self, image: np.ndarray):
+        """Run one inference, raising if the model backend fails"""
+        if not self.is_initialized and not self.initialize():
+            raise RuntimeError("YOLO object detector failed to initialize")
+        if self.model is not None:
+            self.model.detect_batch([image])
+        else:
+            self._computer_vision_detection(image)
+    
+    def detect(self, image: np.ndarray, features: Optional[FrameFeatures] = None,
+               plan: Optional[DetectorExecutionPlan] = None) -> DetectionResult:
         """Detect objects in image using YOLO"""
+        return self.detect_many([image], [features], plan)[0]
+    
+    def detect_many(self, images: List[np.ndarray], features: Optional[List[Optional[FrameFeatures]]] = None,
+                    plan: Optional[DetectorExecutionPlan] = None) -> List[DetectionResult]:
+        """Detect objects in several images; a model backend runs them as one batch"""
         start_time = time.time()
+        plan = plan or DEFAULT_PLAN
         
         if not self.is_initialized:
             if not self.initialize():
-                return DetectionResult(
-                    method=DetectionMethod.YOLO_OBJECTS,
-                    timestamp=time.time(),
-                    success=False,
-                    confidence=0.0
-                )
+                return [
+                    DetectionResult(
+                        method=DetectionMethod.YOLO_OBJECTS,
+                        timestamp=time.time(),
+                        success=False,
+                        confidence=0.0
+                    )
+                    for _ in images
+                ]
         
         try:
-            # Real computer vision-based object detection
-            detected_objects = self._computer_vision_detection(image)
-            
-            processing_time = (time.time() - start_time) * 1000
+            if self.model is not None:
+                # Model inference with per-class thresholds from the sport pack
+                batch_objects = self.model.detect_batch(images, plan.class_threshold_map)
+            else:
+                # Real computer vision-based object detection, limited to the sport's detectors
+                features = features or [None] * len(images)
+                batch_objects = [
+                    self._computer_vision_detection(image, frame_features, plan)
+                    for image, frame_features in zip(images, features)
+                ]
+            
+            processing_time = (time.time() - start_time) * 1000 / max(1, len(images))
             fps = 1000 / processing_time if processing_time > 0 else 0
             
-            detection_result = DetectionResult(
-                method=DetectionMethod.YOLO_OBJECTS,
-                timestamp=time.time(),
-                success=len(detected_objects) > 0,
-                confidence=self._calculate_detection_confidence(detected_objects),
-                objects=detected_objects,
-                bounding_boxes=[obj['bbox'] for obj in detected_objects],
-                processing_time_ms=processing_time,
-                fps=fps
-            )
-            
-            self.update_performance_stats(detection_result)
-            return detection_result
+            results = []
+            for detected_objects in batch_objects:
+                detection_result = DetectionResult(
+                    method=DetectionMethod.YOLO_OBJECTS,
+                    timestamp=time.time(),
+                    success=len(detected_objects) > 0,
+                    confidence=self._calculate_detection_confidence(detected_objects),
+                    objects=detected_objects,
+                    bounding_boxes=[obj['bbox'] for obj in detected_objects],
+                    processing_time_ms=processing_time,
+                    fps=fps
+                )
+                self.update_performance_stats(detection_result)
+                results.append(detection_result)
+            return results
             
         except Exception as e:
             logger.error(f"YOLO object detection failed: {str(e)}")
-            return DetectionResult(
-                method=DetectionMethod.YOLO_OBJECTS,
-                timestamp=time.time(),
-                success=False,
-                confidence=0.0,
-                processing_time_ms=(time.time() - start_time) * 1000
-            )
+            return [
+                DetectionResult(
+                    method=DetectionMethod.YOLO_OBJECTS,
+                    timestamp=time.time(),
+                    success=False,
+                    confidence=0.0,
+                    processing_time_ms=(time.time() - start_time) * 1000
+                )
+                for _ in images
+            ]
     
-    def _computer_vision_detection(self, image: np.ndarray) -> List[Dict[str, Any]]:
+    def _computer_vision_detection(self, image: np.ndarray,
+                                   features: Optional[FrameFeatures] = None,
+                                   plan: DetectorExecutionPlan = DEFAULT_PLAN) -> List[Dict[str, Any]]:
         """Real computer vision-based object detection using OpenCV"""
-        import cv2
-        
-        height, width = image.shape[:2]
         detections = []
         
-        # Convert to HSV for better color-based detection
-        hsv = cv2.cvtColor(image, cv2.COLOR_BGR2HSV)
+        # Colour spaces and edge maps are computed once per frame and shared by all sub-detectors
+        features = features if features is not None else FrameFeatures(image)
         
         # Detect spherical objects (balls) using color and shape analysis
-        ball_detections = self._detect_balls_by_color_shape(image, hsv)
-        detections.extend(ball_detections)
+        if plan.ball_types:
+            ball_detections = self._detect_balls_by_color_shape(image, features.hsv, plan.ball_types)
+            detections.extend(ball_detections)
         
         # Detect people using contour analysis and body shape detection
-        person_detections = self._detect_people_by_contours(image)
-        detections.extend(person_detections)
+        if plan.detect_people:
+            person_detections = self._detect_people_by_contours(image, features)
+            detections.extend(person_detections)
         
         # Detect sport-specific equipment
-        equipment_detections = self._detect_sport_equipment(image, hsv)
+        equipment_detections = self._detect_sport_equipment(image, features, plan)
         detections.extend(equipment_detections)
         
         return detections
     
-    def _detect_balls_by_color_shape(self, image: np.ndarray, hsv: np.ndarray) -> List[Dict[str, Any]]:
-        """Detect balls using color and circular shape analysis"""
+    def _detect_balls_by_color_shape(self, image: np.ndarray, hsv: np.ndarray,
+                                     ball_types: Optional[Sequence[str]] = None) -> List[Dict[str, Any]]:
+        """
+        Detect balls using color and circular shape analysis in a single pass:
+        every pixel is classified into colour buckets with per-channel lookup
+        tables, the bucket masks are stacked and traced by one findContours
+        call, and area, perimeter and circularity of all components are
+        computed and filtered as arrays.
+        """
         detections = []
         height, width = image.shape[:2]
         
-        # Define color ranges for common sports balls
-        ball_colors = {
-            'orange_basketball': ([5, 50, 50], [25, 255, 255]),  # Orange
-            'yellow_tennis': ([20, 100, 100], [30, 255, 255]),   # Yellow
-            'white_volleyball': ([0, 0, 200], [180, 30, 255]),   # White
-            'soccer_ball': ([0, 0, 0], [180, 255, 100])          # Dark patterns
-        }
-        
-        for ball_type, (lower, upper) in ball_colors.items():
-            lower_bound = np.array(lower)
-            upper_bound = np.array(upper)
-            
-            # Create mask for color range
-            mask = cv2.inRange(hsv, lower_bound, upper_bound)
-            
-            # Find contours
-            contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-            
-            for contour in contours:
-                # Check if contour is circular enough to be a ball
-                area = cv2.contourArea(contour)
-                if area < 100:  # Too small
-                    continue
-                
-                # Calculate circularity
-                perimeter = cv2.arcLength(contour, True)
-                if perimeter == 0:
-                    continue
-                
-                circularity = 4 * np.pi * area / (perimeter * perimeter)
-                
-                if circularity > 0.4:  # Reasonably circular
-                    # Get bounding box
-                    x, y, w, h = cv2.boundingRect(contour)
-                    
-                    # Calculate confidence based on circularity and size
-                    confidence = min(0.95, circularity * 1.2)
-                    
-                    detection = {
-                        'class_name': ball_type.split('_')[1],
-                        'class_id': 1,
-                        'confidence': confidence,
-                        'bbox': {
-                            'x1': x,
-                            'y1': y,
-                            'x2': x + w,
-                            'y2': y + h,
-                            'width': w,
-                            'height': h
-                        },
-                        'ball_type': ball_type,
-                        'circularity': circularity,
-                        'area': area
-                    }
-                    detections.append(detection)
+        bucket_names = tuple(ball_types) if ball_types is not None else tuple(BALL_COLOR_RANGES)
+        if not bucket_names:
+            return detections
+        luts = _ball_color_luts(bucket_names)
+        
+        # Bit k of each pixel is set when it falls inside bucket k's HSV range
+        h, s, v = cv2.split(hsv)
+        bits = cv2.bitwise_and(cv2.bitwise_and(cv2.LUT(h, luts[0]), cv2.LUT(s, luts[1])), cv2.LUT(v, luts[2]))
+        
+        # Stack the bucket masks one blank row apart so no component crosses buckets
+        row_stride = height + 1
+        stacked = np.zeros((len(bucket_names) * row_stride, width), np.uint8)
+        for bucket in range(len(bucket_names)):
+            np.bitwise_and(bits, np.uint8(1 << bucket), out=stacked[bucket * row_stride:bucket * row_stride + height])
+        
+        if cv2.countNonZero(cv2.compare(bits[:, 1:], bits[:, :-1], cv2.CMP_NE)) > bits.size * FRAGMENTED_MASK_RATIO:
+            # Fragmented masks: tracing thousands of specks costs more than labelling every pixel,
+            # so drop components whose bounding box cannot hold a 100 px contour before tracing
+            count, labels, stats, _ = cv2.connectedComponentsWithStatsWithAlgorithm(
+                stacked, 8, cv2.CV_32S, cv2.CCL_BBDT
+            )
+            large = (stats[:, cv2.CC_STAT_WIDTH] * stats[:, cv2.CC_STAT_HEIGHT] >= 100).astype(np.uint8)
+            large[0] = 0
+            stacked = np.take(large, labels)
+        
+        contours, _ = cv2.findContours(stacked, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        if not contours:
+            return detections
+        
+        # Polygon area (shoelace) and closed arc length per contour, as contourArea/arcLength compute them
+        lengths = np.fromiter((len(contour) for contour in contours), np.intp, len(contours))
+        starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+        points = np.concatenate(contours).reshape(-1, 2).astype(np.float64)
+        following = np.arange(1, len(points) + 1)
+        following[starts + lengths - 1] = starts
+        x, y = points[:, 0], points[:, 1]
+        next_x, next_y = x[following], y[following]
+        area = np.abs(np.add.reduceat(x * next_y - next_x * y, starts)) / 2.0
+        perimeter = np.add.reduceat(np.hypot(next_x - x, next_y - y), starts)
+        
+        circularity = np.divide(4 * np.pi * area, perimeter * perimeter,
+                                out=np.zeros_like(area), where=perimeter > 0)
+        keep = np.flatnonzero((area >= 100) & (circularity > 0.4))
+        
+        for i in keep:
+            box_x, box_y, w, h = cv2.boundingRect(contours[i])
+            bucket, box_y = divmod(box_y, row_stride)
+            ball_type = bucket_names[bucket]
+            
+            # Calculate confidence based on circularity and size
+            confidence = min(0.95, float(circularity[i]) * 1.2)
+            
+            detections.append({
+                'class_name': ball_type.split('_')[1],
+                'class_id': 1,
+                'confidence': confidence,
+                'bbox': {
+                    'x1': box_x,
+                    'y1': box_y,
+                    'x2': box_x + w,
+                    'y2': box_y + h,
+                    'width': w,
+                    'height': h
+                },
+                'ball_type': ball_type,
+                'circularity': float(circularity[i]),
+                'area': float(area[i])
+            })
         
         return detections
     
-    def _detect_people_by_contours(self, image: np.ndarray) -> List[Dict[str, Any]]:
+    def _detect_people_by_contours(self, image: np.ndarray, features: FrameFeatures) -> List[Dict[str, Any]]:
         """Detect people using contour analysis and body proportions"""
         detections = []
         height, width = image.shape[:2]
         
-        # Convert to grayscale for edge detection
-        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-        
         # Apply edge detection
-        edges = cv2.Canny(gray, 50, 150)
+        edges = features.edges(50, 150)
         
         # Find contours
         contours, _ = cv2.findContours(edges, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
@@ -554,28 +668,25 @@ class YOLOObjectDetector(BaseDetector):
         
         return detections
     
-    def _detect_sport_equipment(self, image: np.ndarray, hsv: np.ndarray) -> List[Dict[str, Any]]:
-        """Detect sport-specific equipment based on current sport"""
+    def _detect_sport_equipment(self, image: np.ndarray, features: FrameFeatures,
+                                plan: DetectorExecutionPlan = DEFAULT_PLAN) -> List[Dict[str, Any]]:
+        """Detect the equipment shapes the sport's execution plan asks for"""
         detections = []
         
-        # Get sport name from the detection pipeline context
-        sport_name = getattr(self, 'current_sport', 'unknown')
-        
-        if sport_name == 'tennis':
-            racket_detections = self._detect_rackets(image, hsv)
+        if RACKET_DETECTOR in plan.shape_detectors:
+            racket_detections = self._detect_rackets(image, features)
             detections.extend(racket_detections)
                 
-        elif sport_name == 'basketball':
-            hoop_detections = self._detect_basketball_hoop(image)
+        if HOOP_DETECTOR in plan.shape_detectors:
+            hoop_detections = self._detect_basketball_hoop(image, features)
             detections.extend(hoop_detections)
         
         return detections
     
-    def _detect_rackets(self, image: np.ndarray, hsv: np.ndarray) -> List[Dict[str, Any]]:
+    def _detect_rackets(self, image: np.ndarray, features: FrameFeatures) -> List[Dict[str, Any]]:
         """Detect tennis rackets using shape analysis"""
         detections = []
-        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-        edges = cv2.Canny(gray, 30, 100)
+        edges = features.edges(30, 100)
         
         contours, _ = cv2.findContours(edges, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
         
@@ -608,10 +719,10 @@ class YOLOObjectDetector(BaseDetector):
         
         return detections
     
-    def _detect_basketball_hoop(self, image: np.ndarray) -> List[Dict[str, Any]]:
+    def _detect_basketball_hoop(self, image: np.ndarray, features: FrameFeatures) -> List[Dict[str, Any]]:
         """Detect basketball hoops using circular shape detection"""
         detections = []
-        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        gray = features.gray
         
         # Use HoughCircles to detect the rim
         circles = cv2.HoughCircles(gray, cv2.HOUGH_GRADIENT, 1, 50,
@@ -654,13 +765,57 @@ class YOLOObjectDetector(BaseDetector):
         self.model = None
         self.is_initialized = False
 
+def _load_calibration_image() -> np.ndarray:
+    """Frame used to time model variants: a bundled photo with a person, or noise"""
+    path = os.getenv('EKKALAVYA_CALIBRATION_IMAGE',
+                     os.path.join(os.path.dirname(os.path.abspath(__file__)), 'test_pose.jpg'))
+    image = cv2.imread(path) if os.path.exists(path) else None
+    if image is None:
+        image = np.random.default_rng(0).integers(0, 256, (720, 1280, 3), dtype=np.uint8)
+    return image
+
+def _split_future(batch_future: Future, count: int) -> List[Future]:
+    """One future per item of a future that resolves to a list"""
+    futures = [Future() for _ in range(count)]
+    
+    def resolve(done: Future):
+        try:
+            results = done.result()
+        except Exception as e:
+            for future in futures:
+                future.set_exception(e)
+            return
+        for future, result in zip(futures, results):
+            future.set_result(result)
+    
+    batch_future.add_done_callback(resolve)
+    return futures
+
+def _run_inline(fn, *args) -> Future:
+    """Run fn on the calling thread, returning its outcome as a completed future"""
+    future = Future()
+    try:
+        future.set_result(fn(*args))
+    except Exception as e:
+        future.set_exception(e)
+    return future
+
 class UnifiedCVPipeline:
     """Unified Computer Vision Pipeline integrating all detection methods"""
     
     def __init__(self):
         self.detectors: Dict[DetectionMethod, BaseDetector] = {}
         self.active_methods: List[DetectionMethod] = []
-        self.executor = ThreadPoolExecutor(max_workers=4)
+        # One detector thread per inference worker so batches can use every core
+        self.executor = ThreadPoolExecutor(
+            max_workers=InferenceExecutorConfig.from_env().max_workers,
+            thread_name_prefix='detector'
+        )
+        self.preprocessor: FramePreprocessor = frame_preprocessor
+        # Speed/accuracy variants per detector, chosen per sport by latency budget
+        self.model_variants: ModelVariantRegistry = model_variant_registry
+        self._variant_detectors: Dict[Tuple[DetectionMethod, str], BaseDetector] = {}
+        self._variant_lock = threading.Lock()
         self.performance_monitor = {
             'total_frames_processed': 0,
             'successful_detections': 0,
@@ -679,6 +834,7 @@ class UnifiedCVPipeline:
             if pose_detector.initialize():
                 self.detectors[DetectionMethod.MEDIAPIPE_POSE] = pose_detector
                 self.active_methods.append(DetectionMethod.MEDIAPIPE_POSE)
+                self.model_variants.register(pose_model_variants(pose_detector.model_complexity))
                 logger.info("MediaPipe pose detector registered")
             
             # YOLO Object Detector
@@ -686,6 +842,8 @@ class UnifiedCVPipeline:
             if yolo_detector.initialize():
                 self.detectors[DetectionMethod.YOLO_OBJECTS] = yolo_detector
                 self.active_methods.append(DetectionMethod.YOLO_OBJECTS)
+                if yolo_detector.model is not None:
+                    self.model_variants.register(object_model_variants(yolo_detector.backend_config.model_path))
                 logger.info("YOLO object detector registered")
             
             logger.info(f"Unified CV Pipeline initialized with {len(self.active_methods)} detectors")
@@ -693,32 +851,253 @@ class UnifiedCVPipeline:
         except Exception as e:
             logger.error(f"Failed to initialize detectors: {str(e)}")
     
-    def detect_unified(self, image: np.ndarray, sport_name: Optional[str] = None, 
-                      methods: Optional[List[DetectionMethod]] = None) -> Dict[DetectionMethod, DetectionResult]:
+    def detect_unified(self, image: Union[np.ndarray, PreparedFrame], sport_name: Optional[str] = None, 
+                      methods: Optional[List[DetectionMethod]] = None,
+                      serial: bool = False) -> Dict[DetectionMethod, DetectionResult]:
         """Perform unified detection using multiple methods"""
+        return self.detect_batch([image], sport_name, methods, serial)[0]
+    
+    def detect_batch(self, images: List[Union[np.ndarray, PreparedFrame]], sport_name: Optional[str] = None,
+                     methods: Optional[List[DetectionMethod]] = None,
+                     serial: bool = False) -> List[Dict[DetectionMethod, DetectionResult]]:
+        """
+        Perform unified detection on many frames at once.
+        Every (frame, method) pair is submitted to the detector pool up front so a
+        batch keeps all workers busy; results are returned in frame order. With
+        serial=True the pairs run one after another on the calling thread, for
+        callers that already hold an inference executor slot.
+        Frames are downscaled (and pose input cropped to the ROI) per detector; all
+        coordinates in the results refer to the original frame.
+        """
+        sport_pack = self._load_sport_pack(sport_name)
+        plan = self.get_execution_plan(sport_pack)
+        
         if methods is None:
-            methods = self.active_methods
+            methods = self._get_optimal_methods_for_sport(sport_pack) if sport_pack else self.active_methods
+        runnable = [method for method in methods if method in self.detectors]
+        
+        frames = [image if isinstance(image, PreparedFrame) else PreparedFrame.from_image(image)
+                  for image in images]
+        
+        # The sport's latency budget, shared by the detectors that run, picks each one's variant
+        budget = self._method_budget(sport_pack, runnable)
+        detectors = {method: self._detector_for(method, plan, budget) for method in runnable}
+        
+        # Model-backed object detection runs all frames as one batched call;
+        # every other (frame, method) pair runs in parallel on the pool
+        submit = _run_inline if serial else self.executor.submit
+        object_detector = detectors.get(DetectionMethod.YOLO_OBJECTS)
+        batched = {}
+        if isinstance(object_detector, YOLOObjectDetector) and object_detector.supports_batching:
+            batched[DetectionMethod.YOLO_OBJECTS] = _split_future(
+                submit(self._detect_prepared_batch, DetectionMethod.YOLO_OBJECTS, object_detector,
+                                     frames, plan),
+                len(frames)
+            )
         
-        # Load sport pack if provided
-        sport_pack = None
-        if sport_name:
-            try:
-                sport_pack = sport_pack_loader.load_sport_pack(sport_name)
-            except Exception as e:
-                logger.warning(f"Failed to load sport pack for {sport_name}: {str(e)}")
+        frame_futures = []
+        for index, frame in enumerate(frames):
+            futures = []
+            for method in runnable:
+                if method in batched:
+                    futures.append((method, batched[method][index]))
+                else:
+                    futures.append((method, submit(
+                        self._detect_prepared, method, detectors[method], frame, plan
+                    )))
+            frame_futures.append(futures)
         
-        # Run detections in parallel
-        future_to_method = {}
-        results = {}
+        batch_results = []
+        for futures in frame_futures:
+            results = self._collect_results(futures, sport_pack)
+            
+            # Update performance monitoring
+            self._update_performance_stats(results)
+            batch_results.append(results)
         
-        for method in methods:
-            if method in self.detectors:
-                future = self.executor.submit(self.detectors[method].detect, image)
-                future_to_method[future] = method
+        return batch_results
+    
+    def _detect_prepared(self, method: DetectionMethod, detector: BaseDetector, frame: PreparedFrame,
+                         plan: DetectorExecutionPlan = DEFAULT_PLAN) -> DetectionResult:
+        """Run one detector at its own working resolution and map the result to the original frame"""
+        image, transform = self.preprocessor.prepare(frame, method.value)
+        # Share the frame's colour conversions when the detector runs on the decoded image as is
+        features = frame.features if image is frame.image else FrameFeatures(image)
+        if isinstance(detector, YOLOObjectDetector):
+            result = detector.detect(image, features, plan)
+        else:
+            result = detector.detect(image, features)
+        if not transform.is_identity:
+            self._map_result_to_original(result, transform, image.shape[1], image.shape[0])
+        return result
+    
+    def _detect_prepared_batch(self, method: DetectionMethod, detector: YOLOObjectDetector, frames: List[PreparedFrame],
+                               plan: DetectorExecutionPlan = DEFAULT_PLAN) -> List[DetectionResult]:
+        """Run one batching detector over all frames in a single call"""
+        prepared = [self.preprocessor.prepare(frame, method.value) for frame in frames]
+        results = detector.detect_many([image for image, _ in prepared], plan=plan)
+        for result, (image, transform) in zip(results, prepared):
+            if not transform.is_identity:
+                self._map_result_to_original(result, transform, image.shape[1], image.shape[0])
+        return results
+    
+    def _method_budget(self, sport_pack: Optional[SportPackConfig], methods: List[DetectionMethod]) -> Optional[float]:
+        """Each detector's share of the sport's per-frame latency budget"""
+        budget = sport_pack.performance.latency_budget_ms if sport_pack else None
+        if budget is None or not methods:
+            return budget
+        return budget / len(methods)
+    
+    def _detector_for(self, method: DetectionMethod, plan: DetectorExecutionPlan,
+                      budget: Optional[float]) -> BaseDetector:
+        """Detector variant that fits its latency budget and current load, or the default detector"""
+        variant = self.model_variants.select(method.value, budget, plan.sport)
+        if method == DetectionMethod.MEDIAPIPE_POSE:
+            variant = self._adaptive_pose_variant(variant, plan)
+        if variant is None:
+            return self.detectors[method]
+        return self._variant_detector(method, variant) or self.detectors[method]
+    
+    def _adaptive_pose_variant(self, variant: Optional[ModelVariant],
+                               plan: DetectorExecutionPlan) -> Optional[ModelVariant]:
+        """
+        Step the pose variant down under load, never below the sport's complexity
+        floor; a budget variant lighter than the floor is raised to it
+        """
+        ceiling = variant.model_complexity if variant else self.detectors[DetectionMethod.MEDIAPIPE_POSE].model_complexity
+        floor = plan.min_pose_complexity
+        complexity = pose_complexity_controller.select(floor, max(ceiling, floor))
+        if complexity == ceiling:
+            return variant
+        return next(
+            (v for v in self.model_variants.variants(DetectionMethod.MEDIAPIPE_POSE.value) if v.model_complexity == complexity),
+            variant
+        )
+    
+    def _variant_detector(self, method: DetectionMethod, variant: ModelVariant) -> Optional[BaseDetector]:
+        """
+        Detector instance running a variant; the default variant is the registered
+        detector. None when the variant fails to initialize, which also marks it
+        unavailable so budget selection stops choosing it.
+        """
+        if variant.is_default:
+            return self.detectors[method]
+        if not variant.available:
+            return None
+        
+        key = (method, variant.name)
+        with self._variant_lock:
+            detector = self._variant_detectors.get(key)
+            if detector is None:
+                if method == DetectionMethod.MEDIAPIPE_POSE:
+                    detector = MediaPipePoseDetector(confidence_threshold=0.5, model_complexity=variant.model_complexity)
+                else:
+                    base_detector = self.detectors[method]
+                    detector = YOLOObjectDetector(
+                        confidence_threshold=base_detector.confidence_threshold,
+                        model_size=base_detector.model_size,
+                        backend_config=replace(base_detector.backend_config, model_path=variant.model_path)
+                    )
+                if not detector.initialize():
+                    self.model_variants.record_latency(variant, None, "detector failed to initialize")
+                    logger.warning(f"Model variant {method.value} {variant.name} failed to initialize")
+                    return None
+                self._variant_detectors[key] = detector
+            return detector
+    
+    def _largest_latency_budget(self) -> Optional[float]:
+        """Largest per-frame latency budget of any sport pack; None when no sport sets one"""
+        budgets = [
+            sport_pack_loader.get_performance_config(sport).latency_budget_ms
+            for sport in sport_pack_loader.get_available_sports()
+        ]
+        budgets = [budget for budget in budgets if budget is not None]
+        return max(budgets) if budgets else None
+    
+    def calibrate_model_variants(self, image: Optional[np.ndarray] = None, runs: int = 3) -> Dict[str, Any]:
+        """
+        Time registered model variants on this CPU through their real detection path.
+        Without any sport latency budget no variant would ever be selected, so
+        nothing is timed. Pose complexities are timed cheapest first and the
+        heavier ones are skipped once one exceeds every budget, so an unusable
+        complexity-2 graph is never loaded. Object variants are all timed, since
+        fp16 is not reliably faster than fp32 on a CPU.
+        """
+        largest_budget = self._largest_latency_budget()
+        if largest_budget is None:
+            logger.info("No sport sets a latency budget; skipping model variant calibration")
+            return self.model_variants.get_report()
+        
+        if image is None:
+            image = _load_calibration_image()
+        frame = PreparedFrame.from_image(image)
+        
+        for method in self.active_methods:
+            prepared, _ = self.preprocessor.prepare(frame, method.value)
+            variants = self.model_variants.variants(method.value)
+            if method == DetectionMethod.MEDIAPIPE_POSE:
+                variants.sort(key=lambda v: v.model_complexity)
+            for variant in variants:
+                try:
+                    detector = self._variant_detector(method, variant)
+                    if detector is None:
+                        continue
+                    detector.warm_up(prepared)
+                    timings = []
+                    for _ in range(max(1, runs)):
+                        start_time = time.perf_counter()
+                        detector.detect(prepared, FrameFeatures(prepared))
+                        timings.append((time.perf_counter() - start_time) * 1000)
+                    self.model_variants.record_latency(variant, statistics.median(timings))
+                    logger.info(f"Calibrated {method.value} {variant.name}: {variant.measured_latency_ms:.1f} ms")
+                except Exception as e:
+                    self.model_variants.record_latency(variant, None, str(e))
+                    logger.warning(f"Model variant {method.value} {variant.name} unavailable: {str(e)}")
+                    continue
+                
+                if method == DetectionMethod.MEDIAPIPE_POSE and variant.measured_latency_ms > largest_budget:
+                    logger.info(f"Skipping pose variants heavier than {variant.name}: "
+                                f"{variant.measured_latency_ms:.1f} ms exceeds every latency budget")
+                    break
         
-        # Collect results
-        for future in future_to_method:
-            method = future_to_method[future]
+        self.model_variants.calibrated_at = time.time()
+        return self.model_variants.get_report()
+    
+    def _map_result_to_original(self, result: DetectionResult, transform: FrameTransform,
+                                processed_width: int, processed_height: int):
+        """Rewrite detector coordinates from the processed image into the original frame"""
+        for obj in result.objects:
+            if 'bbox' in obj:
+                obj['bbox'] = transform.bbox_to_original(obj['bbox'])
+            if 'area' in obj:
+                obj['area'] = transform.area_to_original(obj['area'])
+        result.bounding_boxes = [transform.bbox_to_original(bbox) for bbox in result.bounding_boxes]
+        
+        if result.pose_landmarks:
+            result.pose_landmarks = transform.landmarks_to_original(
+                result.pose_landmarks, processed_width, processed_height
+            )
+            # Angles use normalized x/y, so recompute them in original-frame proportions
+            pose_detector = self.detectors.get(DetectionMethod.MEDIAPIPE_POSE)
+            if isinstance(pose_detector, MediaPipePoseDetector):
+                result.joint_angles = pose_detector._calculate_joint_angles(result.pose_landmarks)
+    
+    def _load_sport_pack(self, sport_name: Optional[str]) -> Optional[SportPackConfig]:
+        """Load sport pack if provided"""
+        if not sport_name:
+            return None
+        try:
+            return sport_pack_loader.load_sport_pack(sport_name)
+        except Exception as e:
+            logger.warning(f"Failed to load sport pack for {sport_name}: {str(e)}")
+            return None
+    
+    def _collect_results(self, futures: List[Tuple[DetectionMethod, Future]],
+                         sport_pack: Optional[SportPackConfig]) -> Dict[DetectionMethod, DetectionResult]:
+        """Collect one frame's detector futures"""
+        results = {}
+        
+        for method, future in futures:
             try:
                 result = future.result(timeout=5.0)  # 5 second timeout
                 results[method] = result
@@ -736,13 +1115,16 @@ class UnifiedCVPipeline:
                     confidence=0.0
                 )
         
-        # Update performance monitoring
-        self._update_performance_stats(results)
-        
         return results
     
-    def detect_sport_specific(self, image: np.ndarray, sport_name: str) -> DetectionResult:
+    def detect_sport_specific(self, image: Union[np.ndarray, PreparedFrame], sport_name: str,
+                              serial: bool = False) -> DetectionResult:
         """Perform sport-specific detection with optimized pipeline"""
+        return self.detect_sport_specific_batch([image], sport_name, serial)[0]
+    
+    def detect_sport_specific_batch(self, images: List[Union[np.ndarray, PreparedFrame]],
+                                    sport_name: str, serial: bool = False) -> List[DetectionResult]:
+        """Perform sport-specific detection on many frames, one fused result per frame in order"""
         try:
             sport_pack = sport_pack_loader.load_sport_pack(sport_name)
             
@@ -750,32 +1132,38 @@ class UnifiedCVPipeline:
             optimal_methods = self._get_optimal_methods_for_sport(sport_pack)
             
             # Run unified detection
-            results = self.detect_unified(image, sport_name, optimal_methods)
-            
-            # Fuse results into a single comprehensive result
-            fused_result = self._fuse_detection_results(results, sport_pack)
+            batch_results = self.detect_batch(images, sport_name, optimal_methods, serial)
             
-            return fused_result
+            # Fuse results into a single comprehensive result per frame
+            return [self._fuse_detection_results(results, sport_pack) for results in batch_results]
             
         except Exception as e:
             logger.error(f"Sport-specific detection failed for {sport_name}: {str(e)}")
-            return DetectionResult(
-                method=DetectionMethod.UNIFIED_PIPELINE,
-                timestamp=time.time(),
-                success=False,
-                confidence=0.0
-            )
+            return [
+                DetectionResult(
+                    method=DetectionMethod.UNIFIED_PIPELINE,
+                    timestamp=time.time(),
+                    success=False,
+                    confidence=0.0
+                )
+                for _ in images
+            ]
+    
+    def get_execution_plan(self, sport_pack: Optional[SportPackConfig]) -> DetectorExecutionPlan:
+        """Compiled detector plan for the sport, cached per sport"""
+        return execution_plan_cache.get(sport_pack)
     
     def _get_optimal_methods_for_sport(self, sport_pack: SportPackConfig) -> List[DetectionMethod]:
-        """Determine optimal detection methods for a sport"""
+        """Determine optimal detection methods for a sport from its execution plan"""
+        plan = self.get_execution_plan(sport_pack)
         methods = []
         
-        # Always include pose detection for biomechanical analysis
-        if DetectionMethod.MEDIAPIPE_POSE in self.active_methods:
+        # Pose detection for biomechanical analysis
+        if plan.run_pose and DetectionMethod.MEDIAPIPE_POSE in self.active_methods:
             methods.append(DetectionMethod.MEDIAPIPE_POSE)
         
-        # Include object detection for sports with equipment
-        if sport_pack.objects and DetectionMethod.YOLO_OBJECTS in self.active_methods:
+        # Object detection for sports with equipment
+        if plan.run_objects and DetectionMethod.YOLO_OBJECTS in self.active_methods:
             methods.append(DetectionMethod.YOLO_OBJECTS)
         
         return methods
@@ -1406,8 +1794,8 @@ class UnifiedCVPipeline:
             total_runs = perf['total_runs']
             perf['average_fps'] = (perf['average_fps'] * (total_runs - 1) + result.fps) / total_runs
     
-    def get_performance_report(self) -> Dict[str, Any]:
-        """Get comprehensive performance report"""
+    def get_performance_report(self, sport_name: Optional[str] = None) -> Dict[str, Any]:
+        """Get comprehensive performance report, including the model variants chosen for a sport"""
         total_frames = self.performance_monitor['total_frames_processed']
         success_rate = (
             self.performance_monitor['successful_detections'] / total_frames 
@@ -1420,9 +1808,31 @@ class UnifiedCVPipeline:
             'success_rate': success_rate,
             'active_detectors': len(self.active_methods),
             'detector_performance': self.performance_monitor['detector_performance'],
-            'available_methods': [method.value for method in self.active_methods]
+            'available_methods': [method.value for method in self.active_methods],
+            'model_variants': self.model_variants.get_report(),
+            'model_variants_calibrated_at': self.model_variants.calibrated_at,
+            'chosen_variants': self._chosen_variants(sport_name),
+            'adaptive_pose_complexity': pose_complexity_controller.get_stats(),
+            'execution_plans': execution_plan_cache.get_plans()
         }
     
+    def _chosen_variants(self, sport_name: Optional[str]) -> Dict[str, Any]:
+        """Variant each detector runs for a sport (the default without one) and its measured latency"""
+        sport_pack = self._load_sport_pack(sport_name)
+        methods = self._get_optimal_methods_for_sport(sport_pack) if sport_pack else self.active_methods
+        budget = self._method_budget(sport_pack, methods)
+        chosen = {}
+        for method in methods:
+            variant = self.model_variants.select(method.value, budget, sport_pack.sport if sport_pack else None)
+            if variant is None:
+                variant = next((v for v in self.model_variants.variants(method.value) if v.is_default), None)
+            chosen[method.value] = {
+                'variant': variant.name if variant else None,
+                'measured_latency_ms': variant.measured_latency_ms if variant else None,
+                'latency_budget_ms': budget
+            }
+        return chosen
+    
     def cleanup(self):
         """Cleanup all resources"""
         for detector in self.detectors.values():
@@ -0,0 +1,495 @@
+#!/usr/bin/env python3
+"""
+Video Job Queue - Asynchronous video analysis with progress tracking
+Local priority queue and worker pool persisted to SQLite, so long uploads
+return a job id immediately and survive server restarts without a broker
+"""
+
+import os
+import json
+import queue
+import socket
+import sqlite3
+import logging
+import itertools
+import threading
+import time
+import uuid
+from dataclasses import dataclass, asdict
+from enum import Enum
+from typing import Dict, List, Optional, Any, Callable
+
+from custom_exceptions import InferenceOverloadError
+from video_pipeline import VideoProgress
+
+logger = logging.getLogger(__name__)
+
+# Relative job paths are resolved against the backend directory, not the server's cwd
+APP_DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+
+def resolve_app_path(path: str) -> str:
+    """Absolute path for a configured job path, anchored at APP_DIRECTORY when relative"""
+    return path if os.path.isabs(path) else os.path.join(APP_DIRECTORY, path)
+
+class VideoJobStatus(Enum):
+    """Lifecycle of a video analysis job"""
+    QUEUED = "queued"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+@dataclass
+class VideoJob:
+    """A persisted video analysis job"""
+    job_id: str
+    kind: str
+    sport: str
+    analysis_type: str
+    video_path: str
+    sampling: Dict[str, Any]
+    priority: int
+    status: VideoJobStatus = VideoJobStatus.QUEUED
+    frames_done: int = 0
+    frames_total: Optional[int] = None
+    processing_fps: float = 0.0
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    created_at: float = 0.0
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        """API representation (omits the server-side video path)"""
+        data = asdict(self)
+        data.pop('video_path')
+        data['status'] = self.status.value
+        data['progress'] = (
+            round(self.frames_done / self.frames_total, 3)
+            if self.frames_total else (1.0 if self.status == VideoJobStatus.COMPLETED else 0.0)
+        )
+        return data
+
+class VideoJobStore:
+    """
+    SQLite persistence for video jobs (one shared connection guarded by a lock).
+    Several server processes may share the database, so a job is only run by
+    the owner that claimed it; running jobs carry a heartbeat and are handed
+    back to the queue once their owner's lease lapses.
+    """
+
+    _COLUMNS = (
+        'job_id', 'kind', 'sport', 'analysis_type', 'video_path', 'sampling', 'priority',
+        'status', 'frames_done', 'frames_total', 'processing_fps', 'result', 'error',
+        'created_at', 'started_at', 'finished_at'
+    )
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS video_jobs (
+                    job_id TEXT PRIMARY KEY,
+                    kind TEXT NOT NULL,
+                    sport TEXT NOT NULL,
+                    analysis_type TEXT NOT NULL,
+                    video_path TEXT NOT NULL,
+                    sampling TEXT NOT NULL,
+                    priority INTEGER NOT NULL,
+                    status TEXT NOT NULL,
+                    frames_done INTEGER NOT NULL DEFAULT 0,
+                    frames_total INTEGER,
+                    processing_fps REAL NOT NULL DEFAULT 0,
+                    result TEXT,
+                    error TEXT,
+                    created_at REAL NOT NULL,
+                    started_at REAL,
+                    finished_at REAL,
+                    owner TEXT,
+                    heartbeat_at REAL
+                )
+            """)
+            # Databases created before job ownership existed
+            columns = {row['name'] for row in self._conn.execute("PRAGMA table_info(video_jobs)")}
+            for column, column_type in (('owner', 'TEXT'), ('heartbeat_at', 'REAL')):
+                if column not in columns:
+                    self._conn.execute(f"ALTER TABLE video_jobs ADD COLUMN {column} {column_type}")
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_video_jobs_kind_status ON video_jobs (kind, status)"
+            )
+
+    def _row_to_job(self, row: sqlite3.Row) -> VideoJob:
+        return VideoJob(
+            job_id=row['job_id'],
+            kind=row['kind'],
+            sport=row['sport'],
+            analysis_type=row['analysis_type'],
+            video_path=row['video_path'],
+            sampling=json.loads(row['sampling']),
+            priority=row['priority'],
+            status=VideoJobStatus(row['status']),
+            frames_done=row['frames_done'],
+            frames_total=row['frames_total'],
+            processing_fps=row['processing_fps'],
+            result=json.loads(row['result']) if row['result'] else None,
+            error=row['error'],
+            created_at=row['created_at'],
+            started_at=row['started_at'],
+            finished_at=row['finished_at']
+        )
+
+    def insert(self, job: VideoJob) -> None:
+        values = (
+            job.job_id, job.kind, job.sport, job.analysis_type, job.video_path,
+            json.dumps(job.sampling), job.priority, job.status.value, job.frames_done,
+            job.frames_total, job.processing_fps,
+            json.dumps(job.result) if job.result is not None else None,
+            job.error, job.created_at, job.started_at, job.finished_at
+        )
+        with self._lock, self._conn:
+            self._conn.execute(
+                f"INSERT INTO video_jobs ({', '.join(self._COLUMNS)}) "
+                f"VALUES ({', '.join('?' for _ in self._COLUMNS)})",
+                values
+            )
+
+    def update(self, job_id: str, **fields: Any) -> None:
+        if 'status' in fields and isinstance(fields['status'], VideoJobStatus):
+            fields['status'] = fields['status'].value
+        if 'result' in fields and fields['result'] is not None:
+            fields['result'] = json.dumps(fields['result'])
+        assignments = ', '.join(f"{name} = ?" for name in fields)
+        with self._lock, self._conn:
+            self._conn.execute(
+                f"UPDATE video_jobs SET {assignments} WHERE job_id = ?",
+                (*fields.values(), job_id)
+            )
+
+    def update_owned(self, job_id: str, owner: str, **fields: Any) -> bool:
+        """Update a job only while owner still holds it; returns whether it did"""
+        if 'status' in fields and isinstance(fields['status'], VideoJobStatus):
+            fields['status'] = fields['status'].value
+        if 'result' in fields and fields['result'] is not None:
+            fields['result'] = json.dumps(fields['result'])
+        assignments = ', '.join(f"{name} = ?" for name in fields)
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                f"UPDATE video_jobs SET {assignments} WHERE job_id = ? AND owner = ?",
+                (*fields.values(), job_id, owner)
+            )
+        return cursor.rowcount == 1
+
+    def claim(self, job_id: str, owner: str) -> bool:
+        """Atomically move a queued job to running for owner; False if another owner got it first"""
+        now = time.time()
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "UPDATE video_jobs SET status = ?, owner = ?, started_at = ?, heartbeat_at = ? "
+                "WHERE job_id = ? AND status = ?",
+                (VideoJobStatus.RUNNING.value, owner, now, now, job_id, VideoJobStatus.QUEUED.value)
+            )
+        return cursor.rowcount == 1
+
+    def heartbeat(self, owner: str) -> None:
+        """Extend the lease on every job owner is running"""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE video_jobs SET heartbeat_at = ? WHERE owner = ? AND status = ?",
+                (time.time(), owner, VideoJobStatus.RUNNING.value)
+            )
+
+    def release(self, owner: str, job_id: Optional[str] = None) -> int:
+        """Return owner's running jobs (or just job_id) to the queue; returns how many"""
+        query = ("UPDATE video_jobs SET status = ?, owner = NULL, heartbeat_at = NULL, frames_done = 0, "
+                 "started_at = NULL WHERE owner = ? AND status = ?")
+        params = [VideoJobStatus.QUEUED.value, owner, VideoJobStatus.RUNNING.value]
+        if job_id is not None:
+            query += " AND job_id = ?"
+            params.append(job_id)
+        with self._lock, self._conn:
+            return self._conn.execute(query, params).rowcount
+
+    def reclaim_expired(self, kind: str, lease_seconds: float) -> List[VideoJob]:
+        """
+        Re-queue running jobs whose owner is gone (no owner, or heartbeat older than the lease).
+        Each row is re-queued with a conditional update, so when several processes recover
+        at once every job is handed back exactly once; returns the jobs this call re-queued.
+        """
+        expired_before = time.time() - lease_seconds
+        reclaimed = []
+        with self._lock, self._conn:
+            rows = self._conn.execute(
+                "SELECT * FROM video_jobs WHERE kind = ? AND status = ? "
+                "AND (owner IS NULL OR heartbeat_at IS NULL OR heartbeat_at < ?)",
+                (kind, VideoJobStatus.RUNNING.value, expired_before)
+            ).fetchall()
+            for row in rows:
+                cursor = self._conn.execute(
+                    "UPDATE video_jobs SET status = ?, owner = NULL, heartbeat_at = NULL, frames_done = 0, "
+                    "started_at = NULL WHERE job_id = ? AND status = ? AND owner IS ? "
+                    "AND (owner IS NULL OR heartbeat_at IS NULL OR heartbeat_at < ?)",
+                    (VideoJobStatus.QUEUED.value, row['job_id'], VideoJobStatus.RUNNING.value,
+                     row['owner'], expired_before)
+                )
+                if cursor.rowcount == 1:
+                    reclaimed.append(self._row_to_job(row))
+        return reclaimed
+
+    def get(self, job_id: str) -> Optional[VideoJob]:
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM video_jobs WHERE job_id = ?", (job_id,)).fetchone()
+        return self._row_to_job(row) if row else None
+
+    def list_by_status(self, kind: str, statuses: List[VideoJobStatus]) -> List[VideoJob]:
+        placeholders = ', '.join('?' for _ in statuses)
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT * FROM video_jobs WHERE kind = ? AND status IN ({placeholders}) ORDER BY created_at",
+                (kind, *[status.value for status in statuses])
+            ).fetchall()
+        return [self._row_to_job(row) for row in rows]
+
+    def count_by_status(self, kind: str, statuses: List[VideoJobStatus]) -> int:
+        placeholders = ', '.join('?' for _ in statuses)
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT COUNT(*) FROM video_jobs WHERE kind = ? AND status IN ({placeholders})",
+                (kind, *[status.value for status in statuses])
+            ).fetchone()
+        return row[0]
+
+    def list_recent(self, kind: str, limit: int = 50) -> List[VideoJob]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT * FROM video_jobs WHERE kind = ? ORDER BY created_at DESC LIMIT ?",
+                (kind, limit)
+            ).fetchall()
+        return [self._row_to_job(row) for row in rows]
+
+class VideoJobQueue:
+    """
+    Priority queue of video jobs processed by a fixed number of local worker
+    threads (the concurrency limit). Higher priority runs first, then FIFO.
+    Unfinished jobs are re-queued from SQLite when the queue starts, which
+    is also when the store is opened (unless one is passed in). Every server
+    process has its own queue on the shared database: workers claim jobs
+    atomically, and a lease thread keeps this owner's running jobs alive and
+    re-queues jobs whose owner stopped heartbeating.
+    """
+
+    def __init__(self,
+                 kind: str,
+                 handler: Callable[[VideoJob, Callable[[VideoProgress], None]], Dict[str, Any]],
+                 store: Optional[VideoJobStore] = None,
+                 workers: Optional[int] = None,
+                 max_queued: Optional[int] = None,
+                 upload_directory: Optional[str] = None):
+        self.kind = kind
+        self.handler = handler
+        self.store = store
+        self.db_path = resolve_app_path(os.getenv('EKKALAVYA_VIDEO_JOB_DB', 'video_jobs/jobs.db'))
+        self.workers = max(1, workers if workers is not None else int(os.getenv('EKKALAVYA_VIDEO_JOB_WORKERS', 2)))
+        self.max_queued = max_queued if max_queued is not None else int(os.getenv('EKKALAVYA_VIDEO_JOB_MAX_QUEUED', 100))
+        self.upload_directory = resolve_app_path(
+            upload_directory or os.getenv('EKKALAVYA_VIDEO_JOB_DIR', 'video_jobs/uploads')
+        )
+
+        self._queue: queue.PriorityQueue = queue.PriorityQueue()
+        self._sequence = itertools.count()
+        self._submit_lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._threads: List[threading.Thread] = []
+        self._progress_interval = 1.0
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.lease_seconds = max(5.0, float(os.getenv('EKKALAVYA_VIDEO_JOB_LEASE_SECONDS', 60)))
+
+    @property
+    def stop_event(self) -> threading.Event:
+        """Set while the queue is stopping; handlers pass it to blocking waits so they give up"""
+        return self._stop_event
+
+    def start(self) -> None:
+        """Recover unfinished jobs and start the worker threads"""
+        if self._threads:
+            return
+
+        if self.store is None:
+            self.store = VideoJobStore(self.db_path)
+        os.makedirs(self.upload_directory, exist_ok=True)
+
+        recovered = 0
+        self.store.reclaim_expired(self.kind, self.lease_seconds)
+        for job in self.store.list_by_status(self.kind, [VideoJobStatus.QUEUED]):
+            if self._recover(job):
+                recovered += 1
+
+        self._stop_event.clear()
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._worker, name=f'video-job-{self.kind}-{i}', daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        lease_thread = threading.Thread(target=self._maintain_leases, name=f'video-job-{self.kind}-lease',
+                                        daemon=True)
+        lease_thread.start()
+        self._threads.append(lease_thread)
+
+        logger.info(f"Video job queue '{self.kind}' started with {self.workers} workers "
+                    f"({recovered} jobs recovered)")
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Stop workers; running jobs are handed back to the queue for the next start"""
+        self._stop_event.set()
+        for thread in self._threads:
+            thread.join(timeout=timeout)
+        self._threads = []
+        if self.store is not None:
+            self.store.release(self.owner)
+
+    def _recover(self, job: VideoJob) -> bool:
+        """Queue a job found in the store, failing it when its upload is gone"""
+        if not os.path.exists(job.video_path):
+            self.store.update(job.job_id, status=VideoJobStatus.FAILED,
+                              error="Video file missing after restart", finished_at=time.time())
+            return False
+        self._enqueue(job.job_id, job.priority)
+        return True
+
+    def _maintain_leases(self) -> None:
+        """Heartbeat this owner's running jobs and pick up jobs whose owner died"""
+        interval = self.lease_seconds / 4
+        while not self._stop_event.wait(interval):
+            try:
+                self.store.heartbeat(self.owner)
+                for job in self.store.reclaim_expired(self.kind, self.lease_seconds):
+                    logger.warning(f"Video job {job.job_id} lost its owner, re-queued")
+                    self._recover(job)
+            except sqlite3.Error as e:
+                logger.warning(f"Video job lease maintenance failed: {str(e)}")
+
+    def _enqueue(self, job_id: str, priority: int) -> None:
+        self._queue.put((-priority, next(self._sequence), job_id))
+
+    def submit(self,
+               video_path: str,
+               sport: str,
+               analysis_type: str,
+               sampling: Dict[str, Any],
+               priority: int) -> VideoJob:
+        """Persist and queue a job; raises InferenceOverloadError when the queue is full"""
+        # Count queued rows rather than the in-memory heap, which still holds
+        # entries for jobs that were already picked up or failed on recovery
+        with self._submit_lock:
+            if self.queue_depth() >= self.max_queued:
+                raise InferenceOverloadError(
+                    "Video job queue is full, retry later",
+                    error_code="VIDEO_JOB_QUEUE_FULL",
+                    context={'max_queued': self.max_queued, 'retry_after_seconds': 30}
+                )
+
+            job = VideoJob(
+                job_id=uuid.uuid4().hex,
+                kind=self.kind,
+                sport=sport,
+                analysis_type=analysis_type,
+                video_path=video_path,
+                sampling=sampling,
+                priority=priority,
+                created_at=time.time()
+            )
+            self.store.insert(job)
+        self._enqueue(job.job_id, priority)
+        return job
+
+    def get_job(self, job_id: str) -> Optional[VideoJob]:
+        job = self.store.get(job_id)
+        if job is None or job.kind != self.kind:
+            return None
+        return job
+
+    def list_jobs(self, limit: int = 50) -> List[VideoJob]:
+        return self.store.list_recent(self.kind, limit)
+
+    def queue_depth(self) -> int:
+        return self.store.count_by_status(self.kind, [VideoJobStatus.QUEUED])
+
+    def _worker(self) -> None:
+        while not self._stop_event.is_set():
+            try:
+                _, _, job_id = self._queue.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            # Other processes may hold the same job id in their heaps
+            if not self.store.claim(job_id, self.owner):
+                continue
+            job = self.store.get(job_id)
+            if job is not None:
+                self._run_job(job)
+
+    def _run_job(self, job: VideoJob) -> None:
+        started_at = time.time()
+        last_write = [0.0]
+
+        def on_progress(progress: VideoProgress) -> None:
+            # Throttle SQLite writes; the final counts are written on completion
+            now = time.time()
+            if now - last_write[0] < self._progress_interval:
+                return
+            last_write[0] = now
+            self.store.update_owned(
+                job.job_id,
+                self.owner,
+                frames_done=progress.frames_done,
+                frames_total=progress.frames_expected,
+                processing_fps=round(progress.processing_fps, 2),
+                heartbeat_at=now
+            )
+
+        try:
+            result = self.handler(job, on_progress)
+        except Exception as e:
+            if self._stop_event.is_set():
+                # Interrupted by shutdown; keep the upload so the job can run again
+                self.store.release(self.owner, job.job_id)
+                logger.info(f"Video job {job.job_id} interrupted by shutdown, re-queued")
+                return
+            logger.error(f"Video job {job.job_id} failed: {str(e)}")
+            finished = self.store.update_owned(job.job_id, self.owner, status=VideoJobStatus.FAILED,
+                                               error=str(e), finished_at=time.time())
+        else:
+            video_stats = result.get('video', {})
+            finished = self.store.update_owned(
+                job.job_id,
+                self.owner,
+                status=VideoJobStatus.COMPLETED,
+                result=result,
+                frames_done=video_stats.get('frames_sampled', 0),
+                frames_total=video_stats.get('frames_sampled', 0),
+                processing_fps=video_stats.get('processing_fps', 0.0),
+                finished_at=time.time()
+            )
+            if finished:
+                logger.info(f"Video job {job.job_id} completed in {time.time() - started_at:.1f}s")
+
+        if not finished:
+            # The lease lapsed and another owner re-queued the job; its upload is still needed
+            logger.warning(f"Video job {job.job_id} was reclaimed while running, result discarded")
+        elif os.path.exists(job.video_path):
+            os.remove(job.video_path)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'kind': self.kind,
+            'workers': self.workers,
+            'queued': self.queue_depth(),
+            'max_queued': self.max_queued,
+            'running': self.store.count_by_status(self.kind, [VideoJobStatus.RUNNING])
+        }
+
+__all__ = ['APP_DIRECTORY', 'resolve_app_path', 'VideoJobStatus', 'VideoJob', 'VideoJobStore', 'VideoJobQueue']
@@ -0,0 +1,404 @@
+#!/usr/bin/env python3
+"""
+Streaming Video Pipeline - Sampled, parallel whole-clip video analysis
+Chunked upload to disk, configurable frame sampling, a background decode
+thread feeding a bounded queue of pose workers, and clip-level aggregation
+"""
+
+import os
+import queue
+import logging
+import tempfile
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Dict, List, Optional, Any, Callable, Tuple
+
+import cv2
+import numpy as np
+from fastapi import UploadFile
+
+from custom_exceptions import VideoProcessingError, InferenceOverloadError
+from inference_executor import inference_executor
+
+logger = logging.getLogger(__name__)
+
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+MAX_VIDEO_UPLOAD_BYTES = int(os.getenv('EKKALAVYA_MAX_VIDEO_UPLOAD_MB', 500)) * 1024 * 1024
+
+# Fraction of the inference executor's workers one clip may fan out to. Frame workers
+# go through the executor's admission control alongside realtime requests, so a single
+# clip may use the whole executor by default; lower the share to reserve headroom
+VIDEO_WORKER_SHARE = min(1.0, max(0.0, float(os.getenv('EKKALAVYA_VIDEO_WORKER_SHARE', 1.0))))
+MIN_VIDEO_WORKERS = 2
+
+def default_video_workers() -> int:
+    """Frame workers per clip: EKKALAVYA_VIDEO_WORKERS, capped at VIDEO_WORKER_SHARE of the executor"""
+    max_workers = inference_executor.config.max_workers
+    cap = max(min(MIN_VIDEO_WORKERS, max_workers), int(max_workers * VIDEO_WORKER_SHARE))
+    workers = int(os.getenv('EKKALAVYA_VIDEO_WORKERS', cap))
+    if workers > cap:
+        logger.warning(f"EKKALAVYA_VIDEO_WORKERS={workers} exceeds the video share of the inference "
+                       f"executor; using {cap}")
+    return max(1, min(workers, cap))
+
+class SamplingMode(Enum):
+    """How frames are chosen from a clip"""
+    EVERY_NTH = "every_nth"
+    TARGET_FPS = "target_fps"
+    KEYFRAMES = "keyframes"
+
+@dataclass
+class SamplingConfig:
+    """Frame sampling parameters"""
+    mode: SamplingMode = SamplingMode.TARGET_FPS
+    every_nth: int = 5
+    target_fps: float = 5.0
+    keyframe_threshold: float = 0.08  # Mean absolute difference (0-1) vs. last keyframe
+    max_frames: Optional[int] = None
+
+@dataclass
+class SampledFrame:
+    """A decoded frame selected for analysis"""
+    index: int
+    timestamp: float
+    image: np.ndarray
+
+@dataclass
+class VideoProgress:
+    """Progress snapshot reported while a clip is processed"""
+    frames_done: int
+    frames_expected: Optional[int]
+    elapsed_seconds: float
+    processing_fps: float
+
+@dataclass
+class VideoAnalysisResult:
+    """Per-frame results in clip order plus decode/analysis counters"""
+    frame_results: List[Tuple[int, float, Dict[str, Any]]] = field(default_factory=list)
+    source_fps: float = 0.0
+    total_frames: int = 0
+    duration_seconds: float = 0.0
+    frames_decoded: int = 0
+    frames_sampled: int = 0
+    frames_without_result: int = 0
+    processing_time_seconds: float = 0.0
+    decode_error: Optional[str] = None
+    decode_error_frame: Optional[int] = None
+
+    @property
+    def complete(self) -> bool:
+        """False when decoding stopped early on an error and the clip was truncated"""
+        return self.decode_error is None
+
+    @property
+    def processing_fps(self) -> float:
+        if self.processing_time_seconds <= 0:
+            return 0.0
+        return self.frames_sampled / self.processing_time_seconds
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'source_fps': self.source_fps,
+            'total_frames': self.total_frames,
+            'duration_seconds': round(self.duration_seconds, 2),
+            'frames_decoded': self.frames_decoded,
+            'frames_sampled': self.frames_sampled,
+            'frames_analyzed': len(self.frame_results),
+            'frames_without_result': self.frames_without_result,
+            'processing_time_seconds': round(self.processing_time_seconds, 2),
+            'processing_fps': round(self.processing_fps, 1),
+            'complete': self.complete,
+            'decode_error': self.decode_error,
+            'decode_error_frame': self.decode_error_frame
+        }
+
+async def save_upload_to_tempfile(upload: UploadFile,
+                                  max_bytes: Optional[int] = None,
+                                  chunk_size: int = UPLOAD_CHUNK_SIZE,
+                                  directory: Optional[str] = None) -> str:
+    """Stream an upload to a private temp file in chunks; returns the file path"""
+    suffix = os.path.splitext(os.path.basename(upload.filename or ''))[1][:8] or '.mp4'
+    fd, temp_path = tempfile.mkstemp(prefix='ekkalavya_video_', suffix=suffix, dir=directory)
+    written = 0
+
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            while True:
+                chunk = await upload.read(chunk_size)
+                if not chunk:
+                    break
+                written += len(chunk)
+                if max_bytes is not None and written > max_bytes:
+                    raise VideoProcessingError(
+                        "Uploaded video exceeds size limit",
+                        "VIDEO_TOO_LARGE",
+                        {"max_bytes": max_bytes}
+                    )
+                f.write(chunk)
+    except Exception:
+        os.remove(temp_path)
+        raise
+
+    return temp_path
+
+class FrameSampler:
+    """Decides which frames of a clip are analyzed"""
+
+    def __init__(self, config: SamplingConfig, source_fps: float):
+        self.config = config
+        self.source_fps = source_fps
+        self.sampled = 0
+        self._next_sample_at = 0.0
+        self._last_keyframe: Optional[np.ndarray] = None
+
+        if config.mode == SamplingMode.TARGET_FPS:
+            self._step = max(1.0, source_fps / max(config.target_fps, 0.01))
+        elif config.mode == SamplingMode.EVERY_NTH:
+            self._step = float(max(1, config.every_nth))
+        else:
+            self._step = 1.0
+
+    @property
+    def needs_pixels(self) -> bool:
+        """Keyframe mode must decode every frame to compare content"""
+        return self.config.mode == SamplingMode.KEYFRAMES
+
+    @property
+    def exhausted(self) -> bool:
+        return self.config.max_frames is not None and self.sampled >= self.config.max_frames
+
+    def expected_samples(self, total_frames: int) -> Optional[int]:
+        """Number of frames that will be sampled, when known in advance"""
+        if self.needs_pixels or total_frames <= 0:
+            return self.config.max_frames
+        expected = int(np.ceil(total_frames / self._step))
+        if self.config.max_frames is not None:
+            expected = min(expected, self.config.max_frames)
+        return expected
+
+    def wants(self, index: int) -> bool:
+        """Index-based decision made before decoding (every-Nth and target-fps modes)"""
+        if self.needs_pixels:
+            return True
+        if index >= self._next_sample_at:
+            self._next_sample_at += self._step
+            return True
+        return False
+
+    def accept(self, image: np.ndarray) -> bool:
+        """Content-based decision for decoded frames; counts accepted samples"""
+        if self.needs_pixels:
+            thumb = cv2.resize(cv2.cvtColor(image, cv2.COLOR_BGR2GRAY), (64, 36), interpolation=cv2.INTER_AREA)
+            if self._last_keyframe is not None:
+                change = float(np.mean(cv2.absdiff(thumb, self._last_keyframe))) / 255.0
+                if change < self.config.keyframe_threshold:
+                    return False
+            self._last_keyframe = thumb
+        self.sampled += 1
+        return True
+
+class VideoAnalysisPipeline:
+    """
+    Decode thread -> bounded queue -> analysis workers.
+    Frames that are not sampled are skipped with grab() and never decoded
+    (except in keyframe mode). The bounded queue keeps memory flat however
+    long the clip is. A decode error stops the clip early and is reported on
+    the result (complete=False, decode_error). If a frame cannot get a pose graph in time
+    (InferenceOverloadError), the clip fails with that error rather than
+    dropping frames.
+    """
+
+    def __init__(self, workers: Optional[int] = None, queue_size: Optional[int] = None):
+        self.workers = max(1, workers if workers is not None else default_video_workers())
+        self.queue_size = max(1, queue_size if queue_size is not None else self.workers * 2)
+
+    def run(self,
+            video_path: str,
+            analyze_frame: Callable[[np.ndarray], Optional[Dict[str, Any]]],
+            sampling: Optional[SamplingConfig] = None,
+            progress_callback: Optional[Callable[[VideoProgress], None]] = None) -> VideoAnalysisResult:
+        """Analyze a clip; analyze_frame is called concurrently from worker threads"""
+        sampling = sampling or SamplingConfig()
+        start_time = time.perf_counter()
+
+        cap = cv2.VideoCapture(video_path)
+        if not cap.isOpened():
+            raise VideoProcessingError("Unable to open video", "VIDEO_OPEN_FAILED", {"path": video_path})
+
+        source_fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+        total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT) or 0)
+        sampler = FrameSampler(sampling, source_fps)
+        frames_expected = sampler.expected_samples(total_frames)
+
+        result = VideoAnalysisResult(source_fps=source_fps, total_frames=total_frames)
+        frame_queue: queue.Queue = queue.Queue(maxsize=self.queue_size)
+        stop_event = threading.Event()
+        results_lock = threading.Lock()
+        done_counter = [0]
+        overload: List[InferenceOverloadError] = []
+
+        def put(item) -> bool:
+            while not stop_event.is_set():
+                try:
+                    frame_queue.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        def decode() -> None:
+            index = 0
+            try:
+                while not stop_event.is_set() and not sampler.exhausted:
+                    if sampler.wants(index):
+                        ok, image = cap.read()
+                        if not ok:
+                            break
+                        result.frames_decoded += 1
+                        if sampler.accept(image):
+                            if not put(SampledFrame(index, index / source_fps, image)):
+                                break
+                    elif not cap.grab():
+                        break
+                    index += 1
+            except Exception as e:
+                logger.error(f"Video decode failed at frame {index}: {str(e)}")
+                result.decode_error = str(e) or type(e).__name__
+                result.decode_error_frame = index
+            finally:
+                result.frames_sampled = sampler.sampled
+                result.duration_seconds = (total_frames or index) / source_fps
+                for _ in range(self.workers):
+                    put(None)
+
+        def work() -> None:
+            while not stop_event.is_set():
+                try:
+                    item = frame_queue.get(timeout=0.1)
+                except queue.Empty:
+                    if stop_event.is_set():
+                        return
+                    continue
+                if item is None:
+                    return
+
+                try:
+                    frame_result = analyze_frame(item.image)
+                except InferenceOverloadError as e:
+                    with results_lock:
+                        overload.append(e)
+                    stop_event.set()
+                    return
+                except Exception as e:
+                    logger.warning(f"Frame {item.index} analysis failed: {str(e)}")
+                    frame_result = None
+
+                with results_lock:
+                    if frame_result:
+                        result.frame_results.append((item.index, item.timestamp, frame_result))
+                    else:
+                        result.frames_without_result += 1
+                    done_counter[0] += 1
+                    done = done_counter[0]
+
+                if progress_callback is not None:
+                    elapsed = time.perf_counter() - start_time
+                    try:
+                        progress_callback(VideoProgress(done, frames_expected, elapsed,
+                                                        done / elapsed if elapsed > 0 else 0.0))
+                    except Exception as e:
+                        logger.warning(f"Progress callback failed: {str(e)}")
+
+        decoder = threading.Thread(target=decode, name='video-decode', daemon=True)
+        workers = [threading.Thread(target=work, name=f'video-worker-{i}', daemon=True)
+                   for i in range(self.workers)]
+
+        decoder.start()
+        for worker in workers:
+            worker.start()
+
+        try:
+            for worker in workers:
+                worker.join()
+        finally:
+            stop_event.set()
+            decoder.join()
+            cap.release()
+
+        if overload:
+            raise overload[0]
+
+        result.frame_results.sort(key=lambda entry: entry[0])
+        result.processing_time_seconds = time.perf_counter() - start_time
+        return result
+
+def aggregate_frame_results(result: VideoAnalysisResult, score_key: str = 'form_score') -> Dict[str, Any]:
+    """Clip-level summary: score statistics, averaged metrics, ranked feedback and a score timeline"""
+    frame_results = result.frame_results
+    if not frame_results:
+        return {'frame_count': 0, 'average_score': 0.0, 'feedback': [], 'timeline': []}
+
+    scores = np.array([float(r.get(score_key, 0.0)) for _, _, r in frame_results])
+
+    metric_sums: Dict[str, float] = {}
+    metric_counts: Counter = Counter()
+    feedback_counts: Counter = Counter()
+    complexity_counts: Counter = Counter()
+    for _, _, frame_result in frame_results:
+        for key, value in frame_result.items():
+            if key == 'pose_model_complexity':
+                complexity_counts[value] += 1
+            elif isinstance(value, (int, float)) and not isinstance(value, bool):
+                metric_sums[key] = metric_sums.get(key, 0.0) + float(value)
+                metric_counts[key] += 1
+        feedback_counts.update(frame_result.get('feedback', []))
+
+    best = int(np.argmax(scores))
+    worst = int(np.argmin(scores))
+
+    return {
+        'frame_count': len(frame_results),
+        'average_score': float(scores.mean()),
+        'min_score': float(scores.min()),
+        'max_score': float(scores.max()),
+        'score_std': float(scores.std()),
+        'metrics': {key: metric_sums[key] / metric_counts[key] for key in metric_sums},
+        'feedback': [text for text, _ in feedback_counts.most_common()],
+        'pose_model_complexity_frames': dict(complexity_counts),
+        'best_frame': {'frame_index': frame_results[best][0], 'timestamp': frame_results[best][1],
+                       'score': float(scores[best])},
+        'worst_frame': {'frame_index': frame_results[worst][0], 'timestamp': frame_results[worst][1],
+                        'score': float(scores[worst])},
+        'timeline': [
+            {'frame_index': index, 'timestamp': round(timestamp, 3), 'score': float(score)}
+            for (index, timestamp, _), score in zip(frame_results, scores)
+        ]
+    }
+
+def build_sampling_config(mode: str = "target_fps",
+                          every_nth: int = 5,
+                          target_fps: float = 5.0,
+                          max_frames: Optional[int] = None) -> SamplingConfig:
+    """Build a SamplingConfig from request parameters"""
+    try:
+        sampling_mode = SamplingMode(mode)
+    except ValueError:
+        raise VideoProcessingError(
+            f"Unknown sampling mode '{mode}'",
+            "INVALID_SAMPLING_MODE",
+            {"available_modes": [m.value for m in SamplingMode]}
+        )
+    return SamplingConfig(mode=sampling_mode, every_nth=every_nth, target_fps=target_fps, max_frames=max_frames)
+
+# Global pipeline instance
+video_analysis_pipeline = VideoAnalysisPipeline()
+
+__all__ = [
+    'SamplingMode', 'SamplingConfig', 'SampledFrame', 'VideoProgress', 'VideoAnalysisResult',
+    'FrameSampler', 'VideoAnalysisPipeline', 'save_upload_to_tempfile', 'aggregate_frame_results',
+    'build_sampling_config', 'video_analysis_pipeline', 'MAX_VIDEO_UPLOAD_BYTES', 'VIDEO_WORKER_SHARE',
+    'MIN_VIDEO_WORKERS', 'default_video_workers'
+]